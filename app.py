@@ -1,65 +1,416 @@
 import os
-from flask import Flask, render_template, request, jsonify, session, redirect, url_for, flash
-from pymongo import MongoClient
+import sys
+import io
+import csv
+import json
+import base64
+import hashlib
+import hmac
+import math
+import itertools
+from flask import Flask, Response, render_template, request, jsonify, session, redirect, url_for, flash, send_from_directory, stream_with_context, has_request_context, g
+from pymongo import ASCENDING, DESCENDING, TEXT, ReturnDocument, UpdateOne
+from pymongo.errors import OperationFailure, DuplicateKeyError
 from bson.objectid import ObjectId
 from flask_bcrypt import Bcrypt
-from datetime import datetime
+import click
+from datetime import datetime, timedelta
 from werkzeug.utils import secure_filename
+from werkzeug.middleware.proxy_fix import ProxyFix
 from dotenv import load_dotenv
 import certifi
-import cloudinary
-import cloudinary.uploader
-from bardapi import Bard
+import time
+import uuid
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from chatbot import ChatService, ChatbotUnavailable, ChatbotTimeout, get_llm_backend
+from storage import get_storage_backend, storage_backend_name
+from assignment import AssignmentEngine
+from events import FirEventFeed, FeedFull, cooperative_worker
+from archive import FirArchive
+from duplicates import DuplicateDetector
+from ingest import FirImporter, INGEST_FORMATS, read_rows
+from ratelimit import RateLimiter, ConcurrencyLimiter, RateLimited, parse_limits
+import metrics
+from database import MongoConnection, client_options_from_env, read_preference_from_env
+from json_provider import MongoJSONProvider, stream_json_object
 
 load_dotenv(dotenv_path='.env.public')
 load_dotenv(dotenv_path='.env.private')
 
 
 app = Flask(__name__)
+app.json = MongoJSONProvider(app)
 app.secret_key = os.getenv('FLASK_SECRET_KEY')
 
-bard_session_id = os.getenv('BARD_SESSION_ID')
-bard_chatbot = None
-if bard_session_id:
-    try:
-        bard_chatbot = Bard(token=bard_session_id)
-        print("✅ BardAPI Chatbot configured successfully.")
-    except Exception as e:
-        print(f"❌ Error configuring BardAPI: {e}")
-else:
-    print("⚠️ BARD_SESSION_ID not found in .env. Chatbot will be disabled.")
+# --- METRICS ---
+# Per-process Prometheus metrics, served on /metrics.
+metrics_registry = metrics.Registry()
+request_seconds = metrics_registry.histogram(
+    'fir_http_request_duration_seconds', 'Time spent handling a request.', ('route', 'method', 'status'))
+mongo_command_seconds = metrics_registry.histogram(
+    'fir_mongo_command_duration_seconds', 'MongoDB command latency by the route that issued it.', ('route', 'command'))
+mongo_commands_per_request = metrics_registry.histogram(
+    'fir_mongo_commands_per_request', 'MongoDB commands issued while handling one request.', ('route',),
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 50, 100))
+external_call_seconds = metrics_registry.histogram(
+    'fir_external_call_duration_seconds', 'Time spent in storage, chatbot and bcrypt calls.', ('operation',))
+slow_requests_total = metrics_registry.counter(
+    'fir_slow_requests', 'Requests slower than SLOW_REQUEST_MS.', ('route',))
+rejected_requests_total = metrics_registry.counter(
+    'fir_rejected_requests', 'Requests turned away by rate limits or concurrency caps.', ('route_class', 'reason'))
+
+# Requests slower than this many milliseconds are logged with their Mongo commands; 0 turns the log off.
+SLOW_REQUEST_MS = float(os.getenv('SLOW_REQUEST_MS', 0))
+# When set, /metrics requires 'Authorization: Bearer <METRICS_TOKEN>'.
+METRICS_TOKEN = os.getenv('METRICS_TOKEN')
+
+
+# --- LAZY SERVICES ---
+# Building the chatbot or storage backend can import their SDKs and contact
+# the upstream service, so each is created on first use in each process
+# rather than when this module is imported.
+_services = {}
+_services_lock = threading.Lock()
+
+
+def _forget_services():
+    global _services_lock
+    _services_lock = threading.Lock()
+    _services.clear()
+
+
+os.register_at_fork(after_in_child=_forget_services)
+
+
+def lazy_service(name, factory):
+    service = _services.get(name)
+    if service is None:
+        with _services_lock:
+            service = _services.get(name)
+            if service is None:
+                service = _services[name] = factory()
+    return service
+
+
+def get_chat_service():
+    return lazy_service('chat', lambda: ChatService.from_env(
+        get_llm_backend(),
+        call_timer=lambda operation: external_call_seconds.time(operation=f'chatbot_{operation}')
+    ))
+
+
+def get_storage():
+    return lazy_service('storage', lambda: get_storage_backend(STORAGE_BACKEND))
+
 
 MONGO_URI = os.getenv('MONGO_URI')
 if not MONGO_URI:
     raise RuntimeError("MONGO_URI not set in .env file")
 
-client = MongoClient(MONGO_URI, tlsCAFile=certifi.where())
-db = client.get_database('fir_filing_db')
-users_collection = db.users
-admins_collection = db.admins
-firs_collection = db.firs
-officers_collection = db.officers
+# Atlas needs certifi's CA bundle; set MONGO_TLS=false for a plain local mongod.
+mongo_tls_options = {'tlsCAFile': certifi.where()} if os.getenv('MONGO_TLS', 'true').lower() != 'false' else {}
+# The client itself is created on first use in each worker, never before the
+# server forks. Pool sizes, timeouts and write concern come from MONGO_* env vars
+# (see database.CLIENT_OPTIONS_FROM_ENV).
+mongo = MongoConnection(
+    MONGO_URI, os.getenv('MONGO_DB_NAME', 'fir_filing_db'),
+    client_options={**mongo_tls_options, **client_options_from_env()},
+    event_listeners=[metrics.MongoCommandListener(mongo_command_seconds)]
+)
+users_collection = mongo.collection('users')
+admins_collection = mongo.collection('admins')
+firs_collection = mongo.collection('firs')
+officers_collection = mongo.collection('officers')
+evidence_deletions_collection = mongo.collection('evidence_deletions')
+fir_rollups_collection = mongo.collection('fir_rollups')
+app_meta_collection = mongo.collection('app_meta')
+chat_history_collection = mongo.collection('chat_history')
+officer_workloads_collection = mongo.collection('officer_workloads')
+fir_feed_collection = mongo.collection('fir_feed')
+fir_events_collection = mongo.collection('fir_events')
+firs_archive_collection = mongo.collection('firs_archive')
+change_counters_collection = mongo.collection('change_counters')
+fir_duplicates_collection = mongo.collection('fir_duplicates')
+rate_limits_collection = mongo.collection('rate_limits')
+
+# Read-heavy paths (analytics, the station list, dashboard listings) can be sent
+# to secondaries, e.g. MONGO_READ_HEAVY_PREFERENCE=secondaryPreferred, with reads
+# no more than MONGO_MAX_STALENESS_SECONDS behind the primary. Writes, and reads
+# that feed a write, always use the collections above.
+READ_HEAVY_PREFERENCE = read_preference_from_env('MONGO_READ_HEAVY_PREFERENCE', 'MONGO_MAX_STALENESS_SECONDS')
+firs_read_collection = mongo.collection('firs', READ_HEAVY_PREFERENCE)
+firs_archive_read_collection = mongo.collection('firs_archive', READ_HEAVY_PREFERENCE)
+admins_read_collection = mongo.collection('admins', READ_HEAVY_PREFERENCE)
+officers_read_collection = mongo.collection('officers', READ_HEAVY_PREFERENCE)
+fir_rollups_read_collection = mongo.collection('fir_rollups', READ_HEAVY_PREFERENCE)
+fir_events_read_collection = mongo.collection('fir_events', READ_HEAVY_PREFERENCE)
+app_meta_read_collection = mongo.collection('app_meta', READ_HEAVY_PREFERENCE)
+# Read alongside the views they version, so a lagging secondary never pairs a
+# new version with old data.
+change_counters_read_collection = mongo.collection('change_counters', READ_HEAVY_PREFERENCE)
 
 bcrypt = Bcrypt(app)
 
-cloudinary.config(
-    cloud_name=os.getenv('CLOUDINARY_CLOUD_NAME'),
-    api_key=os.getenv('CLOUDINARY_API_KEY'),
-    api_secret=os.getenv('CLOUDINARY_API_SECRET')
+
+def hash_password(password):
+    with external_call_seconds.time(operation='bcrypt_hash'):
+        return bcrypt.generate_password_hash(password).decode('utf-8')
+
+
+def check_password(password_hash, password):
+    with external_call_seconds.time(operation='bcrypt_check'):
+        return bcrypt.check_password_hash(password_hash, password)
+
+FIR_STATUSES = ['Pending', 'Under Investigation', 'Resolved']
+OPEN_FIR_STATUSES = ['Pending', 'Under Investigation']
+
+# 'least_loaded' or 'category_affinity' assigns new FIRs to an officer as they
+# are filed; empty leaves every assignment to the station admin.
+AUTO_ASSIGN_STRATEGY = os.getenv('AUTO_ASSIGN_STRATEGY', '').lower()
+if AUTO_ASSIGN_STRATEGY and AUTO_ASSIGN_STRATEGY not in AssignmentEngine.STRATEGIES:
+    raise RuntimeError(f"Unknown AUTO_ASSIGN_STRATEGY '{AUTO_ASSIGN_STRATEGY}'. "
+                       f"Expected one of: {', '.join(AssignmentEngine.STRATEGIES)}")
+# Category affinity keeps routing a category to the same officer until they are
+# this many open cases busier than the least-loaded officer.
+ASSIGNMENT_AFFINITY_BAND = int(os.getenv('ASSIGNMENT_AFFINITY_BAND', 3))
+assignment_engine = AssignmentEngine(officers_collection, officer_workloads_collection,
+                                     OPEN_FIR_STATUSES, ASSIGNMENT_AFFINITY_BAND, firs=firs_collection)
+
+# Near-duplicate detection at submission: FIRs of the same station with an
+# incident within DUPLICATE_WINDOW_DAYS whose text is at least
+# DUPLICATE_THRESHOLD similar are listed for review on /admin/duplicates.
+DUPLICATE_DETECTION = os.getenv('DUPLICATE_DETECTION', 'true').lower() != 'false'
+duplicate_detector = DuplicateDetector(
+    fir_duplicates_collection,
+    num_perm=int(os.getenv('DUPLICATE_SIGNATURE_SIZE', 64)),
+    bands=int(os.getenv('DUPLICATE_BANDS', 16)),
+    threshold=float(os.getenv('DUPLICATE_THRESHOLD', 0.5)),
+    window_days=int(os.getenv('DUPLICATE_WINDOW_DAYS', 3))
 )
 
-def sync_admins_from_env():
-    print("Synchronizing admin data from .env file...")
+# --- ADMISSION CONTROL CONFIG ---
+# POSTs to these endpoints hash passwords, upload evidence or call the LLM, so
+# each class gets token-bucket rate limits and a cap on concurrent requests.
+ROUTE_CLASSES = {
+    'user_login': 'auth', 'admin_login': 'auth', 'register': 'auth',
+    'submit_fir': 'upload',
+    'chatbot_ask': 'chatbot', 'chatbot_stream': 'chatbot',
+}
+# RATE_LIMIT_<CLASS> is a list of <scope>=<requests>/<seconds> buckets (see
+# ratelimit.parse_limits). 'user' is the session user, or for auth routes the
+# account being logged into or registered, which slows credential stuffing
+# spread over many addresses.
+RATE_LIMIT_DEFAULTS = {
+    'auth': 'ip=20/60,user=10/300,route=50/1',
+    'upload': 'ip=30/3600,user=10/3600,route=10/1',
+    'chatbot': 'ip=60/60,user=20/60,route=20/1',
+}
+RATE_LIMITS = {
+    route_class: parse_limits(os.getenv(f'RATE_LIMIT_{route_class.upper()}', default))
+    for route_class, default in RATE_LIMIT_DEFAULTS.items()
+}
+# In-flight requests of each class per worker process; 0 removes the cap.
+# Keep the sum below the worker's thread count so cheap reads always find a thread.
+CONCURRENCY_LIMITS = {
+    route_class: int(os.getenv(f'CONCURRENCY_LIMIT_{route_class.upper()}', 4))
+    for route_class in RATE_LIMIT_DEFAULTS
+}
+# Retry-After sent when a class is at its concurrency cap.
+OVERLOAD_RETRY_AFTER = int(os.getenv('OVERLOAD_RETRY_AFTER', 1))
+rate_limiter = RateLimiter(rate_limits_collection, backend=os.getenv('RATE_LIMIT_BACKEND', 'mongo').lower())
+concurrency_limiter = ConcurrencyLimiter(CONCURRENCY_LIMITS)
+# Behind a reverse proxy every client shares the proxy's address; set this to
+# the number of proxies that append to X-Forwarded-For so limits see the client.
+TRUSTED_PROXY_COUNT = int(os.getenv('TRUSTED_PROXY_COUNT', 0))
+if TRUSTED_PROXY_COUNT:
+    app.wsgi_app = ProxyFix(app.wsgi_app, x_for=TRUSTED_PROXY_COUNT)
+
+# Upper bound on FIR ids accepted by one bulk status/assignment request.
+MAX_BULK_FIRS = int(os.getenv('MAX_BULK_FIRS', 500))
+# Rounds a bulk update retries the FIRs that another request changed after they were read.
+BULK_UPDATE_ATTEMPTS = int(os.getenv('BULK_UPDATE_ATTEMPTS', 3))
+
+FIR_PAGE_SIZE = int(os.getenv('FIR_PAGE_SIZE', 25))
+MAX_FIR_PAGE_SIZE = int(os.getenv('MAX_FIR_PAGE_SIZE', 100))
+
+# Listings are ordered newest first; _id breaks ties between FIRs filed in the
+# same millisecond so the (filed_date, _id) pair is a stable keyset cursor.
+FIR_LIST_SORT = [('filed_date', DESCENDING), ('_id', DESCENDING)]
+
+# Resolved FIRs move to firs_archive this many days after resolution ('flask archive-firs').
+FIR_ARCHIVE_AFTER_DAYS = int(os.getenv('FIR_ARCHIVE_AFTER_DAYS', 180))
+FIR_ARCHIVE_BATCH_SIZE = int(os.getenv('FIR_ARCHIVE_BATCH_SIZE', 500))
+fir_archive = FirArchive(firs_collection, firs_archive_collection, fir_events_collection,
+                         app_meta_collection, FIR_LIST_SORT,
+                         # Archived FIRs drop off the station dashboards.
+                         on_move=lambda docs: bump_change_counters(station_change_keys(docs)))
+
+# 'flask import-firs' writes legacy FIRs this many rows per insert_many.
+IMPORT_BATCH_SIZE = int(os.getenv('IMPORT_BATCH_SIZE', 1000))
+fir_importer = FirImporter(firs_collection, FIR_STATUSES, on_insert=lambda docs: record_imported_firs(docs))
+
+# Only the columns each list view shows. Full documents are loaded through /fir/<fir_id>.
+ADMIN_FIR_LIST_PROJECTION = {
+    'user_name': 1, 'category': 1, 'other_category': 1, 'fir_status': 1,
+    'assigned_officer_name': 1, 'filed_date': 1
+}
+ASSIGNMENT_FIR_LIST_PROJECTION = {
+    'category': 1, 'fir_status': 1, 'assigned_officer_id': 1,
+    'assigned_officer_name': 1, 'filed_date': 1
+}
+FIR_SEARCH_WEIGHTS = {
+    'user_name': 5, 'mobile': 5, 'accused_names': 3, 'location': 2, 'description': 1
+}
+# Order of merged text search results: the textScore projected as 'score', then newest first.
+FIR_SEARCH_SORT = [('score', DESCENDING), ('_id', DESCENDING)]
+
+USER_FIR_LIST_PROJECTION = {
+    'fir_status': 1, 'assigned_officer_name': 1, 'filed_date': 1
+}
+
+# Fields carried by live dashboard events: enough to draw or patch a list row.
+FIR_EVENT_FIELDS = sorted(set(ADMIN_FIR_LIST_PROJECTION) | set(USER_FIR_LIST_PROJECTION) | {'assigned_officer_id'})
+
+# 'auto' follows the feed with a change stream on replica sets and a tailable
+# cursor on a standalone mongod; 'local' only reaches this process's browsers.
+# FIR_EVENTS_MAX_SUBSCRIBERS caps streams per process under a gevent/eventlet
+# worker; under thread-per-request workers the cap is half of WORKER_THREADS
+# (set it to gunicorn's --threads) so streams cannot starve ordinary requests.
+fir_event_feed = FirEventFeed(
+    fir_feed_collection,
+    mode=os.getenv('FIR_EVENTS_MODE', 'auto').lower(),
+    size_bytes=int(os.getenv('FIR_FEED_SIZE_MB', 16)) * 1024 * 1024,
+    max_subscribers=int(os.getenv('FIR_EVENTS_MAX_SUBSCRIBERS', 500))
+)
+WORKER_THREADS = int(os.getenv('WORKER_THREADS', 1))
+FIR_EVENTS_KEEPALIVE = int(os.getenv('FIR_EVENTS_KEEPALIVE', 15))
+FIR_EVENTS_RETRY_MS = int(os.getenv('FIR_EVENTS_RETRY_MS', 3000))
+
+# How dashboards receive FIR changes. 'stream' holds an SSE connection open per
+# dashboard; 'poll' has them fetch /events/poll every FIR_EVENTS_POLL_MS.
+# 'auto' streams only under a gevent or eventlet worker (gunicorn -k gevent)
+# and while the feed reaches every worker, and tells browsers to poll otherwise.
+FIR_EVENTS_TRANSPORTS = ('auto', 'stream', 'poll')
+FIR_EVENTS_TRANSPORT = os.getenv('FIR_EVENTS_TRANSPORT', 'auto').lower()
+if FIR_EVENTS_TRANSPORT not in FIR_EVENTS_TRANSPORTS:
+    raise RuntimeError(f"Unknown FIR_EVENTS_TRANSPORT '{FIR_EVENTS_TRANSPORT}'. "
+                       f"Expected one of: {', '.join(FIR_EVENTS_TRANSPORTS)}")
+FIR_EVENTS_POLL_MS = int(os.getenv('FIR_EVENTS_POLL_MS', 5000))
+FIR_EVENTS_POLL_LIMIT = int(os.getenv('FIR_EVENTS_POLL_LIMIT', 200))
+
+STORAGE_BACKEND = storage_backend_name()
+
+# 'parallel' uploads evidence inside the request on the pool below; 'deferred'
+# inserts the FIR straight away and lets the pool patch documents in afterwards.
+UPLOAD_MODE = os.getenv('UPLOAD_MODE', 'parallel').lower()
+UPLOAD_WORKERS = int(os.getenv('UPLOAD_WORKERS', 4))
+UPLOAD_RETRIES = int(os.getenv('UPLOAD_RETRIES', 3))
+# Deferred uploads live only in the worker that queued them. A slot still
+# 'pending' this many minutes after filing belonged to a worker that restarted
+# mid-upload, and the reaper marks it 'failed' so the FIR shows it.
+UPLOAD_STALE_MINUTES = int(os.getenv('UPLOAD_STALE_MINUTES', 30))
+upload_executor = ThreadPoolExecutor(max_workers=UPLOAD_WORKERS, thread_name_prefix='evidence-upload')
+
+# How often a worker checks whether another worker's admin sync changed the station list.
+STATION_REGISTRY_REFRESH = int(os.getenv('STATION_REGISTRY_REFRESH', 60))
+STATION_LIST_MAX_AGE = int(os.getenv('STATION_LIST_MAX_AGE', 300))
+
+# Chat history keeps the last CHAT_HISTORY_MAX_TURNS question/answer pairs per
+# user and is dropped CHAT_HISTORY_TTL seconds after the user's last message.
+CHAT_HISTORY_MAX_TURNS = int(os.getenv('CHAT_HISTORY_MAX_TURNS', 50))
+CHAT_HISTORY_TTL = int(os.getenv('CHAT_HISTORY_TTL', 30 * 24 * 3600))
+CHAT_HISTORY_PAGE_SIZE = int(os.getenv('CHAT_HISTORY_PAGE_SIZE', 40))
+
+# Seconds between outbox drains by the in-process reaper; 0 leaves it to the CLI.
+EVIDENCE_REAPER_INTERVAL = int(os.getenv('EVIDENCE_REAPER_INTERVAL', 30))
+EVIDENCE_DELETE_MAX_ATTEMPTS = int(os.getenv('EVIDENCE_DELETE_MAX_ATTEMPTS', 5))
+# Objects younger than this are never treated as orphans: they may belong to an upload in flight.
+EVIDENCE_ORPHAN_GRACE_HOURS = int(os.getenv('EVIDENCE_ORPHAN_GRACE_HOURS', 24))
+
+# --- STATION REGISTRY ---
+# The police station list only changes when admins are synced, so each worker
+# builds it once and keeps it in memory. A version counter in app_meta tells
+# other workers when a sync changed it.
+_station_registry = None
+_station_registry_lock = threading.Lock()
+
+
+def bump_station_registry_version():
+    app_meta_collection.update_one({'_id': 'station_registry'}, {'$inc': {'version': 1}}, upsert=True)
+    invalidate_station_registry()
+
+
+def invalidate_station_registry():
+    global _station_registry
+    with _station_registry_lock:
+        _station_registry = None
+
+
+def _stored_station_registry_version():
+    # Read from the same members as the registry itself, so a lagging
+    # secondary never pairs a new version with an old station list.
+    meta = app_meta_read_collection.find_one({'_id': 'station_registry'}) or {}
+    return meta.get('version', 0)
+
+
+def _build_station_registry(version):
+    stations_by_district = {}
+    station_districts = {}
+    for station_doc in admins_read_collection.find({}, {'station_name': 1, '_id': 0}):
+        full_name = station_doc.get('station_name', '')
+        parts = full_name.split(', ')
+        if len(parts) == 2:
+            district = parts[1]
+            stations_by_district.setdefault(district, []).append({'name': full_name})
+            station_districts[full_name] = district
+
+    body = json.dumps(stations_by_district, sort_keys=True)
+    return {
+        'version': version,
+        'checked_at': time.monotonic(),
+        'station_districts': station_districts,
+        'body': body,
+        'etag': hashlib.sha256(body.encode('utf-8')).hexdigest()
+    }
+
+
+def get_station_registry():
+    """
+    Returns the cached registry, rebuilding it on first use or when the stored
+    version has moved on. The version is re-read at most every
+    STATION_REGISTRY_REFRESH seconds.
+    """
+    global _station_registry
+    registry = _station_registry
+    if registry and time.monotonic() - registry['checked_at'] < STATION_REGISTRY_REFRESH:
+        return registry
+
+    with _station_registry_lock:
+        version = _stored_station_registry_version()
+        if _station_registry and _station_registry['version'] == version:
+            _station_registry['checked_at'] = time.monotonic()
+        else:
+            _station_registry = _build_station_registry(version)
+        return _station_registry
+
+
+def read_admins_from_env():
+    """
+    Returns the complete ADMIN_n_* records from the environment as a list of
+    dicts, or None when ADMIN_COUNT is missing or invalid.
+    """
     try:
         admin_count = int(os.getenv('ADMIN_COUNT', 0))
     except (ValueError, TypeError):
         print("Warning: ADMIN_COUNT in .env is not a valid number. No sync will occur.")
-        return
+        return None
 
     if admin_count == 0:
-        print("Warning: ADMIN_COUNT is 0 or not found in .env. No admins will be created.")
-        return
+        print("Warning: ADMIN_COUNT is 0 or not found in .env. No admins or officers will be created.")
+        return None
 
+    admins = []
     for i in range(1, admin_count + 1):
         admin_id = os.getenv(f'ADMIN_{i}_ID')
         password = os.getenv(f'ADMIN_{i}_PASS')
@@ -68,80 +419,932 @@ def sync_admins_from_env():
         if not all([admin_id, password, station_name]):
             print(f"Warning: Missing full details for ADMIN_{i}. Skipping this record.")
             continue
+        admins.append({'admin_id': admin_id, 'password': password, 'station_name': station_name})
+    return admins
 
-        existing_admin = admins_collection.find_one({"admin_id": admin_id})
-
-        if existing_admin:
-            if existing_admin.get('station_name') != station_name or not bcrypt.check_password_hash(existing_admin['password'], password):
-                hashed_password = bcrypt.generate_password_hash(password).decode('utf-8')
-                admins_collection.update_one(
-                    {"admin_id": admin_id},
-                    {"$set": {
-                        "password": hashed_password,
-                        "station_name": station_name
-                    }}
-                )
-                print(f"Updated details for admin: {admin_id}")
-        else:
-            hashed_password = bcrypt.generate_password_hash(password).decode('utf-8')
-            admin_doc = {
-                "admin_id": admin_id,
-                "password": hashed_password,
-                "station_name": station_name
-            }
-            admins_collection.insert_one(admin_doc)
-            print(f"Created new admin: {admin_id}")
 
+def credentials_fingerprint(admin_id, password, password_hash):
+    """
+    Keyed digest of the env credentials and the stored bcrypt hash. If it still
+    matches at the next sync, the password has not changed and bcrypt can be
+    skipped. Without FLASK_SECRET_KEY no fingerprint is kept and bcrypt always runs.
+    """
+    if not app.secret_key:
+        return None
+    message = f"{admin_id}\0{password}\0{password_hash}".encode('utf-8')
+    return hmac.new(app.secret_key.encode('utf-8'), message, hashlib.sha256).hexdigest()
+
+
+def sync_admins_from_env(admins=None):
+    """
+    Creates or updates the admin accounts from the env with one read and one
+    bulk_write. bcrypt only runs for new admins, changed passwords and records
+    without a matching fingerprint, and those calls run on a thread pool.
+    """
+    print("Synchronizing admin data from .env file...")
+    if admins is None:
+        admins = read_admins_from_env()
+    if not admins:
+        return
+
+    existing_admins = {
+        doc['admin_id']: doc for doc in admins_collection.find(
+            {'admin_id': {'$in': [admin['admin_id'] for admin in admins]}},
+            {'admin_id': 1, 'password': 1, 'station_name': 1, 'credentials_fingerprint': 1}
+        )
+    }
+
+    def plan(admin):
+        existing = existing_admins.get(admin['admin_id'])
+        if existing:
+            fingerprint = credentials_fingerprint(admin['admin_id'], admin['password'], existing['password'])
+            password_unchanged = (
+                (fingerprint and existing.get('credentials_fingerprint') == fingerprint)
+                or check_password(existing['password'], admin['password'])
+            )
+            if password_unchanged:
+                if existing.get('station_name') == admin['station_name'] and existing.get('credentials_fingerprint') == fingerprint:
+                    return None
+                return {'station_name': admin['station_name'], 'credentials_fingerprint': fingerprint}
+
+        hashed_password = hash_password(admin['password'])
+        return {
+            'password': hashed_password,
+            'station_name': admin['station_name'],
+            'credentials_fingerprint': credentials_fingerprint(admin['admin_id'], admin['password'], hashed_password)
+        }
+
+    with ThreadPoolExecutor(max_workers=os.cpu_count() or 4) as pool:
+        changes = list(pool.map(plan, admins))
+
+    operations = []
+    stations_changed = False
+    for admin, change in zip(admins, changes):
+        if change is None:
+            continue
+        existing = existing_admins.get(admin['admin_id'])
+        if not existing or existing.get('station_name') != admin['station_name']:
+            stations_changed = True
+        print(f"{'Updated details for' if existing else 'Created new'} admin: {admin['admin_id']}")
+        operations.append(UpdateOne({'admin_id': admin['admin_id']}, {'$set': change}, upsert=True))
+
+    if operations:
+        admins_collection.bulk_write(operations, ordered=False)
+    if stations_changed:
+        bump_station_registry_version()
     print("Admin synchronization complete.")
 
 # --- NEW FUNCTION TO ADD OFFICERS ---
-def sync_officers_from_env():
+def sync_officers_from_env(admins=None):
     """
     Reads admin data from .env file and creates 5 police officers
     for each police station, if they don't already exist.
     """
     print("Synchronizing officer data...")
-    try:
-        admin_count = int(os.getenv('ADMIN_COUNT', 0))
-    except (ValueError, TypeError):
-        print("Warning: ADMIN_COUNT in .env is not a valid number. Officer sync will be skipped.")
+    if admins is None:
+        admins = read_admins_from_env()
+    if not admins:
         return
 
-    if admin_count == 0:
-        print("Warning: ADMIN_COUNT is 0. No officers will be created.")
-        return
+    operations = []
+    officer_docs = []
+    now = datetime.utcnow()
+    for admin in admins:
+        admin_id = admin['admin_id']
+        station_name = admin['station_name']
 
-    for i in range(1, admin_count + 1):
-        admin_id = os.getenv(f'ADMIN_{i}_ID')
-        station_name = os.getenv(f'ADMIN_{i}_STATION')
-
-        if not admin_id or not station_name:
-            print(f"Warning: Missing ID or Station for ADMIN_{i}. Skipping officer creation for this station.")
-            continue
-        
         # Generate a badge prefix from the admin ID, e.g., PSTOSHAM01 -> TOSHAM
         badge_prefix = admin_id.replace("PS", "")
         badge_prefix = ''.join([char for char in badge_prefix if not char.isdigit()])
 
         for j in range(1, 6):  # Create 5 officers per station
             station_short_name = station_name.split(',')[0]
-            officer_name = f"{station_short_name} Officer {j}"
-            badge_id = f"{badge_prefix}{j:02}"  # e.g., TOSHAM01, TOSHAM02
-
-            existing_officer = officers_collection.find_one({"badge_id": badge_id})
-
-            if not existing_officer:
-                officer_doc = {
-                    'name': officer_name,
-                    'badge_id': badge_id,
-                    'station_name': station_name,
-                    'is_active': True,
-                    'created_at': datetime.utcnow()
-                }
-                officers_collection.insert_one(officer_doc)
-                print(f"Created officer: {officer_name} ({badge_id}) for {station_name}")
+            officer_doc = {
+                'name': f"{station_short_name} Officer {j}",
+                'badge_id': f"{badge_prefix}{j:02}",  # e.g., TOSHAM01, TOSHAM02
+                'station_name': station_name,
+                'is_active': True,
+                'open_cases': 0,
+                'created_at': now
+            }
+            officer_docs.append(officer_doc)
+            # $setOnInsert leaves officers that already exist untouched.
+            operations.append(UpdateOne({'badge_id': officer_doc['badge_id']}, {'$setOnInsert': officer_doc}, upsert=True))
+
+    result = officers_collection.bulk_write(operations, ordered=False)
+    for index in result.upserted_ids:
+        officer_doc = officer_docs[index]
+        print(f"Created officer: {officer_doc['name']} ({officer_doc['badge_id']}) for {officer_doc['station_name']}")
+    bump_change_counters(station_change_keys(officer_docs[index] for index in result.upserted_ids))
 # --- END OF NEW FUNCTION ---
 
+
+def admins_env_digest(admins):
+    """Keyed digest of the whole admin configuration, used to skip syncs that would change nothing."""
+    if not app.secret_key:
+        return None
+    payload = json.dumps(admins, sort_keys=True).encode('utf-8')
+    return hmac.new(app.secret_key.encode('utf-8'), payload, hashlib.sha256).hexdigest()
+
+
+def acquire_sync_lock(owner, ttl_seconds=300):
+    """
+    Takes the deployment-wide sync lock in app_meta. The lock expires after
+    ttl_seconds so a worker that dies mid-sync cannot block the next boot.
+    """
+    now = datetime.utcnow()
+    try:
+        app_meta_collection.find_one_and_update(
+            {'_id': 'account_sync_lock', 'expires_at': {'$lt': now}},
+            {'$set': {'owner': owner, 'expires_at': now + timedelta(seconds=ttl_seconds)}},
+            upsert=True
+        )
+        return True
+    except DuplicateKeyError:
+        return False
+
+
+def release_sync_lock(owner):
+    app_meta_collection.delete_one({'_id': 'account_sync_lock', 'owner': owner})
+
+
+def sync_accounts(force=False):
+    """
+    Runs the admin and officer sync once per deployment. Workers that boot with
+    an env whose digest has already been synced return after a single read,
+    and only the worker holding the lock does the actual sync.
+    """
+    admins = read_admins_from_env()
+    if admins is None:
+        return
+
+    digest = admins_env_digest(admins)
+
+    def already_synced():
+        state = app_meta_collection.find_one({'_id': 'account_sync'}) or {}
+        return not force and digest is not None and state.get('digest') == digest
+
+    if already_synced():
+        print("Admin and officer data already in sync.")
+        return
+
+    owner = uuid.uuid4().hex
+    if not acquire_sync_lock(owner):
+        print("Another worker is synchronizing admin and officer data. Skipping.")
+        return
+
+    try:
+        if already_synced():
+            return
+        sync_admins_from_env(admins)
+        sync_officers_from_env(admins)
+        app_meta_collection.update_one(
+            {'_id': 'account_sync'},
+            {'$set': {'digest': digest, 'synced_at': datetime.utcnow()}},
+            upsert=True
+        )
+    finally:
+        release_sync_lock(owner)
+
+
+@app.cli.command('sync-accounts')
+@click.option('--force', is_flag=True, help='Sync even if this configuration was already synced.')
+def sync_accounts_command(force):
+    """Create or update admins and officers from the ADMIN_n_* env settings."""
+    sync_accounts(force=force)
+
+
+# --- INDEXES ---
+# Each entry is (collection, keys, options). The keys mirror the filter + sort
+# shape of the route queries so none of them needs a COLLSCAN or in-memory SORT.
+INDEX_SPECS = [
+    (users_collection, [('username', ASCENDING)], {'unique': True}),
+    (admins_collection, [('admin_id', ASCENDING)], {'unique': True}),
+    (officers_collection, [('badge_id', ASCENDING)], {'unique': True}),
+    (officers_collection, [('station_name', ASCENDING), ('is_active', ASCENDING), ('name', ASCENDING)], {}),
+    (officers_collection, [('station_name', ASCENDING), ('name', ASCENDING)], {}),
+    (firs_collection, [('police_station', ASCENDING)] + FIR_LIST_SORT, {}),
+    (firs_collection, [('police_station', ASCENDING), ('fir_status', ASCENDING)] + FIR_LIST_SORT, {}),
+    (firs_collection, [('supporting_documents.public_id', ASCENDING)], {'sparse': True}),
+    (firs_collection, [('supporting_documents.status', ASCENDING), ('filed_date', ASCENDING)], {'sparse': True}),
+    (fir_rollups_collection, [('police_station', ASCENDING), ('day', ASCENDING), ('category', ASCENDING),
+                              ('fir_status', ASCENDING), ('assigned_officer_id', ASCENDING)], {'unique': True}),
+    (chat_history_collection, [('updated_at', ASCENDING)], {'expireAfterSeconds': CHAT_HISTORY_TTL}),
+    (evidence_deletions_collection, [('status', ASCENDING), ('next_attempt_at', ASCENDING)], {}),
+    (evidence_deletions_collection, [('public_id', ASCENDING)], {}),
+    (evidence_deletions_collection, [('claim_id', ASCENDING)], {'sparse': True}),
+    (firs_collection, [('username', ASCENDING)] + FIR_LIST_SORT, {}),
+    (firs_collection, [('police_station', ASCENDING), ('assigned_officer_id', ASCENDING)] + FIR_LIST_SORT, {}),
+    # police_station is an equality prefix of the text index, so a search only
+    # walks the postings of the admin's own station. Both tiers are searched.
+    *[(collection, [('police_station', ASCENDING)] + [(field, TEXT) for field in FIR_SEARCH_WEIGHTS],
+       {'name': 'fir_search_text', 'weights': FIR_SEARCH_WEIGHTS})
+      for collection in (firs_collection, firs_archive_collection)],
+    *assignment_engine.index_specs,
+    *fir_event_feed.index_specs,
+    *fir_archive.index_specs,
+    *duplicate_detector.index_specs,
+    *rate_limiter.index_specs,
+    *fir_importer.index_specs,
+    (fir_events_collection, [('fir_id', ASCENDING), ('at', ASCENDING), ('_id', ASCENDING)], {}),
+    (fir_events_collection, [('police_station', ASCENDING), ('metric', ASCENDING), ('at', ASCENDING)], {}),
+]
+
+
+def ensure_indexes():
+    """
+    Creates every index in INDEX_SPECS. create_index is a no-op when the
+    index already exists, so this is safe to run on every start.
+    """
+    print("Ensuring MongoDB indexes...")
+    # Must exist as a capped collection before create_index would create it as a plain one.
+    fir_event_feed.ensure_collection()
+    for collection, keys, options in INDEX_SPECS:
+        try:
+            collection.create_index(keys, **options)
+        except OperationFailure as e:
+            print(f"Warning: Could not create index {keys} on {collection.name}: {e}")
+    print("Index creation complete.")
+
+
+def _winning_plan_stages(explain_output):
+    """Yields every stage name found under a 'winningPlan' in an explain document."""
+    def walk(node, in_plan):
+        if isinstance(node, dict):
+            if in_plan and 'stage' in node:
+                yield node['stage']
+            for key, value in node.items():
+                if key == 'rejectedPlans':
+                    continue
+                yield from walk(value, in_plan or key == 'winningPlan')
+        elif isinstance(node, list):
+            for item in node:
+                yield from walk(item, in_plan)
+    return list(walk(explain_output, False))
+
+
+def route_query_plans():
+    """
+    Returns (name, explain_output) for the query each route issues, using
+    sample values taken from the database where available.
+    """
+    sample_admin = admins_collection.find_one({}, {'station_name': 1}) or {}
+    station_name = sample_admin.get('station_name', 'Sample Police Station, Sample')
+    sample_user = users_collection.find_one({}, {'username': 1}) or {}
+    username = sample_user.get('username', 'sample_user')
+    least_loaded_query, least_loaded_sort = assignment_engine.least_loaded_query(station_name)
+    affinity_query, affinity_sort = assignment_engine.affinity_query(station_name, 'Theft')
+
+    return [
+        ('admin_dashboard', firs_collection.find(
+            {'police_station': station_name}, ADMIN_FIR_LIST_PROJECTION).sort(FIR_LIST_SORT).explain()),
+        ('manage_officers (firs)', firs_collection.find({
+            'police_station': station_name,
+            'fir_status': {'$in': OPEN_FIR_STATUSES}
+        }, ASSIGNMENT_FIR_LIST_PROJECTION).sort(FIR_LIST_SORT).explain()),
+        ('manage_officers (officers)', officers_collection.find(
+            {'station_name': station_name, 'is_active': True}).sort("name", 1).explain()),
+        ('get_station_officers', officers_collection.find(
+            {'station_name': station_name}, {'_id': 0}).sort("name", 1).explain()),
+        ('assign_officer', officers_collection.find(
+            {'badge_id': 'SAMPLE01', 'station_name': station_name}).explain()),
+        ('get_user_firs', firs_collection.find(
+            {'username': username}, USER_FIR_LIST_PROJECTION).sort(FIR_LIST_SORT).explain()),
+        ('get_user_firs (archive)', firs_archive_collection.find(
+            {'username': username}, USER_FIR_LIST_PROJECTION).sort(FIR_LIST_SORT).explain()),
+        ('archive-firs', firs_collection.find(
+            {'fir_status': 'Resolved', '_id': {'$gt': ObjectId('0' * 24)}}, {'filed_date': 1}).sort('_id', 1).explain()),
+        ('user_login / register', users_collection.find({'username': username}).explain()),
+        ('admin_login', admins_collection.find({'admin_id': 'SAMPLE'}).explain()),
+        ('analytics_data', fir_rollups_collection.find(
+            {'police_station': station_name, 'day': {'$gte': datetime(2000, 1, 1)}},
+            {'_id': 0, 'police_station': 0}).explain()),
+        ('get_fir_timeline', fir_events_collection.find(
+            {'fir_id': ObjectId()}).sort([('at', ASCENDING), ('_id', ASCENDING)]).explain()),
+        ('analytics_data (response times)', fir_events_collection.find(
+            {'police_station': station_name, 'metric': {'$in': ['assignment', 'resolution']},
+             'at': {'$gte': datetime(2000, 1, 1)}}).explain()),
+        ('submit_fir (duplicate lookup)', fir_duplicates_collection.find({
+            'police_station': station_name, 'bands': {'$in': ['0:000000000000', '1:000000000000']},
+            'incident_date': {'$gte': datetime(2000, 1, 1), '$lte': datetime(2000, 1, 7)}}).explain()),
+        ('admin_duplicates', fir_duplicates_collection.find(
+            {'police_station': station_name, 'review': 'pending'}).sort(FIR_LIST_SORT).explain()),
+        ('auto_assign (least loaded)', officers_collection.find(
+            least_loaded_query).sort(least_loaded_sort).limit(1).explain()),
+        ('auto_assign (category affinity)', officer_workloads_collection.find(
+            affinity_query).sort(affinity_sort).limit(1).explain()),
+    ]
+
+
+@app.cli.command('ensure-indexes')
+def ensure_indexes_command():
+    """Create the indexes used by the FIR, user, officer and admin routes."""
+    ensure_indexes()
+
+
+@app.cli.command('check-indexes')
+def check_indexes_command():
+    """Fail if any route query falls back to a COLLSCAN or an in-memory SORT."""
+    failures = []
+    for name, plan in route_query_plans():
+        stages = _winning_plan_stages(plan)
+        bad_stages = [stage for stage in stages if stage in ('COLLSCAN', 'SORT')]
+        if bad_stages:
+            failures.append(name)
+            print(f"❌ {name}: {' -> '.join(stages)}")
+        else:
+            print(f"✅ {name}: {' -> '.join(stages)}")
+
+    if failures:
+        print(f"{len(failures)} route queries are not fully indexed.")
+        sys.exit(1)
+    print("All route queries use indexes.")
+
+# --- ANALYTICS ROLLUPS ---
+# fir_rollups holds one counter per station x filed day x category x status x
+# assigned officer. Every write path that creates, moves or removes a FIR
+# adjusts the matching counters with $inc, so analytics never scan firs.
+def rollup_key(fir):
+    filed_date = fir['filed_date']
+    return {
+        'police_station': fir.get('police_station'),
+        'day': datetime(filed_date.year, filed_date.month, filed_date.day),
+        'category': fir.get('category'),
+        'fir_status': fir.get('fir_status'),
+        'assigned_officer_id': fir.get('assigned_officer_id')
+    }
+
+
+def apply_rollup_changes(changes):
+    """
+    Applies [(fir, delta), ...] to the rollup counters in one bulk_write,
+    merging changes to the same bucket first.
+    """
+    deltas = {}
+    for fir, delta in changes:
+        key = tuple(rollup_key(fir).items())
+        deltas[key] = deltas.get(key, 0) + delta
+    operations = [
+        UpdateOne(dict(key), {'$inc': {'count': delta}}, upsert=True)
+        for key, delta in deltas.items() if delta
+    ]
+    if not operations:
+        return
+    try:
+        fir_rollups_collection.bulk_write(operations, ordered=False)
+    except Exception as e:
+        # The FIR write already happened; 'flask rebuild-rollups' repairs any drift.
+        print(f"Could not update analytics rollups: {e}")
+
+
+# --- CHANGE COUNTERS ---
+# One counter per station and per user, bumped whenever a FIR they can see
+# changes, plus a version field on every FIR. Views build their ETag from the
+# counter, so an unchanged dashboard costs one counter read and a 304.
+# RELEASE_ID keeps a new deployment's templates from matching old ETags. It
+# defaults to the checked-out git commit and, where the code ships without
+# .git (slugs, images, wheels), to a hash of the code, templates and static files.
+def git_revision(directory):
+    """The commit checked out in `directory`, read from .git without running git; None outside a checkout."""
+    git_dir = os.path.join(directory, '.git')
+    try:
+        with open(os.path.join(git_dir, 'HEAD')) as f:
+            head = f.read().strip()
+        if not head.startswith('ref: '):
+            return head
+        ref = head[len('ref: '):]
+        if os.path.exists(os.path.join(git_dir, ref)):
+            with open(os.path.join(git_dir, ref)) as f:
+                return f.read().strip()
+        with open(os.path.join(git_dir, 'packed-refs')) as f:
+            for line in f:
+                if line.rstrip().endswith(f' {ref}'):
+                    return line.split()[0]
+    except OSError:
+        pass
+    return None
+
+
+def content_revision(directory):
+    """Hash of app.py and everything under templates/ and static/, in a stable order."""
+    digest = hashlib.sha256()
+    paths = [os.path.join(directory, 'app.py')]
+    for subdirectory in ('templates', 'static'):
+        for root, dirs, files in os.walk(os.path.join(directory, subdirectory)):
+            dirs.sort()
+            paths.extend(os.path.join(root, name) for name in sorted(files))
+    for path in paths:
+        digest.update(os.path.relpath(path, directory).encode('utf-8'))
+        with open(path, 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()[:16]
+
+
+def release_id():
+    app_dir = os.path.dirname(os.path.abspath(__file__))
+    revision = os.getenv('RELEASE_ID') or git_revision(app_dir)
+    if revision:
+        return revision
+    print("Warning: RELEASE_ID is not set and the app is not running from a git checkout; "
+          "using a hash of the code, templates and static files.")
+    return content_revision(app_dir)
+
+
+RELEASE_ID = release_id()
+
+
+def station_change_key(station_name):
+    return f'station:{station_name}'
+
+
+def user_change_key(username):
+    return f'user:{username}'
+
+
+def station_change_keys(docs):
+    return {station_change_key(doc.get('police_station') or doc.get('station_name')) for doc in docs}
+
+
+def change_keys_for(transitions):
+    keys = set()
+    for before, after in transitions:
+        for fir in (before, after):
+            if fir:
+                keys.update((station_change_key(fir.get('police_station')), user_change_key(fir.get('username'))))
+    return keys
+
+
+def bump_change_counters(keys):
+    operations = [UpdateOne({'_id': key}, {'$inc': {'version': 1}}, upsert=True) for key in sorted(keys)]
+    if operations:
+        change_counters_collection.bulk_write(operations, ordered=False)
+
+
+def change_counter(key):
+    counter = change_counters_read_collection.find_one({'_id': key}, {'version': 1}) or {}
+    return counter.get('version', 0)
+
+
+def view_etag(*parts):
+    return hashlib.sha256('|'.join(str(part) for part in (RELEASE_ID, *parts)).encode('utf-8')).hexdigest()[:32]
+
+
+def not_modified(etag):
+    """Returns a 304 when the client already holds this version of the view, otherwise None."""
+    if etag not in request.if_none_match:
+        return None
+    return with_etag(Response(status=304), etag)
+
+
+def with_etag(response, etag):
+    # Per-user views: the browser may keep them but must revalidate every time.
+    response = app.make_response(response)
+    response.set_etag(etag)
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response
+
+
+def record_fir_changes(transitions, remarks=None):
+    """
+    Records a list of (before, after) FIR pairs: appends them to the event
+    log, moves them between rollup buckets, bumps the change counters of the
+    stations and users involved and publishes them to the live feed. Use None
+    for `before` on insert or `after` on delete.
+    """
+    try:
+        append_fir_log(transitions, remarks)
+    except Exception as e:
+        print(f"Could not append to the FIR event log: {e}")
+
+    changes = []
+    for before, after in transitions:
+        if before and after and rollup_key(before) == rollup_key(after):
+            continue
+        if before:
+            changes.append((before, -1))
+        if after:
+            changes.append((after, 1))
+    apply_rollup_changes(changes)
+
+    try:
+        assignment_engine.record_changes(transitions)
+    except Exception as e:
+        # Same as the rollups: 'flask rebuild-workloads' repairs any drift.
+        print(f"Could not update officer workloads: {e}")
+
+    try:
+        bump_change_counters(change_keys_for(transitions))
+    except Exception as e:
+        # Cached views stay stale until the next change at the same station or user.
+        print(f"Could not bump change counters: {e}")
+
+    try:
+        fir_event_feed.publish(feed_events_for(transitions))
+    except Exception as e:
+        # Live views catch up on their next reload.
+        print(f"Could not publish FIR events: {e}")
+
+
+def record_fir_change(before, after, remarks=None):
+    record_fir_changes([(before, after)], remarks)
+
+
+def rebuild_rollups(station_name=None):
+    """Recomputes the rollup counters from both FIR tiers, for one station or all."""
+    match = {'police_station': station_name} if station_name else {}
+    pipeline = [
+        {'$match': match},
+        {'$group': {
+            '_id': {
+                'police_station': '$police_station',
+                'day': {'$dateFromString': {'dateString': {'$dateToString': {'format': '%Y-%m-%d', 'date': '$filed_date'}}}},
+                'category': '$category',
+                'fir_status': '$fir_status',
+                'assigned_officer_id': {'$ifNull': ['$assigned_officer_id', None]}
+            },
+            'count': {'$sum': 1}
+        }}
+    ]
+    counts = {}
+    for collection in (firs_collection, firs_archive_collection):
+        for row in collection.aggregate(pipeline, allowDiskUse=True):
+            key = tuple(row['_id'].items())
+            counts[key] = counts.get(key, 0) + row['count']
+    rollups = [{**dict(key), 'count': count} for key, count in counts.items()]
+
+    fir_rollups_collection.delete_many(match)
+    if rollups:
+        fir_rollups_collection.insert_many(rollups, ordered=False)
+    bump_change_counters(station_change_keys(rollups))
+    print(f"Rebuilt {len(rollups)} rollup rows{' for ' + station_name if station_name else ''}.")
+    return len(rollups)
+
+
+@app.cli.command('rebuild-rollups')
+@click.option('--station', default=None, help='Only rebuild this police station.')
+def rebuild_rollups_command(station):
+    """Backfill or rebuild the analytics rollups from the FIR collection."""
+    rebuild_rollups(station)
+
+
+@app.cli.command('rebuild-workloads')
+@click.option('--station', default=None, help='Only rebuild this police station.')
+def rebuild_workloads_command(station):
+    """Recount every officer's open cases and category load from the FIR collection."""
+    rows = assignment_engine.rebuild(firs_collection, station)
+    print(f"Rebuilt {rows} officer workload rows{' for ' + station if station else ''}.")
+
+
+@app.cli.command('archive-firs')
+@click.option('--days', type=int, default=FIR_ARCHIVE_AFTER_DAYS, show_default=True,
+              help='Archive FIRs resolved more than this many days ago.')
+@click.option('--batch-size', type=int, default=FIR_ARCHIVE_BATCH_SIZE, show_default=True)
+def archive_firs_command(days, batch_size):
+    """Move long-resolved FIRs from the working collection to firs_archive."""
+    started = time.perf_counter()
+
+    def progress(scanned, moved):
+        print(f"Scanned {scanned} resolved FIRs, archived {moved}.")
+
+    scanned, moved = fir_archive.run(datetime.utcnow() - timedelta(days=days), batch_size, progress)
+    print(f"Archived {moved} of {scanned} resolved FIRs in {time.perf_counter() - started:.1f}s.")
+
+
+# --- FIR EVENT LOG ---
+# fir_events is append-only: one entry per filing, assignment, status change
+# and cancellation, with who did it and when. Entries that start or end an
+# investigation (first assignment, first resolution) carry the seconds elapsed
+# since filing, so response-time metrics average a stored number instead of
+# replaying each FIR's history.
+def current_actor():
+    if has_request_context():
+        if session.get('role') == 'admin':
+            return {'role': 'admin', 'id': session.get('admin_id')}
+        if session.get('role') == 'user':
+            return {'role': 'user', 'id': session.get('username')}
+    return {'role': 'system', 'id': None}
+
+
+def fir_log_entries(before, after, actor, remarks, at):
+    fir = after or before
+    base = {
+        'fir_id': fir['_id'],
+        'police_station': fir.get('police_station'),
+        'username': fir.get('username'),
+        'at': at,
+        'actor': actor,
+    }
+
+    def entry(kind, from_status, to_status, remarks, actor=actor, **extra):
+        doc = {**base, 'kind': kind, 'from_status': from_status, 'to_status': to_status,
+               'actor': actor, 'remarks': remarks, **extra}
+        if to_status == 'Resolved' and from_status != 'Resolved':
+            doc['metric'] = 'resolution'
+        if doc.get('metric'):
+            doc['seconds_since_filed'] = (at - fir['filed_date']).total_seconds()
+        return doc
+
+    if before is None:
+        entries = [entry('filed', None, 'Pending', remarks or 'Initial report filed by the user.')]
+        if after.get('assigned_officer_id'):
+            # Assigned by the engine as the FIR was inserted.
+            entries.append(entry('assigned', 'Pending', after.get('fir_status'),
+                                 f"Automatically assigned to {after.get('assigned_officer_name')}.",
+                                 actor={'role': 'system', 'id': None},
+                                 officer_id=after['assigned_officer_id'], metric='assignment'))
+        return entries
+
+    if after is None:
+        return [entry('cancelled', before.get('fir_status'), None, remarks or 'FIR cancelled by the user.')]
+
+    from_status, to_status = before.get('fir_status'), after.get('fir_status')
+    if after.get('assigned_officer_id') and after.get('assigned_officer_id') != before.get('assigned_officer_id'):
+        extra = {'officer_id': after['assigned_officer_id']}
+        if not before.get('assigned_officer_id'):
+            extra['metric'] = 'assignment'
+        return [entry('assigned', from_status, to_status,
+                      remarks or f"Assigned to {after.get('assigned_officer_name')}.", **extra)]
+    if from_status != to_status:
+        return [entry('status', from_status, to_status, remarks or f"Status changed from {from_status} to {to_status}.",
+                      officer_id=after.get('assigned_officer_id'))]
+    return []
+
+
+def append_fir_log(transitions, remarks=None):
+    actor = current_actor()
+    at = datetime.utcnow()
+    entries = [doc for before, after in transitions for doc in fir_log_entries(before, after, actor, remarks, at)]
+    resolutions = {doc['fir_id'] for doc in entries if doc.get('metric') == 'resolution'}
+    if resolutions:
+        # Time to resolution counts from the first resolution only; a FIR
+        # that is reopened and resolved again, or was imported as Resolved,
+        # logs the change without it.
+        resolved_before = set(fir_events_collection.distinct(
+            'fir_id', {'fir_id': {'$in': list(resolutions)}, 'to_status': 'Resolved'}))
+        for doc in entries:
+            if doc.get('metric') == 'resolution' and doc['fir_id'] in resolved_before:
+                del doc['metric'], doc['seconds_since_filed']
+    if entries:
+        fir_events_collection.insert_many(entries, ordered=False)
+
+
+def response_time_stats(station_name, date_from=None, date_to=None):
+    """
+    Average seconds from filing to first assignment and to resolution, for
+    the station and per officer, over log entries in the date range.
+    """
+    match = {'police_station': station_name, 'metric': {'$in': ['assignment', 'resolution']}}
+    if date_from or date_to:
+        match['at'] = {}
+        if date_from:
+            match['at']['$gte'] = date_from
+        if date_to:
+            match['at']['$lt'] = date_to
+    rows = fir_events_read_collection.aggregate([
+        {'$match': match},
+        {'$group': {
+            '_id': {'metric': '$metric', 'officer_id': '$officer_id'},
+            'count': {'$sum': 1},
+            'seconds': {'$sum': '$seconds_since_filed'}
+        }}
+    ])
+
+    station, officers = {}, {}
+    for row in rows:
+        metric, officer_id = row['_id']['metric'], row['_id'].get('officer_id')
+        targets = [station] + ([officers.setdefault(officer_id, {})] if officer_id else [])
+        for totals in targets:
+            count, seconds = totals.get(metric, (0, 0))
+            totals[metric] = (count + row['count'], seconds + row['seconds'])
+
+    def averages(totals):
+        result = {}
+        for metric in ('assignment', 'resolution'):
+            count, seconds = totals.get(metric, (0, 0))
+            result[f'avg_{metric}_seconds'] = round(seconds / count) if count else None
+        return result
+
+    return averages(station), {officer_id: averages(totals) for officer_id, totals in officers.items()}
+
+
+@app.cli.command('backfill-fir-log')
+def backfill_fir_log_command():
+    """Add a 'filed' log entry for every FIR filed before the event log existed."""
+    logged = set(fir_events_collection.distinct('fir_id', {'kind': 'filed'}))
+    entries = [
+        {'fir_id': fir['_id'], 'police_station': fir.get('police_station'), 'username': fir.get('username'),
+         'at': fir['filed_date'], 'actor': {'role': 'user', 'id': fir.get('username')},
+         'kind': 'filed', 'from_status': None, 'to_status': 'Pending',
+         'remarks': 'Initial report filed by the user.'}
+        for collection in (firs_collection, firs_archive_collection)
+        for fir in collection.find({}, {'police_station': 1, 'username': 1, 'filed_date': 1})
+        if fir['_id'] not in logged
+    ]
+    if entries:
+        fir_events_collection.insert_many(entries, ordered=False)
+    print(f"Backfilled {len(entries)} FIR log entries.")
+
+
+# --- PAGINATION ---
+def encode_page_token(fir):
+    """Builds the opaque cursor pointing just after the given FIR."""
+    payload = json.dumps({'d': fir['filed_date'].isoformat(), 'i': str(fir['_id'])})
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii')
+
+
+def decode_page_token(token):
+    """Returns (filed_date, _id) from a cursor, or raises ValueError if it is malformed."""
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(token.encode('ascii')))
+        return datetime.fromisoformat(payload['d']), ObjectId(payload['i'])
+    except Exception as e:
+        raise ValueError(f"Invalid page token: {e}")
+
+
+def get_page_size():
+    """Reads the optional ?limit= argument, clamped to MAX_FIR_PAGE_SIZE."""
+    try:
+        limit = int(request.args.get('limit', FIR_PAGE_SIZE))
+    except (ValueError, TypeError):
+        limit = FIR_PAGE_SIZE
+    return max(1, min(limit, MAX_FIR_PAGE_SIZE))
+
+
+def firs_page_cursor(query, projection, page_size, token=None, collection=None):
+    """
+    Returns a cursor over one page of FIRs matching `query` in FIR_LIST_SORT
+    order, starting after `token`. It yields one extra document so callers can
+    tell whether another page exists without a count query. Reads the hot
+    collection unless another `collection` is given.
+    """
+    if token:
+        filed_date, last_id = decode_page_token(token)
+        query = {'$and': [query, {
+            'filed_date': {'$lte': filed_date},
+            '$or': [
+                {'filed_date': {'$lt': filed_date}},
+                {'filed_date': filed_date, '_id': {'$lt': last_id}}
+            ]
+        }]}
+
+    collection = collection if collection is not None else firs_read_collection
+    return collection.find(query, projection).sort(FIR_LIST_SORT).limit(page_size + 1)
+
+
+def paginate_firs(query, projection, page_size, token=None, collection=None):
+    """
+    Returns one page of FIRs as a list together with the token for the next
+    page (None on the last page).
+    """
+    firs = list(firs_page_cursor(query, projection, page_size, token, collection))
+    next_token = None
+    if len(firs) > page_size:
+        firs = firs[:page_size]
+        next_token = encode_page_token(firs[-1])
+    return firs, next_token
+
+
+def stream_firs_page(cursor, page_size):
+    """
+    Streams {"firs": [...], "next": token} straight from a firs_page_cursor,
+    encoding each document as it arrives instead of building the list first.
+    """
+    state = {'last': None, 'has_more': False}
+
+    def items():
+        for index, fir in enumerate(cursor):
+            if index == page_size:
+                state['has_more'] = True
+                break
+            state['last'] = fir
+            yield fir
+
+    def trailer():
+        return {'next': encode_page_token(state['last']) if state['has_more'] else None}
+
+    return Response(stream_json_object(app.json, 'firs', items(), trailer), mimetype='application/json')
+
+
+# --- REQUEST METRICS ---
+@app.before_request
+def start_request_metrics():
+    g.request_started = time.perf_counter()
+    metrics.start_request(request.url_rule.rule if request.url_rule else 'unmatched')
+
+
+@app.after_request
+def record_request_metrics(response):
+    # Streamed bodies (FIR lists, exports) run their cursors after this hook,
+    # on the same thread, so the request is only recorded once the server
+    # closes the response.
+    route = metrics.current_route()
+    method, path, status = request.method, request.path, response.status_code
+    started = g.get('request_started', time.perf_counter())
+    g.request_metrics_deferred = True
+
+    def record():
+        elapsed = time.perf_counter() - started
+        command_count, commands = metrics.finish_request()
+        request_seconds.observe(elapsed, route=route, method=method, status=status)
+        mongo_commands_per_request.observe(command_count, route=route)
+        if SLOW_REQUEST_MS and elapsed * 1000 >= SLOW_REQUEST_MS:
+            slow_requests_total.inc(route=route)
+            print("🐢 Slow request: " + json.dumps({
+                'route': route, 'method': method, 'path': path, 'status': status,
+                'ms': round(elapsed * 1000, 1), 'mongo_commands': command_count, 'commands': commands,
+            }, default=str))
+
+    response.call_on_close(record)
+    return response
+
+
+@app.teardown_request
+def clear_request_metrics(error=None):
+    # after_request is skipped when a handler raises; don't leave the route on the thread.
+    if not g.get('request_metrics_deferred'):
+        metrics.finish_request()
+
+
+# --- ADMISSION CONTROL ---
+def rate_limit_identities(route_class):
+    """The (scope, value) pairs a request of this class is counted against."""
+    if route_class == 'auth':
+        data = request.get_json(silent=True) or {}
+        account = data.get('username') or data.get('admin_id')
+    else:
+        account = session.get('username')
+    # The shared route bucket is charged last, so a client over its own limit doesn't drain it.
+    identities = [('ip', request.remote_addr or 'unknown')]
+    if account:
+        identities.append(('user', str(account)))
+    return identities + [('route', route_class)]
+
+
+def check_rate_limits(route_class):
+    limits = RATE_LIMITS[route_class]
+    for scope, value in rate_limit_identities(route_class):
+        if scope in limits:
+            retry_after = rate_limiter.take(f'{route_class}:{scope}:{value}', *limits[scope])
+            if retry_after:
+                raise RateLimited(scope, retry_after)
+
+
+def rejection(message, status, retry_after):
+    response = jsonify({'error': message})
+    response.status_code = status
+    response.headers['Retry-After'] = str(max(1, math.ceil(retry_after)))
+    return response
+
+
+@app.before_request
+def admit_request():
+    """
+    Turns expensive requests away before they take a worker thread for long:
+    503 when the route class is at its concurrency cap in this process, 429
+    when one of its token buckets is empty. Both carry Retry-After.
+    """
+    route_class = ROUTE_CLASSES.get(request.endpoint)
+    if route_class is None or request.method == 'GET':
+        return None
+    if not concurrency_limiter.acquire(route_class):
+        rejected_requests_total.inc(route_class=route_class, reason='concurrency')
+        return rejection('The server is busy. Please try again in a moment.', 503, OVERLOAD_RETRY_AFTER)
+    g.admission_slot = route_class
+    try:
+        check_rate_limits(route_class)
+    except RateLimited as e:
+        release_admission_slot()
+        rejected_requests_total.inc(route_class=route_class, reason=e.scope)
+        return rejection('Too many requests. Please try again later.', 429, e.retry_after)
+    return None
+
+
+@app.teardown_request
+def release_admission_slot(error=None):
+    # Runs after a streamed response has finished, so /chatbot/stream holds its slot while it streams.
+    route_class = g.pop('admission_slot', None)
+    if route_class:
+        concurrency_limiter.release(route_class)
+
+
+@app.route('/metrics')
+def metrics_endpoint():
+    if METRICS_TOKEN and not hmac.compare_digest(request.headers.get('Authorization', ''), f'Bearer {METRICS_TOKEN}'):
+        return Response('Unauthorized\n', status=401, mimetype='text/plain')
+    return Response(metrics_registry.render(), mimetype='text/plain; version=0.0.4')
+
+
+@app.route('/healthz')
+def health():
+    """Liveness of this worker's MongoDB connection and how busy its pools are."""
+    mongo_health = mongo.health()
+    return jsonify({
+        'status': 'ok' if mongo_health['ok'] else 'unavailable',
+        'mongo': {**mongo_health, 'read_heavy_preference': READ_HEAVY_PREFERENCE.document},
+    }), 200 if mongo_health['ok'] else 503
+
+
 @app.route('/')
 def login_page():
     return render_template('login.html')
@@ -161,7 +1364,7 @@ def register():
         if users_collection.find_one({'username': username}):
             return jsonify({'error': 'Username already exists'}), 409
 
-        hashed_password = bcrypt.generate_password_hash(password).decode('utf-8')
+        hashed_password = hash_password(password)
 
         users_collection.insert_one({
             'username': username,
@@ -187,7 +1390,7 @@ def user_login():
 
     user = users_collection.find_one({'username': username})
 
-    if user and bcrypt.check_password_hash(user['password'], password):
+    if user and check_password(user['password'], password):
         session['username'] = user['username']
         session['role'] = 'user'
         return jsonify({'message': 'Login successful', 'redirect': url_for('user_dashboard')})
@@ -203,7 +1406,7 @@ def admin_login():
 
     admin = admins_collection.find_one({"admin_id": admin_id})
 
-    if admin and bcrypt.check_password_hash(admin['password'], password):
+    if admin and check_password(admin['password'], password):
         session['role'] = 'admin'
         session['admin_id'] = admin['admin_id']
         session['station_name'] = admin.get('station_name', 'Admin')
@@ -219,14 +1422,472 @@ def admin_dashboard():
         if not station_name:
             return render_template('admin_dashboard.html', firs=[], station_name="Unknown")
 
-        station_firs = list(firs_collection.find(
-            {'police_station': station_name}
-        ).sort("filed_date", -1))
+        etag = view_etag('admin_dashboard', station_name, change_counter(station_change_key(station_name)))
+        cached = not_modified(etag)
+        if cached:
+            return cached
 
-        return render_template('admin_dashboard.html', firs=station_firs, station_name=station_name)
+        station_firs, next_token = paginate_firs(
+            {'police_station': station_name}, ADMIN_FIR_LIST_PROJECTION, FIR_PAGE_SIZE
+        )
+
+        return with_etag(render_template('admin_dashboard.html', firs=station_firs,
+                                         next_token=next_token, station_name=station_name), etag)
 
     return redirect(url_for('login_page'))
 
+
+@app.route("/admin/firs")
+def admin_firs_page():
+    if session.get('role') != 'admin':
+        return jsonify({'error': 'Unauthorized'}), 401
+
+    station_name = session.get('station_name')
+    if not station_name:
+        return jsonify({'error': 'Admin station not found'}), 400
+
+    page_size = get_page_size()
+    try:
+        cursor = firs_page_cursor(
+            {'police_station': station_name}, ADMIN_FIR_LIST_PROJECTION,
+            page_size, request.args.get('cursor')
+        )
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    return stream_firs_page(cursor, page_size)
+
+def parse_date_arg(name, end_of_day=False):
+    """
+    Parses a YYYY-MM-DD query argument. With end_of_day the returned value is the
+    start of the following day, for use as an exclusive upper bound.
+    """
+    value = request.args.get(name)
+    if not value:
+        return None
+    try:
+        parsed = datetime.strptime(value, '%Y-%m-%d')
+    except ValueError:
+        raise ValueError(f"{name} must be in YYYY-MM-DD format")
+    return parsed + timedelta(days=1) if end_of_day else parsed
+
+
+def build_fir_search_filter(station_name):
+    """Turns the structured search arguments into a Mongo filter scoped to the station."""
+    query = {'police_station': station_name}
+
+    for field in ('category', 'fir_status', 'assigned_officer_id'):
+        value = request.args.get(field)
+        if value:
+            query[field] = value
+
+    for field in ('incident_date', 'filed_date'):
+        date_from = parse_date_arg(f'{field}_from')
+        date_to = parse_date_arg(f'{field}_to', end_of_day=True)
+        if date_from or date_to:
+            query[field] = {}
+            if date_from:
+                query[field]['$gte'] = date_from
+            if date_to:
+                query[field]['$lt'] = date_to
+
+    return query
+
+
+@app.route("/admin/firs/search")
+def search_firs():
+    if session.get('role') != 'admin':
+        return jsonify({'error': 'Unauthorized'}), 401
+
+    station_name = session.get('station_name')
+    if not station_name:
+        return jsonify({'error': 'Admin station not found'}), 400
+
+    search_text = request.args.get('q', '').strip()
+    cursor = request.args.get('cursor')
+    page_size = get_page_size()
+
+    try:
+        query = build_fir_search_filter(station_name)
+
+        if search_text and ObjectId.is_valid(search_text):
+            query['_id'] = ObjectId(search_text)
+            fir = fir_archive.find_one(query, ADMIN_FIR_LIST_PROJECTION)
+            station_firs = [fir] if fir else []
+            next_token = None
+        elif search_text:
+            # Relevance order has no stable keyset, so text results page by
+            # offset: each tier returns its best matches up to the end of the
+            # page and the merged stream is sliced. Both tiers share the text
+            # index definition, so their scores compare.
+            page = int(cursor) if cursor else 0
+            query['$text'] = {'$search': search_text}
+            projection = {**ADMIN_FIR_LIST_PROJECTION, 'score': {'$meta': 'textScore'}}
+            station_firs = list(itertools.islice(FirArchive.merge([
+                collection.find(query, projection)
+                .sort([('score', {'$meta': 'textScore'}), ('_id', DESCENDING)])
+                .limit((page + 1) * page_size + 1)
+                for collection in (firs_read_collection, firs_archive_read_collection)
+            ], FIR_SEARCH_SORT), page * page_size, (page + 1) * page_size + 1))
+            next_token = None
+            if len(station_firs) > page_size:
+                station_firs = station_firs[:page_size]
+                next_token = str(page + 1)
+        else:
+            # Filters cover both tiers like a text search does; the keyset token is the same for each.
+            return stream_firs_page(FirArchive.merge([
+                firs_page_cursor(query, ADMIN_FIR_LIST_PROJECTION, page_size, cursor, collection)
+                for collection in (firs_read_collection, firs_archive_read_collection)
+            ], FIR_LIST_SORT), page_size)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        print(f"Error searching FIRs: {e}")
+        return jsonify({'error': 'Could not search FIRs'}), 500
+
+    return jsonify({'firs': station_firs, 'next': next_token})
+
+
+# --- FIR EXPORT ---
+# Exports walk a station's FIRs oldest first on (filed_date, _id), the keyset
+# the list pages use in reverse, so an interrupted export resumes after the
+# last row it delivered: pass that row's filed_date and fir_id back as
+# after_date and after_id. Only one cursor batch and one output chunk are held
+# in memory at a time, whatever the number of rows.
+EXPORT_FORMATS = {'csv': 'text/csv', 'ndjson': 'application/x-ndjson'}
+EXPORT_BATCH_SIZE = int(os.getenv('EXPORT_BATCH_SIZE', 1000))
+# Rows are buffered into chunks of roughly this many bytes before being sent.
+EXPORT_CHUNK_BYTES = int(os.getenv('EXPORT_CHUNK_BYTES', 64 * 1024))
+EXPORT_SORT = [('filed_date', ASCENDING), ('_id', ASCENDING)]
+EXPORT_COLUMNS = [
+    'fir_id', 'filed_date', 'police_station', 'district', 'state', 'category', 'other_category',
+    'fir_status', 'incident_date', 'location', 'user_name', 'username', 'mobile',
+    'assigned_officer_id', 'assigned_officer_name', 'accused_names', 'description'
+]
+EXPORT_PROJECTION = {column: 1 for column in EXPORT_COLUMNS if column != 'fir_id'}
+
+
+def parse_export_checkpoint(after_date, after_id):
+    """Returns (filed_date, _id) from the resume arguments, None when neither is given."""
+    if not after_date and not after_id:
+        return None
+    if not (after_date and after_id):
+        raise ValueError("after_date and after_id must be given together")
+    try:
+        return datetime.fromisoformat(after_date), ObjectId(after_id)
+    except Exception as e:
+        raise ValueError(f"Invalid export checkpoint: {e}")
+
+
+def fir_export_query(station_name, date_from=None, date_to=None, statuses=(), categories=(), after=None):
+    query = {'police_station': station_name}
+    if date_from or date_to:
+        query['filed_date'] = {}
+        if date_from:
+            query['filed_date']['$gte'] = date_from
+        if date_to:
+            query['filed_date']['$lt'] = date_to
+    if statuses:
+        query['fir_status'] = {'$in': list(statuses)}
+    if categories:
+        query['category'] = {'$in': list(categories)}
+    if after:
+        filed_date, last_id = after
+        query = {'$and': [query, {
+            'filed_date': {'$gte': filed_date},
+            '$or': [
+                {'filed_date': {'$gt': filed_date}},
+                {'filed_date': filed_date, '_id': {'$gt': last_id}}
+            ]
+        }]}
+    return query
+
+
+def fir_export_cursor(query):
+    """Streams matching FIRs from both tiers, merged in EXPORT_SORT order."""
+    return FirArchive.merge([
+        collection.find(query, EXPORT_PROJECTION).sort(EXPORT_SORT).batch_size(EXPORT_BATCH_SIZE)
+        for collection in (firs_read_collection, firs_archive_read_collection)
+    ], EXPORT_SORT)
+
+
+def export_record(fir):
+    return {column: fir.get('_id' if column == 'fir_id' else column) for column in EXPORT_COLUMNS}
+
+
+def export_csv_row(fir):
+    row = []
+    for value in export_record(fir).values():
+        if isinstance(value, datetime):
+            value = value.isoformat()
+        elif isinstance(value, list):
+            value = '; '.join(str(item) for item in value)
+        elif value is None:
+            value = ''
+        row.append(value)
+    return row
+
+
+def fir_export_chunks(cursor, export_format, header=True):
+    """
+    Yields (text, last_fir, rows) for every chunk of about EXPORT_CHUNK_BYTES,
+    where last_fir is the final FIR in the chunk: the checkpoint to resume from
+    once the chunk has been delivered.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if export_format == 'csv' and header:
+        writer.writerow(EXPORT_COLUMNS)
+    last_fir, rows = None, 0
+    for fir in cursor:
+        if export_format == 'csv':
+            writer.writerow(export_csv_row(fir))
+        else:
+            buffer.write(app.json.dumps(export_record(fir)) + '\n')
+        last_fir, rows = fir, rows + 1
+        if buffer.tell() >= EXPORT_CHUNK_BYTES:
+            yield buffer.getvalue(), last_fir, rows
+            buffer.seek(0)
+            buffer.truncate()
+            rows = 0
+    if buffer.tell():
+        yield buffer.getvalue(), last_fir, rows
+
+
+def request_list_arg(name):
+    """Reads a filter given as repeated ?name= arguments, comma-separated values, or both."""
+    return [value.strip() for raw in request.args.getlist(name) for value in raw.split(',') if value.strip()]
+
+
+@app.route("/admin/firs/export")
+def export_firs():
+    if session.get('role') != 'admin':
+        return jsonify({'error': 'Unauthorized'}), 401
+
+    station_name = session.get('station_name')
+    if not station_name:
+        return jsonify({'error': 'Admin station not found'}), 400
+
+    export_format = request.args.get('format', 'csv').lower()
+    if export_format not in EXPORT_FORMATS:
+        return jsonify({'error': f"format must be one of: {', '.join(EXPORT_FORMATS)}"}), 400
+
+    statuses = request_list_arg('status')
+    if any(status not in FIR_STATUSES for status in statuses):
+        return jsonify({'error': f"status must be one of: {', '.join(FIR_STATUSES)}"}), 400
+
+    try:
+        after = parse_export_checkpoint(request.args.get('after_date'), request.args.get('after_id'))
+        query = fir_export_query(
+            station_name, parse_date_arg('from'), parse_date_arg('to', end_of_day=True),
+            statuses, request_list_arg('category'), after
+        )
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    # A resumed CSV export is appended to the first part, so it has no header row.
+    chunks = fir_export_chunks(fir_export_cursor(query), export_format, header=after is None)
+    filename = f"firs-{secure_filename(station_name)}-{datetime.utcnow():%Y%m%d}.{export_format}"
+    return Response((text for text, _, _ in chunks), mimetype=EXPORT_FORMATS[export_format],
+                    headers={'Content-Disposition': f'attachment; filename="{filename}"',
+                             'X-Accel-Buffering': 'no'})
+
+
+@app.cli.command('export-firs')
+@click.option('--station', required=True, help='Police station to export.')
+@click.option('--output', required=True, type=click.Path(dir_okay=False), help='File to write.')
+@click.option('--format', 'export_format', type=click.Choice(list(EXPORT_FORMATS)), default='csv')
+@click.option('--from', 'date_from', type=click.DateTime(['%Y-%m-%d']), default=None, help='Filed on or after.')
+@click.option('--to', 'date_to', type=click.DateTime(['%Y-%m-%d']), default=None, help='Filed on or before.')
+@click.option('--status', 'statuses', multiple=True, type=click.Choice(FIR_STATUSES))
+@click.option('--category', 'categories', multiple=True)
+@click.option('--resume', is_flag=True, help='Continue an interrupted export from its checkpoint file.')
+def export_firs_command(station, output, export_format, date_from, date_to, statuses, categories, resume):
+    """
+    Stream a station's FIRs to a CSV or NDJSON file. Progress is checkpointed
+    to <output>.checkpoint after every chunk, so --resume picks up an
+    interrupted export where it stopped.
+    """
+    checkpoint_path = output + '.checkpoint'
+    params = {
+        'station': station, 'format': export_format, 'statuses': sorted(statuses), 'categories': sorted(categories),
+        'from': date_from.date().isoformat() if date_from else None,
+        'to': date_to.date().isoformat() if date_to else None,
+    }
+    after, offset, total = None, 0, 0
+    if resume:
+        if not os.path.exists(checkpoint_path):
+            raise click.ClickException(f"No checkpoint at {checkpoint_path}; nothing to resume.")
+        with open(checkpoint_path) as f:
+            checkpoint = json.load(f)
+        if checkpoint['params'] != params:
+            raise click.ClickException("The checkpoint was written for different export options.")
+        after = parse_export_checkpoint(checkpoint['after_date'], checkpoint['after_id'])
+        offset, total = checkpoint['offset'], checkpoint['rows']
+
+    query = fir_export_query(station, date_from, date_to + timedelta(days=1) if date_to else None,
+                             statuses, categories, after)
+    started = time.perf_counter()
+    written = 0
+    with open(output, 'r+b' if resume else 'wb') as f:
+        # Anything past the checkpoint was written but never confirmed; drop it.
+        f.seek(offset)
+        f.truncate()
+        for text, last_fir, rows in fir_export_chunks(fir_export_cursor(query), export_format, header=not resume):
+            f.write(text.encode('utf-8'))
+            f.flush()
+            written += rows
+            checkpoint = {
+                'params': params, 'offset': f.tell(), 'rows': total + written,
+                'after_date': last_fir['filed_date'].isoformat(), 'after_id': str(last_fir['_id']),
+            }
+            with open(checkpoint_path + '.tmp', 'w') as checkpoint_file:
+                json.dump(checkpoint, checkpoint_file)
+            os.replace(checkpoint_path + '.tmp', checkpoint_path)
+
+    if os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+    elapsed = time.perf_counter() - started
+    print(f"Exported {written} FIRs ({total + written} in total) to {output} "
+          f"in {elapsed:.1f}s ({written / elapsed if elapsed else 0:.0f} rows/s).")
+
+
+# --- FIR IMPORT ---
+def imported_fir_log_entries(doc):
+    """
+    Log entries for an imported FIR: 'filed' at its filing date and, when it
+    arrives past Pending, an 'imported' entry with its status and officer.
+    The register does not say when it was assigned or resolved, so neither
+    entry carries a metric and the FIR stays out of response-time averages;
+    'imported' marks them as such.
+    """
+    base = {'fir_id': doc['_id'], 'police_station': doc['police_station'], 'username': doc['username'],
+            'at': doc['filed_date'], 'actor': {'role': 'system', 'id': None}, 'imported': True}
+    entries = [{**base, 'kind': 'filed', 'from_status': None, 'to_status': 'Pending',
+                'remarks': f"Imported from {doc['import_source']}."}]
+    if doc['fir_status'] != 'Pending' or doc.get('assigned_officer_id'):
+        assigned = f", assigned to {doc['assigned_officer_name']}" if doc.get('assigned_officer_id') else ''
+        entries.append({**base, 'kind': 'imported', 'from_status': 'Pending', 'to_status': doc['fir_status'],
+                        'officer_id': doc.get('assigned_officer_id'),
+                        'remarks': f"Imported from {doc['import_source']} as {doc['fir_status']}{assigned}."})
+    return entries
+
+
+def record_imported_firs(docs):
+    """
+    The bookkeeping record_fir_changes does for new FIRs, for a batch loaded
+    by 'flask import-firs'. The event log gets imported_fir_log_entries,
+    dated at filing since the real history is not known; and nothing goes to
+    the live feed, which would flood open dashboards. The change counters
+    still move, so they reload.
+    """
+    transitions = [(None, doc) for doc in docs]
+    try:
+        fir_events_collection.insert_many(
+            [entry for doc in docs for entry in imported_fir_log_entries(doc)], ordered=False)
+    except Exception as e:
+        print(f"Could not append to the FIR event log: {e}")
+
+    apply_rollup_changes([(doc, 1) for doc in docs])
+
+    try:
+        assignment_engine.record_changes(transitions)
+    except Exception as e:
+        print(f"Could not update officer workloads: {e}")
+
+    try:
+        bump_change_counters(change_keys_for(transitions))
+    except Exception as e:
+        print(f"Could not bump change counters: {e}")
+
+
+def ingest_format_for(path):
+    extension = os.path.splitext(path)[1].lower().lstrip('.')
+    return {'csv': 'csv', 'ndjson': 'ndjson', 'jsonl': 'ndjson'}.get(extension)
+
+
+@app.cli.command('import-firs')
+@click.argument('input_path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--format', 'input_format', type=click.Choice(INGEST_FORMATS), default=None,
+              help='Defaults to the file extension.')
+@click.option('--source', default=None, help='Name stamped on the imported FIRs. Defaults to the file name.')
+@click.option('--batch-size', type=int, default=IMPORT_BATCH_SIZE)
+@click.option('--dead-letter', type=click.Path(dir_okay=False), default=None,
+              help='Where rejected rows go. Defaults to <input>.rejected.ndjson.')
+@click.option('--resume', is_flag=True, help='Continue an interrupted import from its checkpoint file.')
+def import_firs_command(input_path, input_format, source, batch_size, dead_letter, resume):
+    """
+    Load historical FIRs from a CSV or NDJSON file with the columns of
+    export-firs. Rows that cannot be imported are written, with the reason,
+    to the dead-letter file. Progress is checkpointed to <input>.checkpoint
+    after every batch, so --resume picks up an interrupted import where it
+    stopped; rows already imported are never inserted twice.
+    """
+    input_format = input_format or ingest_format_for(input_path)
+    if not input_format:
+        raise click.ClickException("Cannot tell the format from the file name; pass --format.")
+    source = source or os.path.basename(input_path)
+    dead_letter = dead_letter or input_path + '.rejected.ndjson'
+    checkpoint_path = input_path + '.checkpoint'
+    params = {'source': source, 'format': input_format}
+
+    start_after, offset, previous = 0, 0, {}
+    if resume:
+        if not os.path.exists(checkpoint_path):
+            raise click.ClickException(f"No checkpoint at {checkpoint_path}; nothing to resume.")
+        with open(checkpoint_path) as f:
+            checkpoint = json.load(f)
+        if checkpoint['params'] != params:
+            raise click.ClickException("The checkpoint was written for different import options.")
+        start_after, offset, previous = checkpoint['row'], checkpoint['dead_letter_offset'], checkpoint['totals']
+
+    station_districts = get_station_registry()['station_districts']
+    officers = {officer['badge_id']: officer
+                for officer in officers_collection.find({}, {'badge_id': 1, 'name': 1, 'station_name': 1})}
+
+    started = last_report = time.perf_counter()
+
+    def combined(totals):
+        return {key: previous.get(key, 0) + value for key, value in totals.items()}
+
+    with open(input_path, newline='', encoding='utf-8-sig') as f, \
+            open(dead_letter, 'r+' if resume and os.path.exists(dead_letter) else 'w') as rejects:
+        # Rejects past the checkpoint belong to rows that are about to be read again.
+        rejects.seek(offset)
+        rejects.truncate()
+
+        def on_reject(row_number, record, message):
+            rejects.write(json.dumps({'row': row_number, 'error': message, 'record': record}, default=str) + '\n')
+
+        def on_batch(last_row, totals):
+            nonlocal last_report
+            rejects.flush()
+            checkpoint = {'params': params, 'row': last_row, 'dead_letter_offset': rejects.tell(),
+                          'totals': combined(totals)}
+            with open(checkpoint_path + '.tmp', 'w') as checkpoint_file:
+                json.dump(checkpoint, checkpoint_file)
+            os.replace(checkpoint_path + '.tmp', checkpoint_path)
+            if time.perf_counter() - last_report >= 5:
+                last_report = time.perf_counter()
+                print(f"  row {last_row}: {totals['inserted']} inserted, {totals['rejected']} rejected "
+                      f"({totals['rows'] / (last_report - started):.0f} rows/s)")
+
+        totals = fir_importer.run(read_rows(f, input_format), source, station_districts, officers,
+                                  batch_size, start_after, on_reject, on_batch)
+
+    os.remove(checkpoint_path)
+    overall = combined(totals)
+    if not overall['rejected']:
+        os.remove(dead_letter)
+    elapsed = time.perf_counter() - started
+    print(f"Read {totals['rows']} rows in {elapsed:.1f}s ({totals['rows'] / elapsed if elapsed else 0:.0f} rows/s): "
+          f"{totals['inserted']} inserted, {totals['skipped']} already imported, {totals['rejected']} rejected.")
+    if overall['rejected']:
+        print(f"{overall['rejected']} rejected rows in total are listed in {dead_letter}.")
+    if DUPLICATE_DETECTION and totals['inserted']:
+        print("Run 'flask index-duplicates' to include the imported FIRs in duplicate detection.")
+
+
 @app.route("/admin/manage_officers")
 def manage_officers():
     if session.get('role') != 'admin':
@@ -237,10 +1898,14 @@ def manage_officers():
         flash("Admin session error: station not found.", "error")
         return redirect(url_for('admin_dashboard'))
 
-    station_firs = list(firs_collection.find({
-        'police_station': station_name,
-        'fir_status': {'$in': ['Pending', 'Under Investigation']}
-    }).sort("filed_date", -1))
+    try:
+        station_firs, next_token = paginate_firs({
+            'police_station': station_name,
+            'fir_status': {'$in': OPEN_FIR_STATUSES}
+        }, ASSIGNMENT_FIR_LIST_PROJECTION, get_page_size(), request.args.get('cursor'))
+    except ValueError:
+        flash("Invalid page link. Showing the first page.", "error")
+        return redirect(url_for('manage_officers'))
 
     station_officers = list(officers_collection.find(
         {'station_name': station_name, 'is_active': True}
@@ -248,6 +1913,7 @@ def manage_officers():
 
     return render_template('manage_officers.html',
                            firs=station_firs,
+                           next_token=next_token,
                            station_officers=station_officers,
                            station_name=station_name)
 
@@ -272,14 +1938,9 @@ def assign_officer():
             flash(f'Officer with Badge ID {officer_badge_id} not found.', 'danger')
             return redirect(url_for('manage_officers'))
 
-        firs_collection.update_one(
-            {'_id': fir_id},
-            {'$set': {
-                'assigned_officer_id': officer_badge_id,
-                'assigned_officer_name': officer.get('name', officer_badge_id),
-                'fir_status': 'Under Investigation'
-            }}
-        )
+        if not assign_fir_to_officer(fir_id, session.get('station_name'), officer, request.form.get('remarks') or None):
+            flash(f'FIR {fir_id_str} not found at this station.', 'danger')
+            return redirect(url_for('manage_officers'))
 
         flash(f"Successfully assigned Officer {officer.get('name')} to FIR {fir_id_str}.", 'success')
 
@@ -289,6 +1950,170 @@ def assign_officer():
 
     return redirect(url_for('manage_officers'))
 
+
+def officer_assignment_fields(officer):
+    return {
+        'assigned_officer_id': officer['badge_id'],
+        'assigned_officer_name': officer.get('name', officer['badge_id']),
+        'fir_status': 'Under Investigation'
+    }
+
+
+def assign_fir_to_officer(fir_id, station_name, officer, remarks=None):
+    """Assigns one FIR of the station to `officer`. Returns the FIR as it was before, or None."""
+    changes = officer_assignment_fields(officer)
+    before = firs_collection.find_one_and_update(
+        {'_id': fir_id, 'police_station': station_name},
+        {'$set': changes, '$inc': {'version': 1}},
+        return_document=ReturnDocument.BEFORE
+    )
+    if before:
+        record_fir_change(before, {**before, **changes}, remarks)
+    return before
+
+
+@app.route('/admin/auto_assign', methods=['POST'])
+def auto_assign_officer():
+    if session.get('role') != 'admin':
+        return jsonify({'error': 'Unauthorized'}), 401
+
+    station_name = session.get('station_name')
+    try:
+        fir_id_str = request.form.get('fir_id')
+        strategy = request.form.get('strategy') or AUTO_ASSIGN_STRATEGY or 'least_loaded'
+        if not fir_id_str or not ObjectId.is_valid(fir_id_str):
+            flash('Missing or invalid FIR ID.', 'danger')
+            return redirect(url_for('manage_officers'))
+        if strategy not in AssignmentEngine.STRATEGIES:
+            flash(f'Unknown assignment strategy {strategy}.', 'danger')
+            return redirect(url_for('manage_officers'))
+
+        fir = firs_collection.find_one({'_id': ObjectId(fir_id_str), 'police_station': station_name}, {'category': 1})
+        if not fir:
+            flash(f'FIR {fir_id_str} not found at this station.', 'danger')
+            return redirect(url_for('manage_officers'))
+
+        officer = assignment_engine.pick(station_name, fir.get('category'), strategy)
+        if not officer:
+            flash('There are no active officers at this station.', 'danger')
+            return redirect(url_for('manage_officers'))
+
+        if not assign_fir_to_officer(fir['_id'], station_name, officer, f"Automatically assigned to {officer.get('name')} ({strategy})."):
+            flash(f'FIR {fir_id_str} not found at this station.', 'danger')
+            return redirect(url_for('manage_officers'))
+
+        flash(f"Automatically assigned Officer {officer.get('name')} to FIR {fir_id_str}.", 'success')
+
+    except Exception as e:
+        print(f"Error auto-assigning officer: {e}")
+        flash('An error occurred during the assignment process.', 'danger')
+
+    return redirect(url_for('manage_officers'))
+
+# --- DUPLICATE REVIEW ---
+def flag_possible_duplicates(fir):
+    """
+    Adds the FIR to the duplicate index, then records the indexed FIRs it
+    probably duplicates. Indexing first means two copies submitted at the
+    same moment still find each other.
+    """
+    signature = duplicate_detector.signature(fir)
+    if signature is None:
+        return []
+    duplicate_detector.add(fir, signature)
+    matches = duplicate_detector.find_candidates(fir, signature)
+    if matches:
+        duplicate_detector.add(fir, signature, matches)
+    return matches
+
+
+DUPLICATE_SUMMARY_PROJECTION = {
+    'user_name': 1, 'category': 1, 'location': 1, 'incident_date': 1, 'filed_date': 1, 'fir_status': 1
+}
+
+
+def load_fir_summaries(fir_ids):
+    """Returns {fir_id: summary} for the listed FIRs from both tiers."""
+    summaries = {}
+    for collection in (firs_collection, firs_archive_collection):
+        missing = [fir_id for fir_id in fir_ids if fir_id not in summaries]
+        if not missing:
+            break
+        for fir in collection.find({'_id': {'$in': missing}}, DUPLICATE_SUMMARY_PROJECTION):
+            summaries[fir['_id']] = fir
+    return summaries
+
+
+@app.route("/admin/duplicates")
+def admin_duplicates():
+    if session.get('role') != 'admin':
+        return redirect(url_for('login_page'))
+
+    station_name = session.get('station_name')
+    if not station_name:
+        flash("Admin session error: station not found.", "error")
+        return redirect(url_for('admin_dashboard'))
+
+    try:
+        entries, next_token = paginate_firs(
+            {'police_station': station_name, 'review': 'pending'}, {'matches': 1, 'filed_date': 1},
+            get_page_size(), request.args.get('cursor'), collection=fir_duplicates_collection
+        )
+    except ValueError:
+        flash("Invalid page link. Showing the first page.", "error")
+        return redirect(url_for('admin_duplicates'))
+
+    summaries = load_fir_summaries(list({
+        fir_id for entry in entries
+        for fir_id in [entry['_id'], *(match['fir_id'] for match in entry['matches'])]
+    }))
+    return render_template('possible_duplicates.html', entries=entries, summaries=summaries,
+                           next_token=next_token, station_name=station_name)
+
+
+@app.route("/admin/duplicates/dismiss", methods=['POST'])
+def dismiss_duplicate():
+    if session.get('role') != 'admin':
+        return jsonify({'error': 'Unauthorized'}), 401
+
+    fir_id_str = request.form.get('fir_id', '')
+    if not ObjectId.is_valid(fir_id_str):
+        flash('Invalid FIR ID.', 'danger')
+        return redirect(url_for('admin_duplicates'))
+
+    result = fir_duplicates_collection.update_one(
+        {'_id': ObjectId(fir_id_str), 'police_station': session.get('station_name'), 'review': 'pending'},
+        {'$set': {'review': 'dismissed', 'reviewed_by': session.get('admin_id'), 'reviewed_at': datetime.utcnow()}}
+    )
+    if result.modified_count:
+        flash(f'FIR {fir_id_str} is no longer marked as a possible duplicate.', 'success')
+    else:
+        flash(f'FIR {fir_id_str} is not awaiting duplicate review.', 'danger')
+    return redirect(url_for('admin_duplicates'))
+
+
+@app.cli.command('index-duplicates')
+@click.option('--station', default=None, help='Only index this police station.')
+def index_duplicates_command(station):
+    """Add FIRs filed before duplicate detection existed to the duplicate index, oldest first."""
+    query = {'police_station': station} if station else {}
+    fields = {'police_station': 1, 'description': 1, 'location': 1, 'accused_names': 1,
+              'incident_date': 1, 'filed_date': 1}
+    cursor = firs_collection.find(query, fields).sort([('filed_date', ASCENDING), ('_id', ASCENDING)])
+    added = flagged = 0
+    while True:
+        batch = list(itertools.islice(cursor, 1000))
+        if not batch:
+            break
+        indexed = {entry['_id'] for entry in fir_duplicates_collection.find(
+            {'_id': {'$in': [fir['_id'] for fir in batch]}}, {'_id': 1})}
+        for fir in batch:
+            if fir['_id'] not in indexed:
+                added += 1
+                flagged += bool(flag_possible_duplicates(fir))
+    print(f"Indexed {added} FIRs; {flagged} flagged as possible duplicates.")
+
+
 @app.route("/admin/analytics")
 def admin_analytics():
     if session.get('role') != 'admin':
@@ -308,26 +2133,62 @@ def analytics_data():
         return jsonify({"error": "Admin station not found in session"}), 400
 
     try:
-        pipeline = [
-            {
-                '$match': { 'police_station': station_name }
-            },
-            {
-                '$group': {
-                    '_id': '$category',
-                    'count': { '$sum': 1 }
-                }
-            },
-            {
-                '$sort': { 'count': -1 }
-            }
-        ]
+        date_from = parse_date_arg('from')
+        date_to = parse_date_arg('to', end_of_day=True)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
 
-        results = list(firs_collection.aggregate(pipeline))
+    etag = view_etag('analytics_data', station_name, change_counter(station_change_key(station_name)))
+    cached = not_modified(etag)
+    if cached:
+        return cached
 
-        data_for_chart = {item['_id']: item['count'] for item in results}
-
-        return jsonify(data_for_chart)
+    try:
+        query = {'police_station': station_name}
+        if date_from or date_to:
+            query['day'] = {}
+            if date_from:
+                query['day']['$gte'] = date_from
+            if date_to:
+                query['day']['$lt'] = date_to
+
+        categories, statuses, officers, daily = {}, {}, {}, {}
+        for row in fir_rollups_read_collection.find(query, {'_id': 0, 'police_station': 0}):
+            count = row['count']
+            if not count:
+                continue
+            categories[row['category']] = categories.get(row['category'], 0) + count
+            statuses[row['fir_status']] = statuses.get(row['fir_status'], 0) + count
+            day = row['day'].strftime('%Y-%m-%d')
+            daily[day] = daily.get(day, 0) + count
+            officer_id = row.get('assigned_officer_id')
+            if officer_id:
+                workload = officers.setdefault(officer_id, {'open': 0, 'resolved': 0})
+                workload['open' if row['fir_status'] in OPEN_FIR_STATUSES else 'resolved'] += count
+
+        officer_names = {
+            officer['badge_id']: officer.get('name', officer['badge_id'])
+            for officer in officers_read_collection.find(
+                {'station_name': station_name}, {'badge_id': 1, 'name': 1, '_id': 0})
+        }
+        station_times, officer_times = response_time_stats(station_name, date_from, date_to)
+
+        return with_etag(jsonify({
+            'categories': dict(sorted(categories.items(), key=lambda item: item[1], reverse=True)),
+            'statuses': statuses,
+            'officers': [
+                {'badge_id': badge_id, 'name': officer_names.get(badge_id, badge_id), **workload}
+                for badge_id, workload in sorted(officers.items(), key=lambda item: item[1]['open'], reverse=True)
+            ],
+            'daily': [{'day': day, 'count': daily[day]} for day in sorted(daily)],
+            'response_times': {
+                'station': station_times,
+                'officers': [
+                    {'badge_id': badge_id, 'name': officer_names.get(badge_id, badge_id), **times}
+                    for badge_id, times in sorted(officer_times.items())
+                ]
+            }
+        }), etag)
 
     except Exception as e:
         print(f"Error generating analytics data: {e}")
@@ -375,18 +2236,24 @@ def add_station_officer():
         'badge_id': badge_id,
         'station_name': station_name,
         'is_active': True,
+        'open_cases': 0,
         'created_at': datetime.utcnow()
     }
     officers_collection.insert_one(officer_doc)
-    
+    # Officer names appear in the station's analytics.
+    bump_change_counters([station_change_key(station_name)])
+
     return jsonify({'message': f'Officer {officer_name} added successfully.'}), 201
 
 @app.route("/user_dashboard")
 def user_dashboard():
     if session.get('role') == 'user' and session.get('username'):
         username = session['username']
-        user_firs = list(firs_collection.find({'username': username}).sort("filed_date", -1))
-        return render_template('user_dashboard.html', user={'username': username}, firs=user_firs)
+        # The FIR table is filled in by user_dashboard.js through /user/firs, so
+        # the page itself only changes with the user (or a new release).
+        etag = view_etag('user_dashboard', username)
+        return not_modified(etag) or with_etag(
+            render_template('user_dashboard.html', user={'username': username}), etag)
     return redirect(url_for('login_page'))
 
 
@@ -396,13 +2263,29 @@ def submit_fir():
         return jsonify({'error': 'Unauthorized'}), 401
 
     try:
-        documents = request.files.getlist('file-upload')
-        saved_documents_data = []
-        for doc in documents:
-            if doc and doc.filename:
-                doc_data = upload_file_to_cloudinary(doc)
-                if doc_data:
-                    saved_documents_data.append(doc_data)
+        police_station = request.form['police-station']
+        district = request.form['district']
+        station_district = get_station_registry()['station_districts'].get(police_station)
+        if station_district is None:
+            return jsonify({'error': 'Please select a valid police station.'}), 400
+        if station_district != district:
+            return jsonify({'error': f'{police_station} is not in the {district} district.'}), 400
+
+        # Files are read up front: in deferred mode the uploads outlive this request.
+        pending_uploads = [
+            {'upload_id': uuid.uuid4().hex, 'filename': doc.filename, 'data': doc.read()}
+            for doc in request.files.getlist('file-upload')
+            if doc and doc.filename
+        ]
+
+        if UPLOAD_MODE == 'deferred':
+            saved_documents_data = [
+                {'upload_id': item['upload_id'], 'filename': item['filename'], 'status': 'pending'}
+                for item in pending_uploads
+            ]
+        else:
+            futures = [upload_executor.submit(upload_evidence, item) for item in pending_uploads]
+            saved_documents_data = [future.result() for future in futures]
 
         incident_date_str = request.form['incident-date']
         
@@ -412,7 +2295,7 @@ def submit_fir():
             "username": session['username'],
             "user_name": request.form['user-name'],
             "state": request.form['state'],
-            "district": request.form['district'],
+            "district": district,
             "user_address": request.form['user-address'],
             "mobile": request.form['mobile'],
             "category": request.form['category'],
@@ -420,16 +2303,39 @@ def submit_fir():
             "accused_names": accused_names,
             "incident_date": datetime.strptime(incident_date_str, '%Y-%m-%dT%H:%M'),
             "location": request.form['location'],
-            "police_station": request.form['police-station'],
+            "police_station": police_station,
             "description": request.form['description'],
             "supporting_documents": saved_documents_data,
             "fir_status": "Pending",
             "filed_date": datetime.utcnow(),
             "assigned_officer_id": None,
-            "assigned_officer_name": "Unassigned"
+            "assigned_officer_name": "Unassigned",
+            "version": 1
         }
 
-        firs_collection.insert_one(new_fir)
+        if AUTO_ASSIGN_STRATEGY:
+            officer = assignment_engine.pick(police_station, new_fir['category'], AUTO_ASSIGN_STRATEGY)
+            if officer:
+                new_fir.update(officer_assignment_fields(officer))
+
+        result = firs_collection.insert_one(new_fir)
+        record_fir_change(None, new_fir)
+
+        if DUPLICATE_DETECTION:
+            try:
+                flag_possible_duplicates(new_fir)
+            except Exception as e:
+                # 'flask index-duplicates' indexes anything missed here.
+                print(f"Could not check FIR {result.inserted_id} for duplicates: {e}")
+
+        if UPLOAD_MODE == 'deferred':
+            for item in pending_uploads:
+                upload_executor.submit(upload_and_attach_evidence, result.inserted_id, item)
+            return jsonify({'message': 'FIR submitted successfully! Your evidence files are still uploading.'}), 201
+
+        failed_uploads = [doc['filename'] for doc in saved_documents_data if doc['status'] == 'failed']
+        if failed_uploads:
+            return jsonify({'message': f"FIR submitted successfully, but these files could not be uploaded: {', '.join(failed_uploads)}"}), 201
         return jsonify({'message': 'FIR submitted successfully!'}), 201
 
     except Exception as e:
@@ -446,19 +2352,165 @@ def update_fir_status():
     try:
         fir_id = ObjectId(data.get('fir_id'))
         new_status = data.get('status')
+        if new_status not in FIR_STATUSES:
+            return jsonify({'error': f"Status must be one of: {', '.join(FIR_STATUSES)}"}), 400
 
-        result = firs_collection.update_one(
-            {'_id': fir_id},
-            {'$set': {'fir_status': new_status}}
+        before = firs_collection.find_one_and_update(
+            {'_id': fir_id, 'police_station': session.get('station_name')},
+            {'$set': {'fir_status': new_status}, '$inc': {'version': 1}},
+            return_document=ReturnDocument.BEFORE
         )
-        if result.matched_count == 0:
+        if not before:
             return jsonify({'error': 'FIR not found'}), 404
 
+        record_fir_change(before, {**before, 'fir_status': new_status}, data.get('remarks') or None)
+
         return jsonify({'message': 'FIR status updated successfully'}), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 
+def load_station_firs_for_bulk(fir_id_strings, station_name):
+    """
+    Validates a bulk request's FIR ids against the admin's station with one
+    query. Returns (firs_by_id, results) where results already holds an entry
+    for every id that is malformed or not at this station.
+    """
+    results = {}
+    object_ids = []
+    for fir_id_str in fir_id_strings:
+        if ObjectId.is_valid(fir_id_str):
+            object_ids.append(ObjectId(fir_id_str))
+        else:
+            results[fir_id_str] = 'invalid_id'
+
+    firs_by_id = {
+        str(fir['_id']): fir for fir in firs_collection.find(
+            {'_id': {'$in': object_ids}, 'police_station': station_name},
+            {'police_station': 1, 'filed_date': 1, 'category': 1, 'fir_status': 1, 'version': 1,
+             'assigned_officer_id': 1, 'assigned_officer_name': 1, 'username': 1, 'user_name': 1}
+        )
+    }
+    for object_id in object_ids:
+        if str(object_id) not in firs_by_id:
+            results[str(object_id)] = 'not_found'
+    return firs_by_id, results
+
+
+def apply_bulk_fir_update(fir_id_strings, station_name, changes):
+    """
+    Sets `changes` on every listed FIR of the station with one bulk_write per
+    round and returns the per-item results as a JSON response. Each update
+    only matches the FIR as it was read (status, officer and version), so
+    the transitions handed to record_fir_changes are the ones that happened.
+    FIRs another request changed in between are re-read and retried, up to
+    BULK_UPDATE_ATTEMPTS rounds; any still moving are reported as 'conflict'.
+    """
+    firs_by_id, results = load_station_firs_for_bulk(fir_id_strings, station_name)
+
+    updated = 0
+    for attempt in range(BULK_UPDATE_ATTEMPTS):
+        pending = {}
+        for fir_id_str, fir in firs_by_id.items():
+            if all(fir.get(field) == value for field, value in changes.items()):
+                results[fir_id_str] = 'unchanged'
+            else:
+                pending[fir_id_str] = fir
+        if not pending:
+            break
+
+        # Tags the FIRs this round wrote, in case some filters missed.
+        write_id = ObjectId()
+        outcome = firs_collection.bulk_write([
+            UpdateOne({'_id': fir['_id'], 'police_station': station_name, 'fir_status': fir.get('fir_status'),
+                       'assigned_officer_id': fir.get('assigned_officer_id'), 'version': fir.get('version')},
+                      {'$set': {**changes, 'last_bulk_write': write_id}, '$inc': {'version': 1}})
+            for fir in pending.values()
+        ], ordered=False)
+        if outcome.matched_count == len(pending):
+            written = set(pending)
+        else:
+            written = {str(fir['_id']) for fir in firs_collection.find(
+                {'_id': {'$in': [fir['_id'] for fir in pending.values()]}, 'last_bulk_write': write_id}, {'_id': 1})}
+
+        if written:
+            record_fir_changes([(pending[fir_id_str], {**pending[fir_id_str], **changes}) for fir_id_str in written])
+            updated += len(written)
+            results.update({fir_id_str: 'updated' for fir_id_str in written})
+
+        missed = [fir_id_str for fir_id_str in pending if fir_id_str not in written]
+        firs_by_id, reread = load_station_firs_for_bulk(missed, station_name)
+        results.update(reread)
+        for fir_id_str in missed:
+            results.setdefault(fir_id_str, 'conflict')
+
+    return jsonify({
+        'updated': updated,
+        'results': [{'fir_id': fir_id_str, 'result': results[fir_id_str]} for fir_id_str in fir_id_strings]
+    })
+
+
+def read_bulk_fir_ids(data):
+    fir_ids = data.get('fir_ids')
+    if not isinstance(fir_ids, list) or not fir_ids:
+        raise ValueError('fir_ids must be a non-empty list.')
+    if len(fir_ids) > MAX_BULK_FIRS:
+        raise ValueError(f'At most {MAX_BULK_FIRS} FIRs can be updated at once.')
+    # Keep the caller's order but drop repeats.
+    return list(dict.fromkeys(str(fir_id) for fir_id in fir_ids))
+
+
+@app.route('/admin/firs/bulk_status', methods=['POST'])
+def bulk_update_fir_status():
+    if session.get('role') != 'admin':
+        return jsonify({'error': 'Unauthorized'}), 401
+
+    station_name = session.get('station_name')
+    if not station_name:
+        return jsonify({'error': 'Admin station not found'}), 400
+
+    data = request.json or {}
+    new_status = data.get('status')
+    if new_status not in FIR_STATUSES:
+        return jsonify({'error': f"Status must be one of: {', '.join(FIR_STATUSES)}"}), 400
+
+    try:
+        fir_ids = read_bulk_fir_ids(data)
+        return apply_bulk_fir_update(fir_ids, station_name, {'fir_status': new_status})
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        print(f"Error in bulk status update: {e}")
+        return jsonify({'error': 'Could not update the selected FIRs.'}), 500
+
+
+@app.route('/admin/firs/bulk_assign', methods=['POST'])
+def bulk_assign_officer():
+    if session.get('role') != 'admin':
+        return jsonify({'error': 'Unauthorized'}), 401
+
+    station_name = session.get('station_name')
+    if not station_name:
+        return jsonify({'error': 'Admin station not found'}), 400
+
+    data = request.json or {}
+    officer_badge_id = data.get('officer_id')
+    if not officer_badge_id or not isinstance(officer_badge_id, str):
+        return jsonify({'error': 'officer_id is required.'}), 400
+    officer = officers_collection.find_one({'badge_id': officer_badge_id, 'station_name': station_name})
+    if not officer:
+        return jsonify({'error': f'Officer with Badge ID {officer_badge_id} not found.'}), 404
+
+    try:
+        fir_ids = read_bulk_fir_ids(data)
+        return apply_bulk_fir_update(fir_ids, station_name, officer_assignment_fields(officer))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        print(f"Error in bulk officer assignment: {e}")
+        return jsonify({'error': 'Could not assign the selected FIRs.'}), 500
+
+
 @app.route("/logout", methods=["POST"])
 def logout():
     session.clear()
@@ -468,51 +2520,247 @@ def logout():
 @app.route('/api/police_stations')
 def get_police_stations():
     try:
-        stations_cursor = admins_collection.find({}, {'station_name': 1, '_id': 0})
-        stations_by_district = {}
-
-        for station_doc in stations_cursor:
-            full_name = station_doc.get('station_name', '')
-            parts = full_name.split(', ')
-            if len(parts) == 2:
-                district = parts[1]
-                stations_by_district.setdefault(district, []).append({'name': full_name})
-
-        return jsonify(stations_by_district)
+        registry = get_station_registry()
     except Exception as e:
         print(f"Error fetching police stations: {e}")
         return jsonify({"error": "Could not fetch police station data"}), 500
 
+    response = app.response_class(registry['body'], mimetype='application/json')
+    response.set_etag(registry['etag'])
+    response.cache_control.public = True
+    response.cache_control.max_age = STATION_LIST_MAX_AGE
+    return response.make_conditional(request)
+
 @app.route('/user/firs')
 def get_user_firs():
     if session.get('role') != 'user' or 'username' not in session:
         return jsonify({'error': 'Unauthorized'}), 401
 
     username = session['username']
-    user_firs = list(firs_collection.find({'username': username}).sort("filed_date", -1))
+    etag = view_etag('user_firs', username, change_counter(user_change_key(username)))
+    cached = not_modified(etag)
+    if cached:
+        return cached
 
-    for fir in user_firs:
-        fir['_id'] = str(fir['_id'])
-        fir['filed_date'] = fir['filed_date'].isoformat()
-        if 'incident_date' in fir:
-            fir['incident_date'] = fir['incident_date'].isoformat()
+    page_size = get_page_size()
+    try:
+        # A citizen's history spans both tiers; the keyset token is the same for each.
+        cursor = FirArchive.merge([
+            firs_page_cursor({'username': username}, USER_FIR_LIST_PROJECTION, page_size,
+                             request.args.get('cursor'), collection)
+            for collection in (firs_read_collection, firs_archive_read_collection)
+        ], FIR_LIST_SORT)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
 
-    return jsonify({'firs': user_firs})
+    return with_etag(stream_firs_page(cursor, page_size), etag)
 
 
-def upload_file_to_cloudinary(file):
-    if not file:
-        return None
-    try:
-        upload_result = cloudinary.uploader.upload(file, resource_type="auto")
-        return {
-            "url": upload_result.get('secure_url'),
-            "public_id": upload_result.get('public_id'),
-            "resource_type": upload_result.get('resource_type')
+# --- EVIDENCE UPLOADS ---
+def upload_evidence(item):
+    """
+    Uploads one file through the storage backend, retrying with exponential
+    backoff. Never raises: a file that still fails is returned as a 'failed'
+    document so the FIR records it instead of the whole submission failing.
+    """
+    last_error = None
+    for attempt in range(UPLOAD_RETRIES):
+        try:
+            with external_call_seconds.time(operation='storage_upload'):
+                doc_data = get_storage().upload(item['data'], item['filename'])
+            doc_data.update({'upload_id': item['upload_id'], 'filename': item['filename'], 'status': 'uploaded'})
+            return doc_data
+        except Exception as e:
+            last_error = e
+            print(f"Upload of {item['filename']} failed (attempt {attempt + 1}/{UPLOAD_RETRIES}): {e}")
+            if attempt + 1 < UPLOAD_RETRIES:
+                time.sleep(2 ** attempt)
+
+    return {
+        'upload_id': item['upload_id'],
+        'filename': item['filename'],
+        'status': 'failed',
+        'error': str(last_error)
+    }
+
+
+def upload_and_attach_evidence(fir_id, item):
+    """Deferred mode: uploads a file and patches it into the FIR's pending document slot."""
+    doc_data = upload_evidence(item)
+    result = firs_collection.update_one(
+        {'_id': fir_id, 'supporting_documents.upload_id': item['upload_id']},
+        {'$set': {'supporting_documents.$': doc_data}, '$inc': {'version': 1}}
+    )
+    if result.matched_count == 0 and doc_data['status'] == 'uploaded':
+        # The FIR was cancelled while the upload was running.
+        enqueue_evidence_deletion([doc_data], fir_id)
+
+
+def fail_stale_uploads(now=None):
+    """
+    Marks deferred upload slots that are still 'pending' UPLOAD_STALE_MINUTES
+    after filing as 'failed'. Their file bytes were held by a worker that has
+    since gone away, so nothing will ever patch them in. Returns the number
+    of FIRs updated.
+    """
+    cutoff = (now or datetime.utcnow()) - timedelta(minutes=UPLOAD_STALE_MINUTES)
+    result = firs_collection.update_many(
+        {'supporting_documents.status': 'pending', 'filed_date': {'$lt': cutoff}},
+        {'$set': {'supporting_documents.$[slot].status': 'failed',
+                  'supporting_documents.$[slot].error': 'The upload was interrupted before it finished.'},
+         '$inc': {'version': 1}},
+        array_filters=[{'slot.status': 'pending'}]
+    )
+    return result.modified_count
+
+
+# --- EVIDENCE DELETION OUTBOX ---
+def enqueue_evidence_deletion(documents, fir_id=None):
+    """Records stored objects that must be deleted; the reaper removes them from storage later."""
+    now = datetime.utcnow()
+    outbox_docs = [
+        {
+            'public_id': doc['public_id'],
+            'resource_type': doc['resource_type'],
+            'fir_id': fir_id,
+            'status': 'pending',
+            'attempts': 0,
+            'created_at': now,
+            'next_attempt_at': now
         }
-    except Exception as e:
-        print(f"Cloudinary upload failed: {e}")
-        raise e
+        for doc in documents if doc.get('public_id')
+    ]
+    if outbox_docs:
+        evidence_deletions_collection.insert_many(outbox_docs, ordered=False)
+    return len(outbox_docs)
+
+
+def drain_evidence_deletions(batch_size=500):
+    """
+    Claims due outbox entries and deletes them from storage in batches grouped
+    by resource_type. Entries are leased for a few minutes while being worked
+    so several workers can drain concurrently without repeating each other.
+    Failed batches are retried with exponential backoff until
+    EVIDENCE_DELETE_MAX_ATTEMPTS, after which they are marked 'failed'.
+    Returns the number of objects deleted.
+    """
+    now = datetime.utcnow()
+    claim_id = uuid.uuid4().hex
+    due_ids = [doc['_id'] for doc in evidence_deletions_collection.find(
+        {'status': 'pending', 'next_attempt_at': {'$lte': now}}, {'_id': 1}
+    ).limit(batch_size)]
+    if not due_ids:
+        return 0
+
+    evidence_deletions_collection.update_many(
+        {'_id': {'$in': due_ids}, 'status': 'pending', 'next_attempt_at': {'$lte': now}},
+        {'$set': {'claim_id': claim_id, 'next_attempt_at': now + timedelta(minutes=5)}}
+    )
+    claimed = list(evidence_deletions_collection.find({'claim_id': claim_id}))
+
+    by_resource_type = {}
+    for entry in claimed:
+        by_resource_type.setdefault(entry['resource_type'], []).append(entry)
+
+    deleted_count = 0
+    for resource_type, entries in by_resource_type.items():
+        storage = get_storage()
+        for start in range(0, len(entries), storage.max_batch_size):
+            batch = entries[start:start + storage.max_batch_size]
+            public_ids = [entry['public_id'] for entry in batch]
+            try:
+                with external_call_seconds.time(operation='storage_delete'):
+                    deleted_ids = set(storage.delete_many(public_ids, resource_type))
+                error = 'Not confirmed deleted by storage backend'
+            except Exception as e:
+                print(f"Batch delete of {len(batch)} {resource_type} objects failed: {e}")
+                deleted_ids = set()
+                error = str(e)
+
+            done = [entry['_id'] for entry in batch if entry['public_id'] in deleted_ids]
+            if done:
+                evidence_deletions_collection.delete_many({'_id': {'$in': done}})
+                deleted_count += len(done)
+
+            for entry in batch:
+                if entry['public_id'] in deleted_ids:
+                    continue
+                attempts = entry.get('attempts', 0) + 1
+                evidence_deletions_collection.update_one(
+                    {'_id': entry['_id']},
+                    {'$set': {
+                        'attempts': attempts,
+                        'last_error': error,
+                        'status': 'failed' if attempts >= EVIDENCE_DELETE_MAX_ATTEMPTS else 'pending',
+                        'next_attempt_at': datetime.utcnow() + timedelta(seconds=30 * 2 ** attempts)
+                    }, '$unset': {'claim_id': ''}}
+                )
+
+    return deleted_count
+
+
+def reconcile_evidence_storage():
+    """
+    Finds stored objects that no FIR references and that are not already
+    queued, and queues them for deletion. Catches blobs orphaned by crashes
+    between deleting a FIR and writing its outbox entries.
+    """
+    cutoff = datetime.utcnow() - timedelta(hours=EVIDENCE_ORPHAN_GRACE_HOURS)
+    orphans = []
+    for public_id, resource_type, created_at in get_storage().list_objects():
+        if created_at > cutoff:
+            continue
+        if fir_archive.find_one({'supporting_documents.public_id': public_id}, {'_id': 1}):
+            continue
+        if evidence_deletions_collection.find_one({'public_id': public_id}, {'_id': 1}):
+            continue
+        orphans.append({'public_id': public_id, 'resource_type': resource_type})
+
+    enqueue_evidence_deletion(orphans)
+    print(f"Reconciliation queued {len(orphans)} orphaned objects for deletion.")
+    return len(orphans)
+
+
+def run_evidence_reaper():
+    while True:
+        time.sleep(EVIDENCE_REAPER_INTERVAL)
+        try:
+            fail_stale_uploads()
+            while drain_evidence_deletions():
+                pass
+        except Exception as e:
+            print(f"Evidence reaper error: {e}")
+
+
+@app.cli.command('reap-evidence')
+def reap_evidence_command():
+    """Drain the evidence deletion outbox once and fail interrupted uploads."""
+    stale = fail_stale_uploads()
+    if stale:
+        print(f"Marked interrupted uploads as failed on {stale} FIRs.")
+    total = 0
+    while True:
+        deleted = drain_evidence_deletions()
+        if not deleted:
+            break
+        total += deleted
+    print(f"Deleted {total} evidence objects.")
+
+
+@app.cli.command('reconcile-evidence')
+def reconcile_evidence_command():
+    """Queue stored evidence objects that no FIR references for deletion."""
+    reconcile_evidence_storage()
+
+
+@app.route('/uploads/<path:public_id>')
+def serve_local_upload(public_id):
+    if STORAGE_BACKEND != 'local':
+        return jsonify({'error': 'Not found'}), 404
+    if 'role' not in session:
+        return jsonify({'error': 'Unauthorized'}), 401
+    return send_from_directory(get_storage().root, public_id)
+
 
 @app.route('/fir/<fir_id>')
 def get_fir_details(fir_id):
@@ -521,21 +2769,23 @@ def get_fir_details(fir_id):
 
     try:
         obj_id = ObjectId(fir_id)
-        fir = firs_collection.find_one({'_id': obj_id})
+        stamp = fir_archive.find_one({'_id': obj_id}, {'username': 1, 'version': 1})
 
-        if not fir:
+        if not stamp:
             return jsonify({'error': 'FIR not found'}), 404
 
-        if session['role'] == 'user' and session['username'] != fir.get('username'):
+        if session['role'] == 'user' and session['username'] != stamp.get('username'):
             return jsonify({'error': 'Access denied'}), 403
 
-        fir['_id'] = str(fir['_id'])
-        if 'filed_date' in fir:
-            fir['filed_date'] = fir['filed_date'].isoformat()
-        if 'incident_date' in fir:
-            fir['incident_date'] = fir['incident_date'].isoformat()
+        etag = view_etag('fir', fir_id, stamp.get('version', 0))
+        cached = not_modified(etag)
+        if cached:
+            return cached
 
-        return jsonify({'fir': fir})
+        fir = fir_archive.find_one({'_id': obj_id})
+        if not fir:
+            return jsonify({'error': 'FIR not found'}), 404
+        return with_etag(jsonify({'fir': fir}), etag)
 
     except Exception as e:
         print(f"Error fetching FIR details: {e}")
@@ -559,23 +2809,26 @@ def cancel_fir(fir_id):
         if fir.get('fir_status') != 'Pending':
             return jsonify({'error': 'This FIR cannot be cancelled as it is already being processed.'}), 400
 
-        for doc in fir.get('supporting_documents', []):
-            try:
-                cloudinary.uploader.destroy(
-                    doc['public_id'],
-                    resource_type=doc['resource_type']
-                )
-                print(f"Deleted {doc['public_id']} from Cloudinary.")
-            except Exception as e:
-                print(f"Could not delete file {doc.get('public_id')} from Cloudinary: {e}")
+        result = firs_collection.delete_one({'_id': obj_id, 'fir_status': 'Pending'})
 
-        result = firs_collection.delete_one({'_id': obj_id})
-
-        if result.deleted_count == 1:
-            return jsonify({'message': 'FIR cancelled successfully.'}), 200
-        else:
+        if result.deleted_count != 1:
             return jsonify({'error': 'Cancellation failed on the server.'}), 500
 
+        record_fir_change(fir, None)
+
+        try:
+            duplicate_detector.remove([obj_id])
+        except Exception as e:
+            print(f"Could not remove FIR {fir_id} from the duplicate index: {e}")
+
+        # Evidence is removed from storage by the background reaper.
+        try:
+            enqueue_evidence_deletion(fir.get('supporting_documents', []), obj_id)
+        except Exception as e:
+            print(f"Could not queue evidence deletion for FIR {fir_id}; reconciliation will pick it up: {e}")
+
+        return jsonify({'message': 'FIR cancelled successfully.'}), 200
+
     except Exception as e:
         print(f"Error cancelling FIR {fir_id}: {e}")
         return jsonify({'error': 'An internal server error occurred.'}), 500
@@ -588,18 +2841,29 @@ def get_fir_timeline(fir_id):
 
     try:
         obj_id = ObjectId(fir_id)
-        fir = firs_collection.find_one({'_id': obj_id})
-
-        if not fir:
-            return jsonify({'error': 'FIR not found'}), 404
+        entries = list(fir_events_collection.find({'fir_id': obj_id}).sort([('at', ASCENDING), ('_id', ASCENDING)]))
+
+        if not entries:
+            # FIRs filed before the event log existed and not yet backfilled.
+            fir = fir_archive.find_one({'_id': obj_id}, {'username': 1, 'user_name': 1, 'filed_date': 1})
+            if not fir:
+                return jsonify({'error': 'FIR not found'}), 404
+            entries = [{'username': fir.get('username'), 'kind': 'filed', 'to_status': 'Pending',
+                        'at': fir['filed_date'], 'actor': {'role': 'user', 'id': fir.get('username')},
+                        'remarks': 'Initial report filed by the user.'}]
+
+        if session['role'] == 'user' and session['username'] != entries[0].get('username'):
+            return jsonify({'error': 'Access denied'}), 403
 
         timeline = [
             {
-                'status': 'Filed',
-                'timestamp': fir['filed_date'],
-                'updated_by': fir.get('user_name', 'N/A'),
-                'remarks': 'Initial report filed by the user.'
+                'event': entry['kind'],
+                'status': 'Filed' if entry['kind'] == 'filed' else entry.get('to_status') or 'Cancelled',
+                'timestamp': entry['at'],
+                'updated_by': entry['actor'].get('id') or 'System',
+                'remarks': entry.get('remarks')
             }
+            for entry in entries
         ]
 
         return jsonify({'timeline': timeline})
@@ -608,79 +2872,263 @@ def get_fir_timeline(fir_id):
         print(f"Error fetching FIR timeline: {e}")
         return jsonify({'error': 'Invalid FIR ID or server error'}), 400
 
-@app.route('/chatbot/ask', methods=['POST'])
-def chatbot_ask():
-    if 'username' not in session:
-        return jsonify({"error": "Unauthorized"}), 401
+# --- LIVE EVENTS ---
+def feed_events_for(transitions):
+    """Builds one feed event per (before, after) FIR transition for its station and filer."""
+    events = []
+    for before, after in transitions:
+        fir = after or before
+        events.append({
+            'type': 'created' if before is None else 'cancelled' if after is None else 'updated',
+            'channels': [f"station:{fir.get('police_station')}", f"user:{fir.get('username')}"],
+            'fir': {'_id': fir['_id'], **{field: fir[field] for field in FIR_EVENT_FIELDS if field in fir}}
+        })
+    return events
 
-    if not bard_chatbot:
-        return jsonify({"response": "I am currently offline. My AI model is not configured."}), 503
 
-    user_message = request.json.get('message')
-    if not user_message:
-        return jsonify({"error": "No message provided"}), 400
+def sse_event(event, data, event_id=None):
+    id_line = f"id: {event_id}\n" if event_id else ''
+    return f"{id_line}event: {event}\ndata: {app.json.dumps(data)}\n\n"
 
-    if 'chat_history' not in session:
-        session['chat_history'] = []
 
-    try:
-        persona_prompt = f"""
-        ### Your Identity and Role
-        You are FIR-Bot, an AI assistant for the 'Smart FIR Filing System'. Your tone must be **professional, empathetic, clear, and reassuring**. Avoid complex legal jargon.
+def event_channels():
+    """Feed channels of the logged-in admin's station or user's own FIRs, or None."""
+    if session.get('role') == 'admin' and session.get('station_name'):
+        return [f"station:{session['station_name']}"]
+    if session.get('role') == 'user' and session.get('username'):
+        return [f"user:{session['username']}"]
+    return None
 
-        ### Formatting Rules (VERY IMPORTANT)
-        - **Use Markdown:** Structure all your responses for maximum readability.
-        - **Break Up Text:** Use short paragraphs. **NEVER** respond with a single, long block of text.
-        - **Use Lists:** Use bullet points (`*`) for lists of items or suggestions (e.g., types of evidence). Use numbered lists (`1.`, `2.`) for step-by-step instructions.
-        - **Use Bold:** Use bold text (`**text**`) to highlight key terms, actions, or important information. This is crucial for user guidance.
 
-        ### Your Core Tasks
-        1.  **Guide Users:** Help the user fill out the 'File a New FIR' form by explaining what each field means.
-        2.  **Answer Questions:** Answer specific questions about the FIR filing process, what documents are needed, and the difference between various types of complaints.
-        3.  **Explain Legal Rights:** Provide clear, general information about a citizen's legal rights. You **MUST** include a disclaimer that this is for informational purposes only and not legal advice.
-        4.  **Check Status:** If a user asks about their FIR status, guide them to the **'Your Filed FIRs'** table on their dashboard.
-        5.  **Handle Emergencies:** If the user describes a crime in progress, an immediate threat, or an injury, your **ABSOLUTE PRIORITY** is to advise them to **stop chatting and immediately call the emergency number 112**.
+def streaming_events():
+    """Whether /events/stream may hold connections open in this process right now."""
+    if FIR_EVENTS_TRANSPORT != 'auto':
+        return FIR_EVENTS_TRANSPORT == 'stream'
+    return cooperative_worker() and fir_event_feed.active_mode != 'local'
 
-        ### Your Response
-        Based on all the instructions above, provide a direct, helpful, and well-formatted response to the user's message.
-        **Do NOT introduce yourself again** (e.g., "Hello, I am FIR-Bot...") unless the user asks who you are.
 
-        User's message: "{user_message}"
-        """
+def stream_subscriber_cap():
+    """Streams this process may hold: each one is a greenlet under gevent/eventlet, a thread otherwise."""
+    if cooperative_worker():
+        return fir_event_feed.max_subscribers
+    return min(fir_event_feed.max_subscribers, WORKER_THREADS // 2)
 
-        response_data = bard_chatbot.get_answer(persona_prompt)
-        bot_response = response_data['content']
 
-        session['chat_history'].append({"role": "user", "text": user_message})
-        session['chat_history'].append({"role": "bot", "text": bot_response})
-        session.modified = True
+@app.route('/events/stream')
+def fir_event_stream():
+    """
+    Server-Sent Events feed of FIR changes: the admin's station or the user's
+    own FIRs. Browsers reconnect with Last-Event-ID and get what they missed.
+    Answers 204 when streaming is off, which stops EventSource from
+    reconnecting; the dashboards then fall back to /events/poll.
+    """
+    channels = event_channels()
+    if channels is None:
+        return jsonify({'error': 'Unauthorized'}), 401
+    if not streaming_events():
+        return Response(status=204)
+
+    last_event_id = request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
+    try:
+        events = fir_event_feed.listen(channels, last_event_id, FIR_EVENTS_KEEPALIVE, stream_subscriber_cap())
+    except FeedFull as e:
+        return jsonify({'error': str(e)}), 503, {'Retry-After': str(FIR_EVENTS_RETRY_MS // 1000 or 1)}
+
+    def generate():
+        try:
+            yield f"retry: {FIR_EVENTS_RETRY_MS}\n\n"
+            for event in events:
+                if event is None:
+                    # The feed fell back to in-process delivery, which misses
+                    # other workers' changes: end the stream so the browser
+                    # reconnects, gets 204 and polls instead.
+                    if not streaming_events():
+                        return
+                    yield ": keepalive\n\n"
+                    continue
+                yield sse_event('fir', {'type': event['type'], 'fir': event['fir']}, event['_id'])
+        finally:
+            events.close()
+
+    return Response(stream_with_context(generate()), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+
+@app.route('/events/poll')
+def fir_event_poll():
+    """
+    Polling counterpart of /events/stream: the FIR changes stored since
+    ?after=<event id>, read from the shared feed collection so every worker
+    sees every change. Without `after` it only returns a starting id.
+    """
+    channels = event_channels()
+    if channels is None:
+        return jsonify({'error': 'Unauthorized'}), 401
+
+    after = request.args.get('after', '')
+    events = fir_event_feed.backfill(channels, after, FIR_EVENTS_POLL_LIMIT)
+    if events:
+        last_id = str(events[-1]['_id'])
+    else:
+        last_id = after if ObjectId.is_valid(after) else str(ObjectId())
+    return jsonify({
+        'events': [{'id': str(event['_id']), 'type': event['type'], 'fir': event['fir']} for event in events],
+        'last_id': last_id,
+        'retry_ms': FIR_EVENTS_POLL_MS
+    })
+
+
+# --- CHAT HISTORY ---
+# One document per user holds the conversation as a capped array: $push with
+# $slice keeps only the newest messages, so the store is a ring buffer.
+def append_chat_history(username, user_message, bot_response):
+    chat_history_collection.update_one(
+        {'_id': username},
+        {
+            '$push': {'messages': {
+                '$each': [{"role": "user", "text": user_message}, {"role": "bot", "text": bot_response}],
+                '$slice': -2 * CHAT_HISTORY_MAX_TURNS
+            }},
+            '$inc': {'message_count': 2},
+            '$set': {'updated_at': datetime.utcnow()}
+        },
+        upsert=True
+    )
+
+
+def get_chat_history_page(username, offset, limit):
+    """
+    Returns (messages, next_offset) for the `limit` messages that end `offset`
+    messages before the newest one, oldest first.
+    """
+    doc = chat_history_collection.find_one(
+        {'_id': username},
+        {'messages': {'$slice': [-(offset + limit), limit]}, 'message_count': 1}
+    )
+    if not doc:
+        return [], None
+
+    stored = min(doc.get('message_count', 0), 2 * CHAT_HISTORY_MAX_TURNS)
+    # Near the start of the buffer $slice returns from index 0, which overlaps the newer page.
+    messages = doc.get('messages', [])[:max(stored - offset, 0)]
+    next_offset = offset + limit if offset + limit < stored else None
+    return messages, next_offset
+
+
+@app.route('/chatbot/ask', methods=['POST'])
+def chatbot_ask():
+    if 'username' not in session:
+        return jsonify({"error": "Unauthorized"}), 401
+
+    user_message = request.json.get('message')
+    if not user_message:
+        return jsonify({"error": "No message provided"}), 400
 
+    try:
+        bot_response = get_chat_service().answer(user_message)
+        append_chat_history(session['username'], user_message, bot_response)
         return jsonify({"response": bot_response})
 
+    except ChatbotUnavailable as e:
+        return jsonify({"response": str(e)}), 503
+    except ChatbotTimeout as e:
+        return jsonify({"response": str(e)}), 504
     except Exception as e:
         print(f"Error during chatbot conversation: {e}")
         return jsonify({"response": f"An error occurred while trying to process your request: {e}"}), 500
 
+
+@app.route('/chatbot/stream', methods=['POST'])
+def chatbot_stream():
+    """Same as /chatbot/ask, but streams the answer as Server-Sent Events while it is generated."""
+    if 'username' not in session:
+        return jsonify({"error": "Unauthorized"}), 401
+
+    user_message = request.json.get('message')
+    if not user_message:
+        return jsonify({"error": "No message provided"}), 400
+
+    username = session['username']
+
+    def generate():
+        pieces = []
+        try:
+            for chunk in get_chat_service().stream(user_message):
+                pieces.append(chunk)
+                yield sse_event('message', {'delta': chunk})
+            append_chat_history(username, user_message, ''.join(pieces))
+        except (ChatbotUnavailable, ChatbotTimeout) as e:
+            yield sse_event('error', {'message': str(e)})
+        except Exception as e:
+            print(f"Error during chatbot conversation: {e}")
+            yield sse_event('error', {'message': f"An error occurred while trying to process your request: {e}"})
+        yield sse_event('done', {})
+
+    return Response(stream_with_context(generate()), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
 @app.route('/chatbot/history', methods=['GET'])
 def chatbot_history():
     if 'username' not in session:
         return jsonify({"error": "Unauthorized"}), 401
 
-    history = session.get('chat_history', [])
-    return jsonify({"history": history})
+    # Sessions from before history moved server-side may still carry it in the cookie.
+    session.pop('chat_history', None)
+
+    try:
+        offset = max(int(request.args.get('offset', 0)), 0)
+        limit = max(1, min(int(request.args.get('limit', CHAT_HISTORY_PAGE_SIZE)), 2 * CHAT_HISTORY_MAX_TURNS))
+    except (ValueError, TypeError):
+        return jsonify({"error": "offset and limit must be numbers"}), 400
+
+    history, next_offset = get_chat_history_page(session['username'], offset, limit)
+    return jsonify({"history": history, "next": next_offset})
 
 @app.route('/chatbot/clear', methods=['POST'])
 def chatbot_clear():
     if 'username' not in session:
         return jsonify({"error": "Unauthorized"}), 401
 
+    chat_history_collection.delete_one({'_id': session['username']})
     session.pop('chat_history', None)
     return jsonify({"message": "Chat history cleared successfully."})
 
 
-with app.app_context():
-    sync_admins_from_env()
-    sync_officers_from_env() # --- CALLING THE NEW FUNCTION ---
+# --- APP FACTORY ---
+# Importing this module only defines routes and reads configuration: it opens
+# no connections and starts no threads. Indexes and account sync are explicit
+# deploy steps ('flask ensure-indexes', 'flask sync-accounts'), and background
+# workers start in each serving process, after any fork.
+_background_pid = None
+_background_lock = threading.Lock()
+
+
+def start_background_workers():
+    global _background_pid
+    if _background_pid == os.getpid():
+        return
+    with _background_lock:
+        if _background_pid == os.getpid():
+            return
+        _background_pid = os.getpid()
+        if EVIDENCE_REAPER_INTERVAL > 0:
+            threading.Thread(target=run_evidence_reaper, name='evidence-reaper', daemon=True).start()
+
+
+@app.before_request
+def ensure_background_workers():
+    # Covers servers that load 'app:app' directly instead of calling create_app().
+    start_background_workers()
+
+
+def create_app():
+    """WSGI entry point, e.g. gunicorn 'app:create_app()'."""
+    start_background_workers()
+    return app
+
 
 if __name__ == "__main__":
-    app.run(debug=True)
\ No newline at end of file
+    with app.app_context():
+        ensure_indexes()
+        sync_accounts()
+    create_app().run(debug=True)
\ No newline at end of file
@@ -0,0 +1,121 @@
+import heapq
+from datetime import datetime
+
+from pymongo import ASCENDING, DESCENDING, ReplaceOne
+
+
+class FirArchive:
+    """
+    Keeps the working firs collection down to the active caseload by moving
+    FIRs that were resolved long ago into an archive collection with the same
+    document shape, and reads across both tiers.
+
+    A FIR counts as resolved at its latest transition to 'Resolved' in the
+    event log; FIRs resolved before the log existed fall back to their filing
+    date. Each batch is copied with upserts before it is deleted from the hot
+    collection, so a crash between the two steps only leaves duplicates that
+    the next run cleans up, and readers skip a duplicate by _id.
+    """
+
+    STATE_ID = 'fir_archive'
+
+    def __init__(self, hot, archive, events, state, list_sort, on_move=None):
+        self.hot = hot
+        self.archive = archive
+        self.events = events
+        self.state = state
+        self.list_sort = list_sort
+        # Called with the documents of every batch that was moved.
+        self.on_move = on_move
+
+    @property
+    def index_specs(self):
+        return [
+            # The archiver walks resolved hot FIRs in _id order.
+            (self.hot, [('fir_status', ASCENDING), ('_id', ASCENDING)], {}),
+            (self.archive, [('username', ASCENDING)] + self.list_sort, {}),
+            (self.archive, [('police_station', ASCENDING)] + self.list_sort, {}),
+            (self.archive, [('supporting_documents.public_id', ASCENDING)], {'sparse': True}),
+        ]
+
+    # --- READS ---
+    def find_one(self, query, projection=None):
+        """find_one against the hot collection, then the archive."""
+        return self.hot.find_one(query, projection) or self.archive.find_one(query, projection)
+
+    @staticmethod
+    def merge(cursors, sort):
+        """
+        Merges cursors that are each ordered by `sort` (all keys in the same
+        direction) into one stream in that order, skipping a FIR that shows up
+        in both tiers mid-move.
+        """
+        fields = [field for field, _ in sort]
+        last_id = None
+        for doc in heapq.merge(*cursors, key=lambda doc: tuple(doc[field] for field in fields),
+                               reverse=sort[0][1] == DESCENDING):
+            if doc['_id'] == last_id:
+                continue
+            last_id = doc['_id']
+            yield doc
+
+    # --- ARCHIVING ---
+    def resolved_at(self, fir_ids):
+        """Returns {fir_id: time of its latest move to Resolved} for the FIRs the event log knows about."""
+        rows = self.events.aggregate([
+            {'$match': {'fir_id': {'$in': fir_ids}, 'to_status': 'Resolved'}},
+            {'$group': {'_id': '$fir_id', 'at': {'$max': '$at'}}}
+        ])
+        return {row['_id']: row['at'] for row in rows}
+
+    def move(self, fir_ids, now=None):
+        """Moves the listed FIRs that are still Resolved into the archive. Returns how many moved."""
+        if not fir_ids:
+            return 0
+        now = now or datetime.utcnow()
+        docs = list(self.hot.find({'_id': {'$in': fir_ids}, 'fir_status': 'Resolved'}))
+        if not docs:
+            return 0
+        self.archive.bulk_write(
+            [ReplaceOne({'_id': doc['_id']}, {**doc, 'archived_at': now}, upsert=True) for doc in docs],
+            ordered=False
+        )
+        moved_ids = [doc['_id'] for doc in docs]
+        self.hot.delete_many({'_id': {'$in': moved_ids}, 'fir_status': 'Resolved'})
+        # A FIR reopened between the copy and the delete stays hot; drop its copy.
+        reopened = [doc['_id'] for doc in self.hot.find({'_id': {'$in': moved_ids}}, {'_id': 1})]
+        if reopened:
+            self.archive.delete_many({'_id': {'$in': reopened}})
+        if self.on_move:
+            self.on_move([doc for doc in docs if doc['_id'] not in reopened])
+        return len(moved_ids) - len(reopened)
+
+    def run(self, cutoff, batch_size=500, on_batch=None):
+        """
+        Archives every hot FIR resolved before `cutoff`, batch_size at a time.
+        Progress is saved after each batch, so an interrupted run resumes
+        where it stopped; a completed pass starts the next one from the top.
+        Returns (scanned, moved).
+        """
+        state = self.state.find_one({'_id': self.STATE_ID}) or {}
+        last_id = state.get('last_id')
+        scanned = moved = 0
+        while True:
+            query = {'fir_status': 'Resolved'}
+            if last_id:
+                query['_id'] = {'$gt': last_id}
+            batch = list(self.hot.find(query, {'filed_date': 1}).sort('_id', ASCENDING).limit(batch_size))
+            if not batch:
+                self.state.delete_one({'_id': self.STATE_ID})
+                return scanned, moved
+
+            resolved = self.resolved_at([fir['_id'] for fir in batch])
+            eligible = [fir['_id'] for fir in batch if resolved.get(fir['_id'], fir['filed_date']) < cutoff]
+            batch_moved = self.move(eligible)
+            scanned += len(batch)
+            moved += batch_moved
+            last_id = batch[-1]['_id']
+            self.state.update_one({'_id': self.STATE_ID},
+                                  {'$set': {'last_id': last_id, 'updated_at': datetime.utcnow()}}, upsert=True)
+            if on_batch:
+                on_batch(scanned, moved)
@@ -0,0 +1,179 @@
+from collections import Counter
+
+from pymongo import ASCENDING, DESCENDING, UpdateMany, UpdateOne
+from pymongo.errors import BulkWriteError
+
+
+class AssignmentEngine:
+    """
+    Keeps each officer's open caseload and picks officers for FIRs.
+
+    officers.open_cases counts the officer's open FIRs. officer_workloads holds
+    one row per station x category x officer with the number of open FIRs of
+    that category assigned to the officer and the officer's load band
+    (open_cases // affinity_band). Both are moved by the same (before, after)
+    transitions that drive the analytics rollups, and each pick is a find_one
+    that walks one index, so it costs O(log officers) whatever the FIR count.
+
+    Only open FIRs are counted. Archiving moves Resolved FIRs alone, so the
+    counters and a rebuild from the hot collection always agree. Officers
+    created before open_cases existed have no count and would sort first as
+    least loaded; the first pick that meets one rebuilds its station from
+    `firs`, so no 'flask rebuild-workloads' run is needed after upgrading.
+    """
+
+    STRATEGIES = ('least_loaded', 'category_affinity')
+
+    def __init__(self, officers, workloads, open_statuses, affinity_band=3, firs=None):
+        self.officers = officers
+        self.firs = firs
+        self.workloads = workloads
+        self.open_statuses = set(open_statuses)
+        self.affinity_band = max(1, affinity_band)
+
+    @property
+    def index_specs(self):
+        return [
+            (self.officers, [('station_name', ASCENDING), ('is_active', ASCENDING),
+                             ('open_cases', ASCENDING), ('badge_id', ASCENDING)], {}),
+            (self.workloads, [('police_station', ASCENDING), ('category', ASCENDING),
+                              ('officer_id', ASCENDING)], {'unique': True}),
+            (self.workloads, [('police_station', ASCENDING), ('officer_id', ASCENDING)], {}),
+            (self.workloads, [('police_station', ASCENDING), ('category', ASCENDING), ('load_band', ASCENDING),
+                              ('category_cases', DESCENDING), ('officer_id', ASCENDING)], {}),
+        ]
+
+    def load_band(self, open_cases):
+        return (open_cases or 0) // self.affinity_band
+
+    # --- PICKING ---
+    def least_loaded_query(self, station_name):
+        return {'station_name': station_name, 'is_active': True}, [('open_cases', ASCENDING), ('badge_id', ASCENDING)]
+
+    def affinity_query(self, station_name, category):
+        return ({'police_station': station_name, 'category': category},
+                [('load_band', ASCENDING), ('category_cases', DESCENDING), ('officer_id', ASCENDING)])
+
+    def least_loaded(self, station_name):
+        query, sort = self.least_loaded_query(station_name)
+        officer = self.officers.find_one(query, sort=sort)
+        if officer is not None and 'open_cases' not in officer and self.firs is not None:
+            # A missing count sorts first; count the station before trusting the order.
+            try:
+                self.rebuild(self.firs, station_name)
+            except BulkWriteError:
+                pass  # Another worker rebuilt the station at the same time.
+            officer = self.officers.find_one(query, sort=sort)
+        return officer
+
+    def category_affinity(self, station_name, category):
+        """
+        The officer holding the most open FIRs of this category among those in the
+        lowest load band, so similar cases go to the same officer until they
+        are affinity_band cases busier than the least-loaded one.
+        """
+        least = self.least_loaded(station_name)
+        if least is None:
+            return None
+        query, sort = self.affinity_query(station_name, category)
+        row = self.workloads.find_one(query, sort=sort)
+        if not row or row['category_cases'] <= 0 or row['load_band'] > self.load_band(least.get('open_cases')):
+            return least
+        if row['officer_id'] == least['badge_id']:
+            return least
+        return self.officers.find_one({'badge_id': row['officer_id'], 'is_active': True}) or least
+
+    def pick(self, station_name, category, strategy):
+        if strategy == 'least_loaded':
+            return self.least_loaded(station_name)
+        if strategy == 'category_affinity':
+            return self.category_affinity(station_name, category)
+        raise ValueError(f"Unknown assignment strategy '{strategy}'. Expected one of: {', '.join(self.STRATEGIES)}")
+
+    # --- COUNTERS ---
+    def record_changes(self, transitions):
+        """
+        Applies [(before, after), ...] FIR transitions to the counters. Use
+        None for `before` on insert or `after` on delete.
+        """
+        open_deltas = Counter()
+        category_deltas = Counter()
+        for before, after in transitions:
+            for fir, sign in ((before, -1), (after, 1)):
+                officer_id = fir.get('assigned_officer_id') if fir else None
+                if not officer_id or fir.get('fir_status') not in self.open_statuses:
+                    continue
+                open_deltas[officer_id] += sign
+                category_deltas[(fir.get('police_station'), fir.get('category'), officer_id)] += sign
+
+        open_deltas = {officer_id: delta for officer_id, delta in open_deltas.items() if delta}
+        category_deltas = {key: delta for key, delta in category_deltas.items() if delta}
+        if not open_deltas and not category_deltas:
+            return
+
+        if open_deltas:
+            self.officers.bulk_write([
+                UpdateOne({'badge_id': officer_id}, {'$inc': {'open_cases': delta}})
+                for officer_id, delta in open_deltas.items()
+            ], ordered=False)
+
+        # Re-read the loads that changed so the affinity rows carry current bands.
+        touched = set(open_deltas) | {officer_id for _, _, officer_id in category_deltas}
+        officers = {
+            officer['badge_id']: officer for officer in self.officers.find(
+                {'badge_id': {'$in': list(touched)}}, {'badge_id': 1, 'station_name': 1, 'open_cases': 1})
+        }
+
+        operations = [
+            UpdateOne(
+                {'police_station': station_name, 'category': category, 'officer_id': officer_id},
+                {'$inc': {'category_cases': delta},
+                 '$set': {'load_band': self.load_band(officers.get(officer_id, {}).get('open_cases'))}},
+                upsert=True
+            )
+            for (station_name, category, officer_id), delta in category_deltas.items()
+        ]
+        operations += [
+            UpdateMany({'police_station': officers[officer_id]['station_name'], 'officer_id': officer_id},
+                       {'$set': {'load_band': self.load_band(officers[officer_id].get('open_cases'))}})
+            for officer_id in open_deltas if officer_id in officers
+        ]
+        self.workloads.bulk_write(operations, ordered=False)
+
+    def rebuild(self, firs, station_name=None):
+        """Recomputes open_cases and the affinity rows from the open FIRs in `firs`."""
+        fir_match = {'assigned_officer_id': {'$nin': [None, '']}, 'fir_status': {'$in': list(self.open_statuses)}}
+        if station_name:
+            fir_match['police_station'] = station_name
+        pipeline = [
+            {'$match': fir_match},
+            {'$group': {
+                '_id': {
+                    'police_station': '$police_station',
+                    'category': '$category',
+                    'officer_id': '$assigned_officer_id'
+                },
+                'category_cases': {'$sum': 1}
+            }}
+        ]
+        rows = list(firs.aggregate(pipeline, allowDiskUse=True))
+
+        open_cases = Counter()
+        for row in rows:
+            open_cases[row['_id']['officer_id']] += row['category_cases']
+
+        self.officers.update_many({'station_name': station_name} if station_name else {}, {'$set': {'open_cases': 0}})
+        if open_cases:
+            self.officers.bulk_write([
+                UpdateOne({'badge_id': officer_id}, {'$set': {'open_cases': count}})
+                for officer_id, count in open_cases.items()
+            ], ordered=False)
+
+        self.workloads.delete_many({'police_station': station_name} if station_name else {})
+        if rows:
+            self.workloads.insert_many([
+                {**row['_id'], 'category_cases': row['category_cases'],
+                 'load_band': self.load_band(open_cases[row['_id']['officer_id']])}
+                for row in rows
+            ], ordered=False)
+        return len(rows)
@@ -0,0 +1,187 @@
+"""
+Shows that admission control keeps cheap read routes fast while an expensive
+route is flooded.
+
+Serves the app over HTTP on a fixed pool of --threads threads, the way one
+gunicorn gthread worker does. --flood-clients clients hammer /admin_login
+with wrong passwords (a bcrypt check each, like a credential-stuffing run)
+while --read-clients clients fetch the login page and the station list. The
+run is repeated in three phases, each in a fresh process:
+
+    unprotected   no rate limits, no concurrency caps
+    caps          CONCURRENCY_LIMIT_AUTH only
+    limits        concurrency caps and token-bucket rate limits
+
+and reports read latency percentiles and throughput per phase, with how the
+flood requests were answered.
+
+    MONGO_URI=mongodb://localhost:27017 python benchmarks/admission_test.py --database fir_bench --duration 20
+
+    # no server needed; rate limits use the in-memory buckets
+    python benchmarks/admission_test.py --mongomock
+"""
+import os
+import sys
+import json
+import argparse
+import threading
+import subprocess
+import time
+import urllib.error
+import urllib.request
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from werkzeug.serving import BaseWSGIServer
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import synthetic_data  # noqa: E402
+
+READ_PATHS = ['/', '/api/police_stations']
+
+PHASES = {
+    'unprotected': {'RATE_LIMIT_BACKEND': 'off', 'CONCURRENCY_LIMIT_AUTH': '0'},
+    'caps': {'RATE_LIMIT_BACKEND': 'off'},
+    'limits': {},
+}
+
+
+class PooledWSGIServer(BaseWSGIServer):
+    """Handles connections on a fixed pool of threads; the rest wait in the accept queue."""
+
+    request_queue_size = 1024
+
+    def __init__(self, host, port, app, threads):
+        super().__init__(host, port, app)
+        self.pool = ThreadPoolExecutor(max_workers=threads, thread_name_prefix='server')
+
+    def process_request(self, request, client_address):
+        self.pool.submit(self.handle_in_pool, request, client_address)
+
+    def handle_in_pool(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+
+def fetch(url, body=None):
+    """Returns (status, seconds)."""
+    data = json.dumps(body).encode() if body is not None else None
+    req = urllib.request.Request(url, data=data, headers={'Content-Type': 'application/json'} if data else {})
+    started = time.perf_counter()
+    try:
+        with urllib.request.urlopen(req, timeout=60) as response:
+            response.read()
+            status = response.status
+    except urllib.error.HTTPError as e:
+        e.read()
+        status = e.code
+    except OSError:
+        status = 0
+    return status, time.perf_counter() - started
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return None
+    return round(sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * fraction))], 2)
+
+
+def run_phase(args):
+    """Runs one phase in this process and prints its result as JSON."""
+    synthetic_data.configure_environment(args.mongo_uri, args.database, args.stations, args.mongomock)
+    app_module = synthetic_data.load_app()
+    admin = app_module.read_admins_from_env()[0]
+
+    server = PooledWSGIServer('127.0.0.1', 0, app_module.app, args.threads)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f'http://127.0.0.1:{server.server_port}'
+    fetch(base + READ_PATHS[0])
+
+    deadline = time.perf_counter() + args.duration
+    reads, floods = [], []
+    lock = threading.Lock()
+
+    def reader(index):
+        samples = []
+        while time.perf_counter() < deadline:
+            samples.append(fetch(base + READ_PATHS[len(samples) % len(READ_PATHS)]))
+        with lock:
+            reads.extend(samples)
+
+    def flooder(index):
+        samples = []
+        while time.perf_counter() < deadline:
+            samples.append(fetch(base + '/admin_login', {'admin_id': admin['admin_id'], 'password': f'wrong-{index}'}))
+        with lock:
+            floods.extend(samples)
+
+    threads = ([threading.Thread(target=reader, args=(i,)) for i in range(args.read_clients)] +
+               [threading.Thread(target=flooder, args=(i,)) for i in range(args.flood_clients)])
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    server.shutdown()
+
+    read_ms = sorted(seconds * 1000 for status, seconds in reads if status == 200)
+    flood_ms = sorted(seconds * 1000 for _, seconds in floods)
+    print(json.dumps({
+        'reads': {
+            'requests': len(reads),
+            'errors': sum(1 for status, _ in reads if status != 200),
+            'p50_ms': percentile(read_ms, 0.50),
+            'p95_ms': percentile(read_ms, 0.95),
+            'p99_ms': percentile(read_ms, 0.99),
+            'throughput_rps': round(len(read_ms) / args.duration, 1),
+        },
+        'flood': {
+            'requests': len(floods),
+            'statuses': dict(sorted(Counter(str(status) for status, _ in floods).items())),
+            'p50_ms': percentile(flood_ms, 0.50),
+        },
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--duration', type=float, default=15)
+    parser.add_argument('--threads', type=int, default=8, help='Server threads, as in gunicorn --threads.')
+    parser.add_argument('--read-clients', type=int, default=4)
+    parser.add_argument('--flood-clients', type=int, default=32)
+    parser.add_argument('--phases', default=','.join(PHASES))
+    parser.add_argument('--database', default='fir_bench_admission')
+    parser.add_argument('--stations', type=int, default=5)
+    parser.add_argument('--mongomock', action='store_true', help='Run each phase on an in-process mongomock database.')
+    parser.add_argument('--mongo-uri', default=os.getenv('MONGO_URI', 'mongodb://localhost:27017'))
+    parser.add_argument('--phase', default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.phase:
+        run_phase(args)
+        return
+
+    results = {}
+    for phase in args.phases.split(','):
+        env = {**os.environ, **PHASES[phase]}
+        if args.mongomock:
+            env.setdefault('RATE_LIMIT_BACKEND', 'memory')
+        command = [sys.executable, os.path.abspath(__file__), '--phase', phase] + sys.argv[1:]
+        completed = subprocess.run(command, env=env, capture_output=True, text=True)
+        if completed.returncode != 0:
+            raise RuntimeError(f"Phase {phase} failed:\n{completed.stderr[-2000:]}")
+        results[phase] = json.loads(completed.stdout.strip().splitlines()[-1])
+        print(f"{phase}: reads p99 {results[phase]['reads']['p99_ms']} ms, "
+              f"flood {results[phase]['flood']['statuses']}", file=sys.stderr)
+
+    print(json.dumps({
+        'params': {key: getattr(args, key) for key in ('duration', 'threads', 'read_clients', 'flood_clients')},
+        'phases': results,
+    }, indent=2))
+
+
+if __name__ == '__main__':
+    main()
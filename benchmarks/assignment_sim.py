@@ -0,0 +1,144 @@
+"""
+Simulates automatic officer assignment under a steady stream of new FIRs.
+
+FIRs arrive at --firs-per-hour across --stations stations for --hours of
+simulated time; each one is assigned with the chosen strategy and resolved
+after an exponentially distributed investigation time. For every strategy the
+benchmark reports how long a pick takes and how evenly the open cases end up
+spread over each station's officers. The 'scan' strategy is the baseline: it
+counts every officer's open FIRs with count_documents on each assignment.
+
+    MONGO_URI=mongodb://localhost:27017 python benchmarks/assignment_sim.py --firs-per-hour 5000
+"""
+import os
+import sys
+import json
+import heapq
+import random
+import argparse
+import statistics
+import time
+from datetime import datetime, timedelta
+
+from pymongo import MongoClient, ASCENDING
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from assignment import AssignmentEngine  # noqa: E402
+
+OPEN_FIR_STATUSES = ['Pending', 'Under Investigation']
+CATEGORIES = ['Theft', 'Assault', 'Fraud', 'Cyber Crime', 'Missing Person', 'Vandalism', 'Other']
+
+
+def seed_officers(db, stations, officers_per_station):
+    db.officers.insert_many([
+        {'name': f'Station {s} Officer {o}', 'badge_id': f'SIM{s:03}{o:02}',
+         'station_name': f'Sim {s} Police Station', 'is_active': True, 'open_cases': 0}
+        for s in range(stations) for o in range(officers_per_station)
+    ])
+
+
+def scan_pick(db, station_name):
+    officers = list(db.officers.find({'station_name': station_name, 'is_active': True}, {'badge_id': 1, 'name': 1}))
+    loads = {
+        officer['badge_id']: db.firs.count_documents({
+            'police_station': station_name, 'assigned_officer_id': officer['badge_id'],
+            'fir_status': {'$in': OPEN_FIR_STATUSES}
+        })
+        for officer in officers
+    }
+    return min(officers, key=lambda officer: (loads[officer['badge_id']], officer['badge_id']))
+
+
+def simulate(db, engine, strategy, args):
+    rng = random.Random(args.seed)
+    total = int(args.firs_per_hour * args.hours)
+    arrival_gap = 3600.0 / args.firs_per_hour
+    clock = datetime(2024, 1, 1)
+    resolutions = []
+    pick_seconds = []
+
+    for index in range(total):
+        now = clock + timedelta(seconds=index * arrival_gap)
+        while resolutions and resolutions[0][0] <= now:
+            _, fir = heapq.heappop(resolutions)
+            db.firs.update_one({'_id': fir['_id']}, {'$set': {'fir_status': 'Resolved'}})
+            engine.record_changes([(fir, {**fir, 'fir_status': 'Resolved'})])
+
+        station_name = f'Sim {rng.randrange(args.stations)} Police Station'
+        # A skewed category mix, like real complaint traffic.
+        category = rng.choices(CATEGORIES, weights=[30, 15, 20, 15, 5, 10, 5])[0]
+
+        started = time.perf_counter()
+        if strategy == 'scan':
+            officer = scan_pick(db, station_name)
+        else:
+            officer = engine.pick(station_name, category, strategy)
+        pick_seconds.append(time.perf_counter() - started)
+
+        fir = {
+            'police_station': station_name, 'category': category, 'filed_date': now,
+            'fir_status': 'Under Investigation', 'assigned_officer_id': officer['badge_id'],
+            'assigned_officer_name': officer['name']
+        }
+        db.firs.insert_one(fir)
+        engine.record_changes([(None, fir)])
+        resolve_at = now + timedelta(hours=rng.expovariate(1.0 / args.mean_resolution_hours))
+        heapq.heappush(resolutions, (resolve_at, fir))
+
+    spreads = []
+    for s in range(args.stations):
+        loads = [officer.get('open_cases', 0) for officer in
+                 db.officers.find({'station_name': f'Sim {s} Police Station'}, {'open_cases': 1})]
+        spreads.append(max(loads) - min(loads))
+
+    pick_ms = sorted(seconds * 1000 for seconds in pick_seconds)
+    return {
+        'firs': total,
+        'pick_ms_p50': round(pick_ms[len(pick_ms) // 2], 3),
+        'pick_ms_p99': round(pick_ms[int(len(pick_ms) * 0.99)], 3),
+        'picks_per_second': round(len(pick_ms) / (sum(pick_ms) / 1000), 1),
+        'open_cases_spread_mean': round(statistics.mean(spreads), 2),
+        'open_cases_spread_max': max(spreads),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--stations', type=int, default=20)
+    parser.add_argument('--officers-per-station', type=int, default=25)
+    parser.add_argument('--firs-per-hour', type=int, default=3000)
+    parser.add_argument('--hours', type=float, default=2)
+    parser.add_argument('--mean-resolution-hours', type=float, default=6)
+    parser.add_argument('--affinity-band', type=int, default=3)
+    parser.add_argument('--strategies', default='least_loaded,category_affinity,scan')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--mongo-uri', default=os.getenv('MONGO_URI', 'mongodb://localhost:27017'))
+    args = parser.parse_args()
+
+    client = MongoClient(args.mongo_uri)
+    results = {}
+    for strategy in args.strategies.split(','):
+        database = f'fir_bench_assign_{os.getpid()}_{strategy}'
+        db = client[database]
+        try:
+            engine = AssignmentEngine(db.officers, db.officer_workloads, OPEN_FIR_STATUSES, args.affinity_band)
+            for collection, keys, options in engine.index_specs:
+                collection.create_index(keys, **options)
+            db.firs.create_index([('police_station', ASCENDING), ('assigned_officer_id', ASCENDING),
+                                  ('fir_status', ASCENDING)])
+            seed_officers(db, args.stations, args.officers_per_station)
+            results[strategy] = simulate(db, engine, strategy, args)
+        finally:
+            client.drop_database(database)
+
+    print(json.dumps({
+        'stations': args.stations,
+        'officers_per_station': args.officers_per_station,
+        'firs_per_hour': args.firs_per_hour,
+        'hours': args.hours,
+        'results': results,
+    }, indent=2))
+
+
+if __name__ == '__main__':
+    main()
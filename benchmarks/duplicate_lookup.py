@@ -0,0 +1,176 @@
+"""
+Measures the near-duplicate FIR lookup as the bucket index grows.
+
+For each size in --sizes the fir_duplicates index is filled with that many
+entries spread over --stations stations, then --queries planted FIRs are
+re-filed as lightly edited copies and looked up the way submit_fir does.
+Reports the time to compute a signature, lookup latency percentiles, how
+many planted copies were found (recall) and how many unrelated FIRs were
+wrongly flagged (false positives).
+
+    MONGO_URI=mongodb://localhost:27017 python benchmarks/duplicate_lookup.py --sizes 10000,100000,1000000
+
+Filler entries get random band keys and signatures instead of signatures of
+generated text, which would make filling a million entries take hours; they
+still occupy the index like real FIRs do, they just never match. With
+--mongomock the run needs no server, but mongomock scans the collection
+instead of using the index, so its latencies say nothing about scaling.
+"""
+import os
+import sys
+import json
+import random
+import argparse
+import time
+from datetime import datetime, timedelta
+
+from pymongo import MongoClient
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from duplicates import DuplicateDetector, MERSENNE_PRIME  # noqa: E402
+
+WORDS = ('phone wallet bike car stolen snatched broke window night morning market bus stop near temple '
+         'school gate shop owner threatened pushed cash bag gold chain lost found neighbour quarrel '
+         'road accident fraud call otp bank account transferred two men unknown person ran away').split()
+LOCATIONS = ['MG Road', 'Station Road', 'Gandhi Nagar', 'Old Market', 'Bus Stand', 'Civil Lines', 'Lake View']
+
+
+def random_fir(rng, station, filed_date):
+    return {
+        'police_station': station,
+        'description': ' '.join(rng.choice(WORDS) for _ in range(rng.randint(25, 60))),
+        'location': rng.choice(LOCATIONS),
+        'accused_names': [f'Person {rng.randrange(10000)}'],
+        'incident_date': filed_date - timedelta(hours=rng.randint(0, 48)),
+        'filed_date': filed_date,
+    }
+
+
+def edited_copy(rng, fir):
+    """The same incident filed again: a few words dropped or swapped."""
+    words = fir['description'].split()
+    for _ in range(max(1, len(words) // 20)):
+        position = rng.randrange(len(words))
+        if rng.random() < 0.5:
+            del words[position]
+        else:
+            words[position] = rng.choice(WORDS)
+    return {**fir, 'description': ' '.join(words), 'filed_date': fir['filed_date'] + timedelta(hours=2)}
+
+
+def fill(detector, rng, size, stations, clock):
+    batch = []
+    for index in range(size):
+        filed_date = clock - timedelta(minutes=rng.randrange(60 * 24 * 365))
+        batch.append({
+            '_id': f'FILL{index}',
+            'police_station': f'Sim {rng.randrange(stations)} Police Station',
+            'incident_date': filed_date,
+            'filed_date': filed_date,
+            'bands': [f'{band}:{rng.getrandbits(48):012x}' for band in range(detector.bands)],
+            'signature': [rng.randrange(MERSENNE_PRIME) for _ in range(detector.num_perm)],
+        })
+        if len(batch) == 5000:
+            detector.collection.insert_many(batch)
+            batch = []
+    if batch:
+        detector.collection.insert_many(batch)
+
+
+def percentile(values, fraction):
+    return round(values[min(len(values) - 1, int(len(values) * fraction))], 3)
+
+
+def run(detector, rng, size, args):
+    clock = datetime(2024, 6, 1)
+    fill(detector, rng, size, args.stations, clock)
+
+    planted = []
+    for index in range(args.queries):
+        fir = {**random_fir(rng, f'Sim {rng.randrange(args.stations)} Police Station', clock), '_id': f'PLANT{index}'}
+        detector.add(fir, detector.signature(fir))
+        planted.append(fir)
+
+    signature_ms, lookup_ms = [], []
+    found = false_positives = 0
+    for index, original in enumerate(planted):
+        for copy, is_duplicate in ((edited_copy(rng, original), True),
+                                   (random_fir(rng, original['police_station'], clock), False)):
+            copy['_id'] = f'QUERY{index}{is_duplicate}'
+            started = time.perf_counter()
+            signature = detector.signature(copy)
+            signed = time.perf_counter()
+            matches = detector.find_candidates(copy, signature)
+            lookup_ms.append((time.perf_counter() - signed) * 1000)
+            signature_ms.append((signed - started) * 1000)
+            matched = any(fir_id == original['_id'] for fir_id, _ in matches)
+            if is_duplicate:
+                found += matched
+            else:
+                false_positives += bool(matches)
+
+    result = {
+        'indexed': size + len(planted),
+        'signature_ms_mean': round(sum(signature_ms) / len(signature_ms), 3),
+        'lookup_ms_p50': percentile(sorted(lookup_ms), 0.5),
+        'lookup_ms_p95': percentile(sorted(lookup_ms), 0.95),
+        'lookup_ms_p99': percentile(sorted(lookup_ms), 0.99),
+        'recall': round(found / len(planted), 3),
+        'false_positive_rate': round(false_positives / len(planted), 3),
+    }
+    if not args.mongomock:
+        copy = edited_copy(rng, planted[0])
+        signature = detector.signature(copy)
+        stats = detector.collection.find({
+            'police_station': copy['police_station'], 'bands': {'$in': detector.band_keys(signature)},
+            'incident_date': {'$gte': copy['incident_date'] - detector.window,
+                              '$lte': copy['incident_date'] + detector.window},
+        }).explain()['executionStats']
+        result['docs_examined_per_lookup'] = stats['totalDocsExamined']
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', default='10000,100000,1000000')
+    parser.add_argument('--stations', type=int, default=50)
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--signature-size', type=int, default=int(os.getenv('DUPLICATE_SIGNATURE_SIZE', 64)))
+    parser.add_argument('--bands', type=int, default=int(os.getenv('DUPLICATE_BANDS', 16)))
+    parser.add_argument('--threshold', type=float, default=float(os.getenv('DUPLICATE_THRESHOLD', 0.5)))
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--mongo-uri', default=os.getenv('MONGO_URI', 'mongodb://localhost:27017'))
+    parser.add_argument('--mongomock', action='store_true', help='Run against mongomock instead of a server.')
+    args = parser.parse_args()
+
+    if args.mongomock:
+        import mongomock
+        client = mongomock.MongoClient()
+    else:
+        client = MongoClient(args.mongo_uri)
+
+    results = {}
+    for size in (int(size) for size in args.sizes.split(',')):
+        database = f'fir_bench_duplicates_{os.getpid()}_{size}'
+        db = client[database]
+        try:
+            detector = DuplicateDetector(db.fir_duplicates, args.signature_size, args.bands, args.threshold)
+            for collection, keys, options in detector.index_specs:
+                collection.create_index(keys, **options)
+            results[size] = run(detector, random.Random(args.seed), size, args)
+            print(f"{size}: {results[size]}", file=sys.stderr)
+        finally:
+            client.drop_database(database)
+
+    print(json.dumps({
+        'stations': args.stations,
+        'queries': args.queries,
+        'signature_size': args.signature_size,
+        'bands': args.bands,
+        'threshold': args.threshold,
+        'results': results,
+    }, indent=2))
+
+
+if __name__ == '__main__':
+    main()
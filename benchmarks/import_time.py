@@ -0,0 +1,99 @@
+"""
+Import-time budget for app.py.
+
+Imports the app in fresh interpreters under `python -X importtime` and fails
+(exit status 1) when the median cumulative import time of the `app` module
+is over --budget-ms, or when the import had side effects: a MongoClient
+created, the Bard or Cloudinary SDK imported, or a background thread started.
+
+    python benchmarks/import_time.py --runs 5 --budget-ms 800
+
+CI runs it on every push and pull request (.github/workflows/import-time.yml).
+
+The MongoDB URI points at a closed port, so an import that tried to connect
+would also show up as a blown budget. Prints the slowest imports to show where
+the time goes.
+"""
+import os
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Run in the child after the import; prints what the import left behind.
+SIDE_EFFECT_PROBE = """
+import json, sys, threading
+import app
+print(json.dumps({
+    'mongo_client_created': app.mongo._client is not None,
+    'sdks_imported': sorted(name for name in ('bardapi', 'cloudinary') if name in sys.modules),
+    'threads': sorted(thread.name for thread in threading.enumerate() if thread is not threading.main_thread()),
+}))
+"""
+
+
+def parse_importtime(stderr):
+    """Returns {module: (self_us, cumulative_us)} from -X importtime output."""
+    timings = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        timings[name.strip()] = (int(self_us), int(cumulative_us))
+    return timings
+
+
+def measure_once():
+    env = {
+        **os.environ,
+        'MONGO_URI': 'mongodb://127.0.0.1:1',
+        'MONGO_TLS': 'false',
+        'FLASK_SECRET_KEY': os.getenv('FLASK_SECRET_KEY', 'import-time-check'),
+    }
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', SIDE_EFFECT_PROBE],
+                            cwd=REPO_ROOT, env=env, capture_output=True, text=True, timeout=120)
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing the app failed:\n{result.stderr[-2000:]}")
+    timings = parse_importtime(result.stderr)
+    side_effects = json.loads(result.stdout.strip().splitlines()[-1])
+    return timings, side_effects
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--budget-ms', type=float, default=float(os.getenv('IMPORT_TIME_BUDGET_MS', 800)))
+    parser.add_argument('--top', type=int, default=10, help='How many of the slowest imports to list.')
+    args = parser.parse_args()
+
+    runs = [measure_once() for _ in range(args.runs)]
+    app_ms = statistics.median(timings['app'][1] / 1000 for timings, _ in runs)
+    timings, side_effects = runs[-1]
+
+    print(f"app import: median {app_ms:.1f} ms over {args.runs} runs (budget {args.budget_ms:.0f} ms)")
+    print("Slowest imports (cumulative, last run):")
+    for name, (_, cumulative_us) in sorted(timings.items(), key=lambda item: -item[1][1])[:args.top]:
+        print(f"  {cumulative_us / 1000:8.1f} ms  {name}")
+
+    failures = []
+    if app_ms > args.budget_ms:
+        failures.append(f"import took {app_ms:.1f} ms, over the {args.budget_ms:.0f} ms budget")
+    if side_effects['mongo_client_created']:
+        failures.append("a MongoClient was created at import")
+    if side_effects['sdks_imported']:
+        failures.append(f"imported {', '.join(side_effects['sdks_imported'])} at import")
+    if side_effects['threads']:
+        failures.append(f"started threads at import: {', '.join(side_effects['threads'])}")
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    if failures:
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == '__main__':
+    main()
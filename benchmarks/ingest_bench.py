@@ -0,0 +1,130 @@
+"""
+Throughput of 'flask import-firs' on a generated legacy station register.
+
+Writes --rows rows in the export-firs column layout (CSV or NDJSON) for the
+configured stations and their officers, with --bad-fraction of them broken
+the ways old spreadsheets are (unknown station, unparseable date, missing
+description), then runs the import command in-process and reports rows per
+second and how many rows were inserted and rejected.
+
+    MONGO_URI=mongodb://localhost:27017 python benchmarks/ingest_bench.py \\
+        --database fir_bench_ingest --stations 20 --rows 1000000 --drop
+
+    python benchmarks/ingest_bench.py --mongomock --rows 2000
+
+mongomock checks unique indexes and upserts by scanning the collection, so
+its run only proves the pipeline works; measure throughput on a real mongod.
+"""
+import os
+import sys
+import csv
+import json
+import random
+import argparse
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import synthetic_data  # noqa: E402
+
+COLUMNS = ['fir_id', 'filed_date', 'police_station', 'district', 'state', 'category', 'other_category',
+           'fir_status', 'incident_date', 'location', 'user_name', 'username', 'mobile',
+           'assigned_officer_id', 'assigned_officer_name', 'accused_names', 'description']
+
+
+def legacy_rows(rng, count, stations, officers, bad_fraction):
+    start = datetime(2015, 1, 1)
+    for index in range(count):
+        station = rng.choice(stations)
+        incident = start + timedelta(minutes=rng.randrange(60 * 24 * 365 * 8))
+        status = rng.choice(['Resolved', 'Resolved', 'Resolved', 'Under Investigation', 'Pending'])
+        officer = rng.choice(officers[station]) if status != 'Pending' and officers[station] else None
+        row = {
+            'fir_id': f'LEGACY/{index}', 'filed_date': '', 'police_station': station,
+            'district': station.split(', ')[-1], 'state': 'Haryana',
+            'category': rng.choices(synthetic_data.CATEGORIES, synthetic_data.CATEGORY_WEIGHTS)[0],
+            'other_category': '', 'fir_status': status,
+            # Old registers mostly hold day-first dates without a time.
+            'incident_date': incident.strftime('%d/%m/%Y'), 'location': f'Ward {rng.randrange(40)}',
+            'user_name': f'Complainant {index}', 'username': '', 'mobile': f'9{rng.randrange(10**9):09}',
+            'assigned_officer_id': officer['badge_id'] if officer else '',
+            'assigned_officer_name': officer['name'] if officer else '',
+            'accused_names': 'Unknown', 'description': f'Legacy register entry {index}.',
+        }
+        if rng.random() < bad_fraction:
+            broken = rng.choice(['police_station', 'incident_date', 'description'])
+            row[broken] = {'police_station': 'Closed Police Station, Nowhere',
+                           'incident_date': '31/31/2019', 'description': ''}[broken]
+        yield row
+
+
+def write_file(path, input_format, rows):
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        if input_format == 'csv':
+            writer = csv.DictWriter(f, COLUMNS)
+            writer.writeheader()
+            writer.writerows(rows)
+        else:
+            for row in rows:
+                f.write(json.dumps({**row, 'accused_names': [row['accused_names']]}) + '\n')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--format', dest='input_format', choices=['csv', 'ndjson'], default='csv')
+    parser.add_argument('--bad-fraction', type=float, default=0.01)
+    parser.add_argument('--batch-size', type=int, default=1000)
+    parser.add_argument('--database', default='fir_bench_ingest')
+    parser.add_argument('--stations', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--drop', action='store_true', help='Drop the database first.')
+    parser.add_argument('--mongomock', action='store_true', help='Import into an in-process mongomock database.')
+    parser.add_argument('--mongo-uri', default=os.getenv('MONGO_URI', 'mongodb://localhost:27017'))
+    args = parser.parse_args()
+
+    synthetic_data.configure_environment(args.mongo_uri, args.database, args.stations, args.mongomock)
+    if args.drop and not args.mongomock:
+        from pymongo import MongoClient
+        MongoClient(args.mongo_uri).drop_database(args.database)
+    app_module = synthetic_data.load_app()
+
+    stations = [admin['station_name'] for admin in app_module.read_admins_from_env()]
+    officers = {station: [] for station in stations}
+    for officer in app_module.officers_collection.find({'station_name': {'$in': stations}}):
+        officers[officer['station_name']].append(officer)
+
+    workdir = tempfile.mkdtemp(prefix='fir_ingest_')
+    path = os.path.join(workdir, f'legacy.{args.input_format}')
+    started = time.perf_counter()
+    write_file(path, args.input_format,
+               legacy_rows(random.Random(args.seed), args.rows, stations, officers, args.bad_fraction))
+    generated = time.perf_counter() - started
+
+    before = app_module.firs_collection.estimated_document_count()
+    started = time.perf_counter()
+    result = app_module.app.test_cli_runner().invoke(
+        args=['import-firs', path, '--batch-size', str(args.batch_size)])
+    elapsed = time.perf_counter() - started
+    if result.exit_code != 0:
+        raise RuntimeError(f"import-firs failed:\n{result.output}\n{result.exception!r}")
+    print(result.output, file=sys.stderr)
+
+    dead_letter = path + '.rejected.ndjson'
+    rejected = sum(1 for _ in open(dead_letter)) if os.path.exists(dead_letter) else 0
+    print(json.dumps({
+        'rows': args.rows,
+        'format': args.input_format,
+        'batch_size': args.batch_size,
+        'generate_seconds': round(generated, 1),
+        'import_seconds': round(elapsed, 1),
+        'rows_per_second': round(args.rows / elapsed),
+        'inserted': app_module.firs_collection.estimated_document_count() - before,
+        'rejected': rejected,
+        'file': path,
+    }, indent=2))
+
+
+if __name__ == '__main__':
+    main()
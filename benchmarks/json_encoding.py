@@ -0,0 +1,119 @@
+"""
+Compares the old and new JSON encoding of FIR list payloads, end to end
+through Flask's test client.
+
+"old" is what the routes used to do: convert _id and the dates by hand in a
+Python loop, then jsonify with Flask's default provider. "new" jsonifies the
+raw pymongo documents with MongoJSONProvider; "streamed" is the same encoder
+driven through stream_json_object, as the paginated list endpoints do.
+
+    python benchmarks/json_encoding.py --firs 10000
+"""
+import os
+import sys
+import json
+import random
+import argparse
+import timeit
+from datetime import datetime, timedelta
+
+from bson import ObjectId
+from flask import Flask, Response, jsonify
+from flask.json.provider import DefaultJSONProvider
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from json_provider import MongoJSONProvider, stream_json_object, orjson  # noqa: E402
+
+
+def make_firs(count, seed=42):
+    rng = random.Random(seed)
+    start = datetime(2023, 1, 1)
+    categories = ['Theft', 'Assault', 'Cybercrime', 'Missing', 'Fraud', 'Harassment', 'Other']
+    firs = []
+    for i in range(count):
+        filed_date = start + timedelta(minutes=rng.randint(0, 500000))
+        firs.append({
+            '_id': ObjectId(),
+            'username': f'user{rng.randint(1, 5000)}',
+            'user_name': f'Citizen {i}',
+            'state': 'Haryana',
+            'district': 'Bhiwani',
+            'user_address': f'House {i}, Sector {rng.randint(1, 40)}',
+            'mobile': f'9{rng.randint(100000000, 999999999)}',
+            'category': rng.choice(categories),
+            'other_category': '',
+            'accused_names': ['Unknown'],
+            'incident_date': filed_date - timedelta(hours=rng.randint(1, 72)),
+            'location': f'Near landmark {rng.randint(1, 300)}',
+            'police_station': 'Civil Lines Police Station, Bhiwani',
+            'description': 'Incident description ' * rng.randint(5, 40),
+            'supporting_documents': [],
+            'fir_status': rng.choice(['Pending', 'Under Investigation', 'Resolved']),
+            'filed_date': filed_date,
+            'assigned_officer_id': None,
+            'assigned_officer_name': 'Unassigned'
+        })
+    return firs
+
+
+def convert_old(firs):
+    converted = []
+    for fir in firs:
+        fir = dict(fir)
+        fir['_id'] = str(fir['_id'])
+        fir['filed_date'] = fir['filed_date'].isoformat()
+        if 'incident_date' in fir:
+            fir['incident_date'] = fir['incident_date'].isoformat()
+        converted.append(fir)
+    return converted
+
+
+def make_app(provider_class, firs):
+    app = Flask(__name__)
+    app.json_provider_class = provider_class
+    app.json = provider_class(app)
+
+    @app.route('/old')
+    def old():
+        return jsonify({'firs': convert_old(firs)})
+
+    @app.route('/new')
+    def new():
+        return jsonify({'firs': firs})
+
+    @app.route('/streamed')
+    def streamed():
+        return Response(stream_json_object(app.json, 'firs', iter(firs), lambda: {'next': None}),
+                        mimetype='application/json')
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--firs', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    firs = make_firs(args.firs)
+    clients = {
+        'old': make_app(DefaultJSONProvider, firs).test_client(),
+        'new': make_app(MongoJSONProvider, firs).test_client(),
+    }
+    requests = (('old', clients['old'], '/old'), ('new', clients['new'], '/new'),
+                ('streamed', clients['new'], '/streamed'))
+
+    bodies = [json.loads(client.get(path).get_data()) for _, client, path in requests]
+    assert bodies[0] == bodies[1] and bodies[2]['firs'] == bodies[0]['firs']
+
+    results = {'firs': args.firs, 'orjson': orjson is not None}
+    for name, client, path in requests:
+        best = min(timeit.repeat(lambda: client.get(path).get_data(), number=1, repeat=args.repeat))
+        results[f'{name}_ms'] = round(best * 1000, 2)
+    results['speedup'] = round(results['old_ms'] / results['new_ms'], 1)
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
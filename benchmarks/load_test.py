@@ -0,0 +1,272 @@
+"""
+Load test for the FIR routes.
+
+Runs the real Flask app in-process and drives its routes from --concurrency
+threads. Each thread logs in once as a station admin and once as a citizen,
+exactly like a browser does, then issues a weighted mix of requests until
+--duration seconds have passed. Every MongoDB command a request triggers is
+counted with a pymongo CommandListener.
+
+Reports p50/p95/p99 latency, throughput and Mongo commands per request for
+each route and writes them as JSON, tagged with the current commit, so two
+runs can be compared with --compare.
+
+    # against a database filled by synthetic_data.py
+    MONGO_URI=mongodb://localhost:27017 python benchmarks/load_test.py \\
+        --database fir_bench --stations 50 --duration 60 --concurrency 16
+
+    # self-contained unit-level run: seeds mongomock in-process first
+    python benchmarks/load_test.py --mongomock --seed-users 500 --seed-firs 20000
+
+Pass the same --stations as synthetic_data.py so the same admin logins exist.
+"""
+import os
+import sys
+import json
+import random
+import argparse
+import threading
+import subprocess
+import time
+from collections import defaultdict
+from datetime import datetime
+from io import BytesIO
+
+from pymongo import monitoring
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import synthetic_data  # noqa: E402
+
+
+class CommandCounter(monitoring.CommandListener):
+    """Counts the Mongo commands each thread issues. pymongo calls listeners on the issuing thread."""
+
+    def __init__(self):
+        self.local = threading.local()
+
+    def take(self):
+        count = getattr(self.local, 'count', 0)
+        self.local.count = 0
+        return count
+
+    def started(self, event):
+        self.local.count = getattr(self.local, 'count', 0) + 1
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+
+# --- SCENARIOS ---
+# Each scenario is (weight, function(session) -> response). The weights
+# approximate a day of traffic: dashboards and lists dominate, writes are rare.
+def admin_dashboard(session):
+    return session.admin.get('/admin_dashboard')
+
+
+def admin_firs_next_page(session):
+    response = session.admin.get('/admin/firs')
+    next_token = response.get_json().get('next')
+    return session.admin.get(f'/admin/firs?cursor={next_token}') if next_token else response
+
+
+def user_firs(session):
+    return session.user.get('/user/firs')
+
+
+def analytics_data(session):
+    return session.admin.get('/admin/analytics_data')
+
+
+def fir_details(session):
+    return session.admin.get(f'/fir/{session.rng.choice(session.station_fir_ids)}')
+
+
+def submit_fir(session):
+    station = session.user_station
+    data = {
+        'user-name': f'Load User {session.index}', 'state': 'Haryana', 'district': station.split(', ')[-1],
+        'user-address': '1 Synthetic Street', 'mobile': '9000000000',
+        'category': session.rng.choices(synthetic_data.CATEGORIES, synthetic_data.CATEGORY_WEIGHTS)[0],
+        'incident-date': datetime.utcnow().strftime('%Y-%m-%dT%H:%M'), 'location': 'Sector 1',
+        'police-station': station, 'description': 'Load test report.', 'accused_names[]': ['Unknown'],
+    }
+    if session.rng.random() < 0.2:
+        data['file-upload'] = (BytesIO(b'0' * 50_000), 'evidence.jpg')
+    return session.user.post('/submit_fir', data=data, content_type='multipart/form-data')
+
+
+def update_fir_status(session):
+    return session.admin.post('/admin/update_fir_status', json={
+        'fir_id': str(session.rng.choice(session.station_fir_ids)),
+        'status': session.rng.choice(['Pending', 'Under Investigation', 'Resolved'])
+    })
+
+
+SCENARIOS = {
+    'admin_dashboard': (20, admin_dashboard),
+    'admin_firs_next_page': (15, admin_firs_next_page),
+    'user_firs': (30, user_firs),
+    'analytics_data': (10, analytics_data),
+    'fir_details': (10, fir_details),
+    'submit_fir': (10, submit_fir),
+    'update_fir_status': (5, update_fir_status),
+}
+
+
+class Session:
+    """One simulated browser pair: a logged-in station admin and a logged-in citizen."""
+
+    def __init__(self, app_module, index, admins, seed):
+        self.index = index
+        self.rng = random.Random(seed + index)
+        admin = admins[index % len(admins)]
+        self.admin = app_module.app.test_client()
+        response = self.admin.post('/admin_login', json={'admin_id': admin['admin_id'], 'password': admin['password']})
+        if response.status_code != 200:
+            raise RuntimeError(f"Admin login failed for {admin['admin_id']}: {response.get_data(as_text=True)}")
+
+        user = app_module.users_collection.find_one({'username': {'$regex': '^loaduser'}}, skip=index)
+        if not user:
+            raise RuntimeError("No synthetic users found. Seed the database with synthetic_data.py first.")
+        self.user = app_module.app.test_client()
+        response = self.user.post('/user_login', json={'username': user['username'],
+                                                       'password': synthetic_data.USER_PASSWORD})
+        if response.status_code != 200:
+            raise RuntimeError(f"User login failed for {user['username']}")
+        self.user_station = admin['station_name']
+        self.station_fir_ids = [fir['_id'] for fir in app_module.firs_collection.find(
+            {'police_station': admin['station_name']}, {'_id': 1}).limit(500)] or [app_module.ObjectId()]
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return None
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * fraction))]
+
+
+def summarize(samples, elapsed):
+    latencies = sorted(sample[0] * 1000 for sample in samples)
+    mongo_ops = [sample[2] for sample in samples]
+    return {
+        'requests': len(samples),
+        'errors': sum(1 for sample in samples if sample[1] >= 500),
+        'p50_ms': round(percentile(latencies, 0.50), 2) if latencies else None,
+        'p95_ms': round(percentile(latencies, 0.95), 2) if latencies else None,
+        'p99_ms': round(percentile(latencies, 0.99), 2) if latencies else None,
+        'throughput_rps': round(len(samples) / elapsed, 1),
+        'mongo_ops_per_request': round(sum(mongo_ops) / len(mongo_ops), 2) if mongo_ops else None,
+    }
+
+
+def run(app_module, counter, args):
+    admins = app_module.read_admins_from_env()
+    sessions = [Session(app_module, index, admins, args.seed) for index in range(args.concurrency)]
+    names = list(SCENARIOS)
+    weights = [SCENARIOS[name][0] for name in names]
+    samples = defaultdict(list)
+    samples_lock = threading.Lock()
+    deadline = time.perf_counter() + args.duration
+
+    def worker(session):
+        local_samples = defaultdict(list)
+        counter.take()
+        while time.perf_counter() < deadline:
+            name = session.rng.choices(names, weights)[0]
+            started = time.perf_counter()
+            response = SCENARIOS[name][1](session)
+            local_samples[name].append((time.perf_counter() - started, response.status_code, counter.take()))
+        with samples_lock:
+            for name, values in local_samples.items():
+                samples[name].extend(values)
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=worker, args=(session,)) for session in sessions]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    routes = {name: summarize(values, elapsed) for name, values in sorted(samples.items())}
+    total = summarize([sample for values in samples.values() for sample in values], elapsed)
+    if args.mongomock:
+        # mongomock never reaches pymongo's monitoring hooks.
+        for stats in [*routes.values(), total]:
+            stats['mongo_ops_per_request'] = None
+    return routes, total
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=synthetic_data.REPO_ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def compare(previous_path, result):
+    with open(previous_path) as f:
+        previous = json.load(f)
+    print(f"\nChange against {previous.get('commit')} ({previous_path}):")
+    for name, stats in result['routes'].items():
+        before = previous.get('routes', {}).get(name)
+        if not before:
+            continue
+        deltas = []
+        for key in ('p50_ms', 'p95_ms', 'p99_ms', 'throughput_rps', 'mongo_ops_per_request'):
+            if before.get(key) and stats.get(key) is not None:
+                deltas.append(f"{key} {(stats[key] - before[key]) / before[key] * 100:+.1f}%")
+        print(f"  {name}: {', '.join(deltas)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--duration', type=float, default=30)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--database', default='fir_bench')
+    parser.add_argument('--stations', type=int, default=0, help='Same value as given to synthetic_data.py.')
+    parser.add_argument('--mongomock', action='store_true', help='Seed and test an in-process mongomock database.')
+    parser.add_argument('--seed-users', type=int, default=500, help='Users to seed first (mongomock only).')
+    parser.add_argument('--seed-firs', type=int, default=20000, help='FIRs to seed first (mongomock only).')
+    parser.add_argument('--output', default=None, help='Where to write the JSON results.')
+    parser.add_argument('--compare', default=None, help='A previous results file to compare against.')
+    parser.add_argument('--mongo-uri', default=os.getenv('MONGO_URI', 'mongodb://localhost:27017'))
+    args = parser.parse_args()
+
+    counter = CommandCounter()
+    # Listeners only apply to clients created afterwards, so before the app import.
+    monitoring.register(counter)
+    synthetic_data.configure_environment(args.mongo_uri, args.database, args.stations, args.mongomock)
+    app_module = synthetic_data.load_app()
+    if args.mongomock:
+        synthetic_data.seed(app_module, args.seed_users, args.seed_firs, seed=args.seed)
+
+    routes, total = run(app_module, counter, args)
+    result = {
+        'commit': git_commit(),
+        'recorded_at': datetime.utcnow().isoformat(timespec='seconds'),
+        'params': {key: getattr(args, key) for key in ('duration', 'concurrency', 'seed', 'stations', 'mongomock')},
+        'database': {'firs': app_module.firs_collection.estimated_document_count(),
+                     'users': app_module.users_collection.estimated_document_count()},
+        'routes': routes,
+        'total': total,
+    }
+
+    output = args.output or os.path.join(synthetic_data.REPO_ROOT, 'benchmarks', 'results',
+                                         f"load_test_{result['commit']}_{int(time.time())}.json")
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(result, f, indent=2)
+
+    print(json.dumps(result, indent=2))
+    print(f"Results written to {output}")
+    if args.compare:
+        compare(args.compare, result)
+
+
+if __name__ == '__main__':
+    main()
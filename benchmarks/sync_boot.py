@@ -0,0 +1,87 @@
+"""
+Measures the account sync with a large ADMIN_n_* configuration.
+
+Importing the app no longer touches the database; admins and officers are
+synced by the 'flask sync-accounts' deploy step. Each run here is that step
+in a fresh subprocess: import the app, then time sync_accounts(). The first
+run is against an empty scratch database, so it creates every admin and
+officer; later runs see the configuration already synced and return after
+one read, which is what re-running the step on every deploy costs.
+
+    MONGO_URI=mongodb://localhost:27017 python benchmarks/sync_boot.py --stations 1000
+"""
+import os
+import sys
+import json
+import argparse
+import subprocess
+
+from pymongo import MongoClient
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# What 'flask sync-accounts' runs, timed from after the import.
+SYNC_SNIPPET = """
+import time
+import app
+with app.app.app_context():
+    started = time.perf_counter()
+    app.sync_accounts()
+    print('SYNC_SECONDS', time.perf_counter() - started)
+"""
+
+
+def station_env(stations):
+    env = {'ADMIN_COUNT': str(stations)}
+    for i in range(1, stations + 1):
+        env[f'ADMIN_{i}_ID'] = f'PSBENCH{i:04}'
+        env[f'ADMIN_{i}_PASS'] = f'BenchStation@{i}'
+        env[f'ADMIN_{i}_STATION'] = f'Bench {i} Police Station, District {i % 20}'
+    return env
+
+
+def sync_once(env):
+    result = subprocess.run(
+        [sys.executable, '-c', SYNC_SNIPPET],
+        cwd=REPO_ROOT, env=env, capture_output=True, text=True, check=True
+    )
+    for line in result.stdout.splitlines():
+        if line.startswith('SYNC_SECONDS'):
+            return float(line.split()[1])
+    raise RuntimeError(f"Sync did not report a time:\n{result.stdout}\n{result.stderr}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--stations', type=int, default=1000)
+    parser.add_argument('--warm-runs', type=int, default=3)
+    parser.add_argument('--mongo-uri', default=os.getenv('MONGO_URI', 'mongodb://localhost:27017'))
+    args = parser.parse_args()
+
+    database = f'fir_bench_sync_{os.getpid()}'
+    env = {
+        **os.environ,
+        **station_env(args.stations),
+        'MONGO_URI': args.mongo_uri,
+        'MONGO_DB_NAME': database,
+        'MONGO_TLS': os.getenv('MONGO_TLS', 'false'),
+        'FLASK_SECRET_KEY': os.getenv('FLASK_SECRET_KEY', 'bench-secret'),
+        'EVIDENCE_REAPER_INTERVAL': '0',
+    }
+
+    try:
+        cold = sync_once(env)
+        warm = [sync_once(env) for _ in range(args.warm_runs)]
+    finally:
+        MongoClient(args.mongo_uri).drop_database(database)
+
+    print(json.dumps({
+        'stations': args.stations,
+        'officers': args.stations * 5,
+        'cold_sync_seconds': round(cold, 3),
+        'warm_sync_seconds': [round(seconds, 3) for seconds in warm],
+    }, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,249 @@
+"""
+Seeded synthetic data for benchmarks and load tests.
+
+Fills a scratch database with police stations (as ADMIN_n_* entries, the
+same shape as .env.public), their officers, users and FIRs shaped like the
+documents submit_fir writes, together with the analytics rollups, officer
+workloads and event log entries the app keeps alongside them. Evidence
+storage and the chatbot run on the local and stub backends, so no Cloudinary
+or Bard credentials are needed.
+
+    MONGO_URI=mongodb://localhost:27017 python benchmarks/synthetic_data.py \\
+        --database fir_bench --stations 50 --users 20000 --firs 1000000 --drop
+
+--stations 0 keeps the stations from .env.public. With --mongomock the data
+only lives in the current process; load_test.py --mongomock seeds that way.
+"""
+import os
+import sys
+import json
+import random
+import tempfile
+import argparse
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+
+from bson import ObjectId
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+USER_PASSWORD = 'LoadTest@123'
+
+# Same values as the category <select> on the user dashboard, weighted
+# roughly like real complaint traffic.
+CATEGORIES = ['Theft', 'Assault', 'Cybercrime', 'Missing', 'Fraud', 'Harassment', 'Other']
+CATEGORY_WEIGHTS = [30, 12, 18, 5, 15, 12, 8]
+
+
+def station_env(stations, districts=10):
+    env = {'ADMIN_COUNT': str(stations)}
+    for i in range(1, stations + 1):
+        env[f'ADMIN_{i}_ID'] = f'PSBENCH{i:04}'
+        env[f'ADMIN_{i}_PASS'] = f'BenchStation@{i}'
+        env[f'ADMIN_{i}_STATION'] = f'Bench {i} Police Station, Bench District {i % districts}'
+    return env
+
+
+def use_mongomock():
+    """Points pymongo at mongomock. Must run before the app is imported."""
+    import mongomock
+    import mongomock.collection
+    import pymongo
+
+    # pymongo 4.9+ passes a 'sort' option through bulk updates and replaces
+    # that mongomock does not know about; the app never sets it.
+    builder = mongomock.collection.BulkOperationBuilder
+    for method_name in ('add_update', 'add_replace'):
+        method = getattr(builder, method_name)
+
+        def without_sort(self, *args, sort=None, _method=method, **kwargs):
+            return _method(self, *args, **kwargs)
+
+        setattr(builder, method_name, without_sort)
+    pymongo.MongoClient = mongomock.MongoClient
+
+
+def configure_environment(mongo_uri, database, stations=0, mongomock=False):
+    """Sets the env the app reads at import time for an offline, scratch-database run."""
+    if stations:
+        os.environ.update(station_env(stations))
+    os.environ.update({
+        'MONGO_URI': mongo_uri,
+        'MONGO_DB_NAME': database,
+        'MONGO_TLS': os.getenv('MONGO_TLS', 'false'),
+        'FLASK_SECRET_KEY': os.getenv('FLASK_SECRET_KEY', 'bench-secret'),
+        'STORAGE_BACKEND': 'local',
+        'LOCAL_STORAGE_DIR': os.getenv('LOCAL_STORAGE_DIR', os.path.join(tempfile.gettempdir(), 'fir_bench_uploads')),
+        'CHATBOT_BACKEND': 'stub',
+        'EVIDENCE_REAPER_INTERVAL': '0',
+    })
+    if mongomock:
+        os.environ['FIR_EVENTS_MODE'] = 'local'
+        use_mongomock()
+
+
+def load_app():
+    """Imports the app and runs the deploy steps: index creation and account sync."""
+    if REPO_ROOT not in sys.path:
+        sys.path.insert(0, REPO_ROOT)
+    os.chdir(REPO_ROOT)
+    import app as app_module
+    with app_module.app.app_context():
+        app_module.ensure_indexes()
+        app_module.sync_accounts()
+    return app_module
+
+
+def seed(app_module, users, firs, days=365, seed=42, batch_size=10000):
+    """
+    Inserts `users` users and `firs` FIRs spread over the last `days` days.
+    A few users file most of the FIRs and each user mostly reports to one
+    home station, like real traffic. Returns a summary dict.
+    """
+    rng = random.Random(seed)
+    started = time.perf_counter()
+
+    stations = [admin['station_name'] for admin in app_module.read_admins_from_env() or []]
+    if not stations:
+        raise RuntimeError("No stations configured: set ADMIN_n_* entries or pass --stations.")
+    officers = {station: [] for station in stations}
+    for officer in app_module.officers_collection.find({'station_name': {'$in': stations}},
+                                                       {'badge_id': 1, 'name': 1, 'station_name': 1}):
+        officers[officer['station_name']].append(officer)
+
+    # bcrypt is deliberately slow, so every synthetic user shares one hash.
+    password_hash = app_module.bcrypt.generate_password_hash(USER_PASSWORD).decode('utf-8')
+    now = datetime.utcnow()
+    for start in range(0, users, batch_size):
+        app_module.users_collection.insert_many([
+            {'username': f'loaduser{i:07}', 'password': password_hash, 'phone': f'9{i:09}',
+             'email': f'loaduser{i:07}@example.com', 'created_at': now}
+            for i in range(start, min(start + batch_size, users))
+        ], ordered=False)
+
+    rollups = Counter()
+    fir_batch, log_batch = [], []
+
+    def flush():
+        if fir_batch:
+            app_module.firs_collection.insert_many(fir_batch, ordered=False)
+        if log_batch:
+            app_module.fir_events_collection.insert_many(log_batch, ordered=False)
+        fir_batch.clear()
+        log_batch.clear()
+
+    for _ in range(firs):
+        user_index = (int(rng.paretovariate(1.16)) - 1) % users
+        username = f'loaduser{user_index:07}'
+        home = stations[user_index % len(stations)]
+        station = home if rng.random() < 0.8 else rng.choice(stations)
+        filed_date = now - timedelta(seconds=rng.uniform(0, days * 86400))
+        age_days = (now - filed_date).days
+        category = rng.choices(CATEGORIES, CATEGORY_WEIGHTS)[0]
+
+        # Older FIRs are more likely to have been picked up and closed.
+        roll = rng.random()
+        if roll < min(0.9, age_days / 60):
+            status = 'Resolved'
+        elif roll < min(0.97, age_days / 60 + 0.5):
+            status = 'Under Investigation'
+        else:
+            status = 'Pending'
+        officer = rng.choice(officers[station]) if status != 'Pending' and officers[station] else None
+
+        fir = {
+            '_id': ObjectId(),
+            'username': username,
+            'user_name': f'Load User {user_index}',
+            'state': 'Haryana',
+            'district': station.split(', ')[-1],
+            'user_address': f'{rng.randint(1, 999)} Synthetic Street',
+            'mobile': f'9{user_index:09}',
+            'category': category,
+            'other_category': 'Noise complaint' if category == 'Other' else '',
+            'accused_names': ['Unknown'],
+            'incident_date': filed_date - timedelta(hours=rng.uniform(1, 72)),
+            'location': f'Sector {rng.randint(1, 40)}',
+            'police_station': station,
+            'description': f'Synthetic {category.lower()} report number {rng.randint(1, 10 ** 6)}.',
+            'supporting_documents': [],
+            'fir_status': status,
+            'filed_date': filed_date,
+            'assigned_officer_id': officer['badge_id'] if officer else None,
+            'assigned_officer_name': officer['name'] if officer else 'Unassigned',
+        }
+        fir_batch.append(fir)
+        rollups[(station, datetime(filed_date.year, filed_date.month, filed_date.day),
+                 category, status, fir['assigned_officer_id'])] += 1
+
+        base = {'fir_id': fir['_id'], 'police_station': station, 'username': username}
+        log_batch.append({**base, 'at': filed_date, 'actor': {'role': 'user', 'id': username}, 'kind': 'filed',
+                          'from_status': None, 'to_status': 'Pending', 'remarks': 'Initial report filed by the user.'})
+        if officer:
+            # Event times never run past 'now'.
+            age_seconds = (now - filed_date).total_seconds()
+            assigned_after = min(rng.expovariate(1 / (6 * 3600)), age_seconds / 2)
+            log_batch.append({**base, 'at': filed_date + timedelta(seconds=assigned_after),
+                              'actor': {'role': 'system', 'id': None}, 'kind': 'assigned',
+                              'from_status': 'Pending', 'to_status': 'Under Investigation',
+                              'remarks': f"Assigned to {officer['name']}.", 'officer_id': officer['badge_id'],
+                              'metric': 'assignment', 'seconds_since_filed': assigned_after})
+        if status == 'Resolved' and officer:
+            resolved_after = min(assigned_after + rng.expovariate(1 / (10 * 86400)), age_seconds)
+            log_batch.append({**base, 'at': filed_date + timedelta(seconds=resolved_after),
+                              'actor': {'role': 'system', 'id': None}, 'kind': 'status',
+                              'from_status': 'Under Investigation', 'to_status': 'Resolved',
+                              'remarks': 'Status changed from Under Investigation to Resolved.',
+                              'officer_id': officer['badge_id'], 'metric': 'resolution',
+                              'seconds_since_filed': resolved_after})
+        if len(fir_batch) >= batch_size:
+            flush()
+    flush()
+
+    # Counted while generating, so seeding does not depend on $dateFromString.
+    app_module.fir_rollups_collection.delete_many({'police_station': {'$in': stations}})
+    rollup_docs = [
+        {'police_station': station, 'day': day, 'category': category, 'fir_status': status,
+         'assigned_officer_id': officer_id, 'count': count}
+        for (station, day, category, status, officer_id), count in rollups.items()
+    ]
+    for start in range(0, len(rollup_docs), batch_size):
+        app_module.fir_rollups_collection.insert_many(rollup_docs[start:start + batch_size], ordered=False)
+    app_module.assignment_engine.rebuild(app_module.firs_collection)
+
+    return {
+        'stations': len(stations),
+        'officers': sum(len(station_officers) for station_officers in officers.values()),
+        'users': users,
+        'firs': firs,
+        'seconds': round(time.perf_counter() - started, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--stations', type=int, default=0, help='Generate this many stations; 0 uses .env.public.')
+    parser.add_argument('--users', type=int, default=10000)
+    parser.add_argument('--firs', type=int, default=100000)
+    parser.add_argument('--days', type=int, default=365)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--batch-size', type=int, default=10000)
+    parser.add_argument('--database', default='fir_bench')
+    parser.add_argument('--drop', action='store_true', help='Drop the database before seeding.')
+    parser.add_argument('--mongomock', action='store_true')
+    parser.add_argument('--mongo-uri', default=os.getenv('MONGO_URI', 'mongodb://localhost:27017'))
+    args = parser.parse_args()
+
+    if args.drop and not args.mongomock:
+        from pymongo import MongoClient
+        MongoClient(args.mongo_uri).drop_database(args.database)
+
+    configure_environment(args.mongo_uri, args.database, args.stations, args.mongomock)
+    app_module = load_app()
+    summary = seed(app_module, args.users, args.firs, args.days, args.seed, args.batch_size)
+    print(json.dumps({'database': args.database, **summary}, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,251 @@
+import os
+import re
+import time
+import queue
+import threading
+from collections import OrderedDict
+from contextlib import nullcontext
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+
+
+PERSONA_PROMPT = """
+        ### Your Identity and Role
+        You are FIR-Bot, an AI assistant for the 'Smart FIR Filing System'. Your tone must be **professional, empathetic, clear, and reassuring**. Avoid complex legal jargon.
+
+        ### Formatting Rules (VERY IMPORTANT)
+        - **Use Markdown:** Structure all your responses for maximum readability.
+        - **Break Up Text:** Use short paragraphs. **NEVER** respond with a single, long block of text.
+        - **Use Lists:** Use bullet points (`*`) for lists of items or suggestions (e.g., types of evidence). Use numbered lists (`1.`, `2.`) for step-by-step instructions.
+        - **Use Bold:** Use bold text (`**text**`) to highlight key terms, actions, or important information. This is crucial for user guidance.
+
+        ### Your Core Tasks
+        1.  **Guide Users:** Help the user fill out the 'File a New FIR' form by explaining what each field means.
+        2.  **Answer Questions:** Answer specific questions about the FIR filing process, what documents are needed, and the difference between various types of complaints.
+        3.  **Explain Legal Rights:** Provide clear, general information about a citizen's legal rights. You **MUST** include a disclaimer that this is for informational purposes only and not legal advice.
+        4.  **Check Status:** If a user asks about their FIR status, guide them to the **'Your Filed FIRs'** table on their dashboard.
+        5.  **Handle Emergencies:** If the user describes a crime in progress, an immediate threat, or an injury, your **ABSOLUTE PRIORITY** is to advise them to **stop chatting and immediately call the emergency number 112**.
+
+        ### Your Response
+        Based on all the instructions above, provide a direct, helpful, and well-formatted response to the user's message.
+        **Do NOT introduce yourself again** (e.g., "Hello, I am FIR-Bot...") unless the user asks who you are.
+
+        User's message: "{user_message}"
+        """
+
+
+def build_prompt(user_message):
+    return PERSONA_PROMPT.format(user_message=user_message)
+
+
+def split_into_chunks(text):
+    """Splits an answer on paragraph breaks so it can be streamed piece by piece."""
+    return [chunk for chunk in re.split(r'(?<=\n\n)', text) if chunk]
+
+
+class ChatbotUnavailable(Exception):
+    """The backend is not configured or every slot is busy."""
+
+
+class ChatbotTimeout(Exception):
+    """The backend did not answer within the configured timeout."""
+
+
+# --- BACKENDS ---
+# A backend turns a full prompt into an answer. stream() yields the answer in
+# pieces; backends without native streaming yield it as one piece.
+class BardBackend:
+    name = 'bard'
+
+    def __init__(self, token):
+        from bardapi import Bard
+        self.client = Bard(token=token)
+
+    def ask(self, prompt):
+        return self.client.get_answer(prompt)['content']
+
+    def stream(self, prompt):
+        yield self.ask(prompt)
+
+
+class StubBackend:
+    """Deterministic offline backend for tests and local development."""
+
+    name = 'stub'
+
+    def ask(self, prompt):
+        user_message = prompt.rsplit("User's message:", 1)[-1].strip().strip('"')
+        return (
+            f"**FIR-Bot (offline mode)**\n\nYou asked: *{user_message}*\n\n"
+            "* Use the **File a New FIR** form to report an incident.\n"
+            "* **If you are in immediate danger, call 112.**"
+        )
+
+    def stream(self, prompt):
+        yield from split_into_chunks(self.ask(prompt))
+
+
+def get_llm_backend():
+    """
+    Builds the backend named by CHATBOT_BACKEND (default: bard). Returns None
+    when the Bard backend is selected but not configured.
+    """
+    name = os.getenv('CHATBOT_BACKEND', BardBackend.name).lower()
+    if name == StubBackend.name:
+        print("✅ Offline stub chatbot configured.")
+        return StubBackend()
+
+    bard_session_id = os.getenv('BARD_SESSION_ID')
+    if not bard_session_id:
+        print("⚠️ BARD_SESSION_ID not found in .env. Chatbot will be disabled.")
+        return None
+    try:
+        backend = BardBackend(bard_session_id)
+        print("✅ BardAPI Chatbot configured successfully.")
+        return backend
+    except Exception as e:
+        print(f"❌ Error configuring BardAPI: {e}")
+        return None
+
+
+# --- ANSWER CACHE ---
+def normalize_message(message):
+    """Lowercases and strips punctuation and extra spaces so FAQ variants share a cache entry."""
+    return ' '.join(re.sub(r'[^\w\s]', ' ', message.lower()).split())
+
+
+class AnswerCache:
+    """Thread-safe LRU cache whose entries expire after ttl seconds."""
+
+    def __init__(self, max_entries, ttl):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            answer, expires_at = entry
+            if expires_at < time.monotonic():
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+            return answer
+
+    def set(self, key, answer):
+        if self.max_entries <= 0:
+            return
+        with self.lock:
+            self.entries[key] = (answer, time.monotonic() + self.ttl)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+class ChatService:
+    """
+    Runs backend calls off the request thread with a per-call timeout, caps
+    how many calls may be in flight at once and caches answers by normalized
+    message. A call that times out keeps its slot until the backend returns,
+    so slow upstreams cannot pile up unbounded threads.
+    """
+
+    def __init__(self, backend, max_concurrency=4, timeout=20, queue_timeout=2,
+                 cache_entries=256, cache_ttl=3600, call_timer=None):
+        self.backend = backend
+        # Optional context manager factory wrapped around every backend call,
+        # e.g. a metrics histogram's time(); called with the operation name.
+        self.call_timer = call_timer
+        self.timeout = timeout
+        self.queue_timeout = queue_timeout
+        self.slots = threading.BoundedSemaphore(max_concurrency)
+        self.executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix='chatbot')
+        self.cache = AnswerCache(cache_entries, cache_ttl)
+
+    @classmethod
+    def from_env(cls, backend, call_timer=None):
+        return cls(
+            backend,
+            call_timer=call_timer,
+            max_concurrency=int(os.getenv('CHATBOT_MAX_CONCURRENCY', 4)),
+            timeout=float(os.getenv('CHATBOT_TIMEOUT', 20)),
+            queue_timeout=float(os.getenv('CHATBOT_QUEUE_TIMEOUT', 2)),
+            cache_entries=int(os.getenv('CHATBOT_CACHE_SIZE', 256)),
+            cache_ttl=int(os.getenv('CHATBOT_CACHE_TTL', 3600)),
+        )
+
+    def _timed(self, operation):
+        return self.call_timer(operation) if self.call_timer else nullcontext()
+
+    def _ask(self, prompt):
+        with self._timed('ask'):
+            return self.backend.ask(prompt)
+
+    def _acquire_slot(self):
+        if not self.backend:
+            raise ChatbotUnavailable("I am currently offline. My AI model is not configured.")
+        if not self.slots.acquire(timeout=self.queue_timeout):
+            raise ChatbotUnavailable("I am helping a lot of people right now. Please try again in a moment.")
+
+    def answer(self, message):
+        cache_key = normalize_message(message)
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        self._acquire_slot()
+        future = self.executor.submit(self._ask, build_prompt(message))
+        future.add_done_callback(lambda _: self.slots.release())
+        try:
+            answer = future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            raise ChatbotTimeout("The assistant took too long to respond. Please try again.")
+
+        self.cache.set(cache_key, answer)
+        return answer
+
+    def stream(self, message):
+        """Yields the answer in pieces as the backend produces them."""
+        cache_key = normalize_message(message)
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            yield from split_into_chunks(cached)
+            return
+
+        self._acquire_slot()
+        chunks = queue.Queue()
+        done = object()
+
+        def produce():
+            try:
+                with self._timed('stream'):
+                    for chunk in self.backend.stream(build_prompt(message)):
+                        chunks.put(chunk)
+            except Exception as e:
+                chunks.put(e)
+            finally:
+                chunks.put(done)
+
+        future = self.executor.submit(produce)
+        future.add_done_callback(lambda _: self.slots.release())
+
+        pieces = []
+        while True:
+            try:
+                chunk = chunks.get(timeout=self.timeout)
+            except queue.Empty:
+                raise ChatbotTimeout("The assistant took too long to respond. Please try again.")
+            if chunk is done:
+                break
+            if isinstance(chunk, Exception):
+                raise chunk
+            pieces.append(chunk)
+            yield chunk
+
+        self.cache.set(cache_key, ''.join(pieces))
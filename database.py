@@ -0,0 +1,223 @@
+import os
+import threading
+import time
+
+from pymongo import MongoClient, monitoring
+from pymongo.read_preferences import Primary, PrimaryPreferred, Secondary, SecondaryPreferred, Nearest
+
+READ_PREFERENCES = {
+    'primary': Primary,
+    'primaryPreferred': PrimaryPreferred,
+    'secondary': Secondary,
+    'secondaryPreferred': SecondaryPreferred,
+    'nearest': Nearest,
+}
+
+# MongoDB's smallest accepted maxStalenessSeconds.
+MIN_MAX_STALENESS_SECONDS = 90
+
+# (env var, MongoClient option, parser). Unset variables keep pymongo's defaults.
+CLIENT_OPTIONS_FROM_ENV = (
+    ('MONGO_MAX_POOL_SIZE', 'maxPoolSize', int),
+    ('MONGO_MIN_POOL_SIZE', 'minPoolSize', int),
+    ('MONGO_MAX_IDLE_TIME_MS', 'maxIdleTimeMS', int),
+    ('MONGO_WAIT_QUEUE_TIMEOUT_MS', 'waitQueueTimeoutMS', int),
+    ('MONGO_CONNECT_TIMEOUT_MS', 'connectTimeoutMS', int),
+    ('MONGO_SOCKET_TIMEOUT_MS', 'socketTimeoutMS', int),
+    ('MONGO_SERVER_SELECTION_TIMEOUT_MS', 'serverSelectionTimeoutMS', int),
+    # 'majority' or a number of members.
+    ('MONGO_WRITE_CONCERN', 'w', lambda value: int(value) if value.isdigit() else value),
+    ('MONGO_WRITE_JOURNAL', 'journal', lambda value: value.lower() == 'true'),
+    ('MONGO_WRITE_TIMEOUT_MS', 'wTimeoutMS', int),
+)
+
+
+def client_options_from_env():
+    options = {}
+    for env_name, option, parse in CLIENT_OPTIONS_FROM_ENV:
+        value = os.getenv(env_name)
+        if value in (None, ''):
+            continue
+        try:
+            options[option] = parse(value)
+        except ValueError:
+            raise RuntimeError(f"{env_name} must be a number, got {value!r}")
+    return options
+
+
+def read_preference_from_env(mode_var, staleness_var, default_mode='primary'):
+    """
+    Builds a read preference from a mode name and an optional bounded staleness.
+    Staleness only applies to modes that may read from a secondary.
+    """
+    mode = os.getenv(mode_var, default_mode)
+    if mode not in READ_PREFERENCES:
+        raise RuntimeError(f"Unknown {mode_var} '{mode}'. Use one of: {', '.join(READ_PREFERENCES)}.")
+    if mode == 'primary':
+        return Primary()
+
+    max_staleness = int(os.getenv(staleness_var, MIN_MAX_STALENESS_SECONDS))
+    if max_staleness != -1 and max_staleness < MIN_MAX_STALENESS_SECONDS:
+        raise RuntimeError(f"{staleness_var} must be -1 (no bound) or at least {MIN_MAX_STALENESS_SECONDS} seconds.")
+    return READ_PREFERENCES[mode](max_staleness=max_staleness)
+
+
+class PoolStats(monitoring.ConnectionPoolListener):
+    """
+    Tracks open, checked-out and waiting connections for each server's pool.
+    Pool events only carry options that differ from pymongo's defaults, so
+    max_pool_size is set from the client's resolved options as a fallback.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.pools = {}
+        self.max_pool_size = None
+
+    def reset(self):
+        self.lock = threading.Lock()
+        self.pools = {}
+
+    def _pool(self, address):
+        return self.pools.setdefault(address, {'open': 0, 'in_use': 0, 'waiting': 0, 'max_pool_size': None})
+
+    def _adjust(self, address, **changes):
+        with self.lock:
+            pool = self._pool(address)
+            for key, delta in changes.items():
+                pool[key] = max(0, pool[key] + delta)
+
+    def pool_created(self, event):
+        with self.lock:
+            self._pool(event.address)['max_pool_size'] = event.options.get('maxPoolSize') or self.max_pool_size
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_closed(self, event):
+        with self.lock:
+            self.pools.pop(event.address, None)
+
+    def connection_created(self, event):
+        self._adjust(event.address, open=1)
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        self._adjust(event.address, open=-1)
+
+    def connection_check_out_started(self, event):
+        self._adjust(event.address, waiting=1)
+
+    def connection_check_out_failed(self, event):
+        self._adjust(event.address, waiting=-1)
+
+    def connection_checked_out(self, event):
+        self._adjust(event.address, waiting=-1, in_use=1)
+
+    def connection_checked_in(self, event):
+        self._adjust(event.address, in_use=-1)
+
+    def snapshot(self):
+        with self.lock:
+            pools = {address: {**pool, 'max_pool_size': pool['max_pool_size'] or self.max_pool_size}
+                     for address, pool in self.pools.items()}
+        return [
+            {
+                'address': f'{host}:{port}',
+                **pool,
+                'utilization': round(pool['in_use'] / pool['max_pool_size'], 3) if pool['max_pool_size'] else None,
+            }
+            for (host, port), pool in sorted(pools.items())
+        ]
+
+
+class MongoConnection:
+    """
+    Owns this process's MongoClient. The client is created on first use and
+    dropped in a forked child, so a pre-fork server never shares sockets or
+    monitor threads between workers: each worker builds its own client the
+    first time it touches a collection.
+    """
+
+    def __init__(self, uri, database_name, client_options=None, event_listeners=()):
+        self.uri = uri
+        self.database_name = database_name
+        self.client_options = client_options or {}
+        self.pool_stats = PoolStats()
+        self.event_listeners = [*event_listeners, self.pool_stats]
+        self.lock = threading.Lock()
+        self._client = None
+        self._pid = None
+        # Bumped whenever a new client is created so collection handles know to refresh.
+        self.generation = 0
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=self._forget_client)
+
+    def _forget_client(self):
+        # The parent's client and lock are unusable here; don't close the
+        # client, its sockets still belong to the parent.
+        self.lock = threading.Lock()
+        self.pool_stats.reset()
+        self._client = None
+        self._pid = None
+
+    @property
+    def client(self):
+        if self._client is None or self._pid != os.getpid():
+            with self.lock:
+                if self._client is None or self._pid != os.getpid():
+                    self._client = MongoClient(self.uri, event_listeners=self.event_listeners, **self.client_options)
+                    self.pool_stats.max_pool_size = self._client.options.pool_options.max_pool_size
+                    self._pid = os.getpid()
+                    self.generation += 1
+        return self._client
+
+    @property
+    def db(self):
+        return self.client.get_database(self.database_name)
+
+    def collection(self, name, read_preference=None):
+        return LazyCollection(self, name, read_preference)
+
+    def health(self):
+        """Pings the primary and reports this worker's pool usage."""
+        started = time.perf_counter()
+        try:
+            self.client.admin.command('ping')
+            ping = {'ok': True, 'ping_ms': round((time.perf_counter() - started) * 1000, 2)}
+        except Exception as e:
+            ping = {'ok': False, 'error': str(e)}
+        return {**ping, 'pid': os.getpid(), 'pools': self.pool_stats.snapshot()}
+
+
+class LazyCollection:
+    """
+    Stands in for a pymongo Collection at module level and resolves it
+    against the current process's client on each use.
+    """
+
+    def __init__(self, connection, name, read_preference=None):
+        self._connection = connection
+        self._name = name
+        self._read_preference = read_preference
+        self._resolved = (None, None)
+
+    def _collection(self):
+        client = self._connection.client
+        generation, collection = self._resolved
+        if generation != self._connection.generation:
+            options = {'read_preference': self._read_preference} if self._read_preference else {}
+            collection = client.get_database(self._connection.database_name).get_collection(self._name, **options)
+            self._resolved = (self._connection.generation, collection)
+        return collection
+
+    def __getattr__(self, attribute):
+        return getattr(self._collection(), attribute)
+
+    def __repr__(self):
+        return f'LazyCollection({self._name!r})'
@@ -0,0 +1,237 @@
+import sys
+import time
+import queue
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+from bson import ObjectId
+from pymongo import ASCENDING, CursorType
+from pymongo.errors import CollectionInvalid, OperationFailure, PyMongoError
+
+
+class FeedFull(Exception):
+    """Every subscriber slot of this process is taken."""
+
+
+def cooperative_worker():
+    """
+    True when gevent or eventlet has patched sockets in this process, as their
+    gunicorn worker classes do (gunicorn -k gevent). There a held-open stream
+    costs a greenlet; under sync and gthread workers it costs a whole thread.
+    """
+    gevent_monkey = sys.modules.get('gevent.monkey')
+    if gevent_monkey is not None and gevent_monkey.is_module_patched('socket'):
+        return True
+    eventlet_patcher = sys.modules.get('eventlet.patcher')
+    return eventlet_patcher is not None and eventlet_patcher.is_monkey_patched('socket')
+
+
+# Queued in place of an event when a subscriber falls too far behind; the
+# stream then ends and the browser resumes from its Last-Event-ID.
+_OVERFLOW = object()
+
+
+class FirEventFeed:
+    """
+    Fans FIR change events out to the browsers connected to this process.
+
+    Events are stored in a capped collection and tagged with the channels they
+    belong to ('station:<name>', 'user:<username>'). One watcher thread per
+    process follows the collection, with a change stream where the deployment
+    supports them and a tailable cursor otherwise, and hands each event to the
+    local subscribers of its channels. In 'local' mode (or when neither works,
+    e.g. under mongomock) events are dispatched in-process as they are
+    published, which is enough for a single-worker development server.
+    """
+
+    MODES = ('auto', 'change_stream', 'capped', 'local')
+
+    # A tailable cursor starts this far back so events stamped by app servers
+    # with a slightly lagging clock are not skipped. Replays are harmless: the
+    # dashboards apply events idempotently.
+    TAIL_CLOCK_SKEW = timedelta(seconds=5)
+
+    def __init__(self, collection, mode='auto', size_bytes=16 * 1024 * 1024,
+                 max_subscribers=500, queue_size=256):
+        if mode not in self.MODES:
+            raise RuntimeError(f"Unknown FIR_EVENTS_MODE '{mode}'. Expected one of: {', '.join(self.MODES)}")
+        self.collection = collection
+        self.mode = mode
+        self.size_bytes = size_bytes
+        self.max_subscribers = max_subscribers
+        self.queue_size = queue_size
+        self.active_mode = 'local' if mode == 'local' else None
+        self.subscribers = {}
+        self.subscriber_count = 0
+        self.lock = threading.Lock()
+        self.watcher = None
+
+    @property
+    def index_specs(self):
+        return [(self.collection, [('channels', ASCENDING), ('_id', ASCENDING)], {})]
+
+    def ensure_collection(self):
+        """Creates the capped collection on first start; an existing collection is left as it is."""
+        db = self.collection.database
+        try:
+            db.create_collection(self.collection.name, capped=True, size=self.size_bytes)
+            print(f"Created capped collection {self.collection.name}.")
+        except CollectionInvalid:
+            pass
+        except (OperationFailure, NotImplementedError) as e:
+            print(f"Warning: Could not create capped collection {self.collection.name}: {e}")
+
+    # --- PUBLISHING ---
+    def publish(self, events):
+        """Stores [{'type', 'channels', 'fir'}, ...] and delivers them to subscribers."""
+        if not events:
+            return
+        for event in events:
+            event['_id'] = ObjectId()
+        self.collection.insert_many(events, ordered=False)
+        if self.active_mode == 'local':
+            for event in events:
+                self._dispatch(event)
+
+    def _dispatch(self, event):
+        with self.lock:
+            targets = {subscriber for channel in event.get('channels', ())
+                       for subscriber in self.subscribers.get(channel, ())}
+        for subscriber in targets:
+            try:
+                subscriber.put_nowait(event)
+            except queue.Full:
+                self._overflow(subscriber)
+
+    @staticmethod
+    def _overflow(subscriber):
+        try:
+            while True:
+                subscriber.get_nowait()
+        except queue.Empty:
+            pass
+        try:
+            subscriber.put_nowait(_OVERFLOW)
+        except queue.Full:
+            pass
+
+    # --- WATCHER ---
+    def _start_watcher(self):
+        with self.lock:
+            if self.active_mode == 'local' or (self.watcher and self.watcher.is_alive()):
+                return
+            self.watcher = threading.Thread(target=self._watch, name='fir-event-feed', daemon=True)
+            self.watcher.start()
+
+    def _watch(self):
+        modes = ['change_stream', 'capped'] if self.mode == 'auto' else [self.mode]
+        resume_token = None
+        tail_from = datetime.utcnow() - self.TAIL_CLOCK_SKEW
+        # Ids dispatched in the last few seconds, so a re-opened tail skips them.
+        recent = OrderedDict()
+        while True:
+            mode = modes[0]
+            try:
+                if mode == 'change_stream':
+                    with self.collection.watch([{'$match': {'operationType': 'insert'}}],
+                                               resume_after=resume_token) as stream:
+                        self.active_mode = mode
+                        for change in stream:
+                            resume_token = stream.resume_token
+                            self._dispatch(change['fullDocument'])
+                else:
+                    if not self.collection.options().get('capped'):
+                        raise OperationFailure(f"{self.collection.name} is not a capped collection")
+                    cursor = self.collection.find(
+                        {'_id': {'$gte': ObjectId.from_datetime(tail_from)}},
+                        cursor_type=CursorType.TAILABLE_AWAIT
+                    )
+                    self.active_mode = mode
+                    while cursor.alive:
+                        for event in cursor:
+                            if event['_id'] in recent:
+                                continue
+                            recent[event['_id']] = True
+                            if len(recent) > self.queue_size * 16:
+                                recent.popitem(last=False)
+                            tail_from = event['_id'].generation_time.replace(tzinfo=None) - self.TAIL_CLOCK_SKEW
+                            self._dispatch(event)
+                    time.sleep(1)
+            except (OperationFailure, NotImplementedError, TypeError) as e:
+                # Change streams need a replica set and tailing needs a capped
+                # collection; fall through to the next mode that can work here.
+                if self.active_mode is None and len(modes) > 1:
+                    print(f"FIR event feed: {mode} unavailable ({e}); trying {modes[1]}.")
+                    modes.pop(0)
+                    continue
+                if self.active_mode is None:
+                    print(f"FIR event feed: {mode} unavailable ({e}); delivering events in-process only.")
+                    self.active_mode = 'local'
+                    return
+                print(f"FIR event feed error: {e}")
+                resume_token = None
+                time.sleep(1)
+            except PyMongoError as e:
+                print(f"FIR event feed error: {e}")
+                time.sleep(1)
+
+    # --- SUBSCRIBING ---
+    def backfill(self, channels, last_event_id, limit=0):
+        """
+        Stored events of `channels` from the second of last_event_id onwards,
+        minus that event itself. ObjectIds from different workers are only
+        ordered to the second, so the whole second is replayed.
+        """
+        if not ObjectId.is_valid(last_event_id or ''):
+            return []
+        last_id = ObjectId(last_event_id)
+        return list(self.collection.find({
+            'channels': {'$in': channels},
+            '_id': {'$gte': ObjectId.from_datetime(last_id.generation_time), '$ne': last_id}
+        }).sort('_id', ASCENDING).limit(limit))
+
+    def listen(self, channels, last_event_id=None, keepalive=15, max_subscribers=None):
+        """
+        Yields events missed since last_event_id, then live events for
+        `channels`, and None every `keepalive` seconds without traffic.
+        Raises FeedFull when the process already holds max_subscribers
+        (default: self.max_subscribers) subscribers.
+        """
+        if max_subscribers is None:
+            max_subscribers = self.max_subscribers
+        self._start_watcher()
+        subscriber = queue.Queue(self.queue_size)
+        with self.lock:
+            if self.subscriber_count >= max_subscribers:
+                raise FeedFull("Too many live connections. Please try again shortly.")
+            self.subscriber_count += 1
+            for channel in channels:
+                self.subscribers.setdefault(channel, set()).add(subscriber)
+
+        def events():
+            try:
+                replayed = set()
+                for event in self.backfill(channels, last_event_id):
+                    replayed.add(event['_id'])
+                    yield event
+                while True:
+                    try:
+                        event = subscriber.get(timeout=keepalive)
+                    except queue.Empty:
+                        yield None
+                        continue
+                    if event is _OVERFLOW:
+                        return
+                    if event['_id'] in replayed:
+                        continue
+                    yield event
+            finally:
+                with self.lock:
+                    self.subscriber_count -= 1
+                    for channel in channels:
+                        self.subscribers.get(channel, set()).discard(subscriber)
+                        if not self.subscribers.get(channel):
+                            self.subscribers.pop(channel, None)
+
+        return events()
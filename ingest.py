@@ -0,0 +1,218 @@
+import csv
+import json
+from datetime import datetime
+
+from pymongo import ASCENDING
+from pymongo.errors import BulkWriteError
+
+INGEST_FORMATS = ('csv', 'ndjson')
+
+# Tried in order on incident_date and filed_date. The first is what the FIR
+# form submits; ISO covers our own exports; the rest are common in station
+# spreadsheets.
+INGEST_DATE_FORMATS = ['%Y-%m-%dT%H:%M', 'iso', '%d/%m/%Y %H:%M', '%d-%m-%Y %H:%M', '%d/%m/%Y', '%d-%m-%Y']
+
+REQUIRED_FIELDS = ('police_station', 'user_name', 'category', 'incident_date', 'description')
+TEXT_FIELDS = ('username', 'user_name', 'state', 'district', 'user_address', 'mobile', 'category',
+               'other_category', 'location', 'police_station', 'description', 'assigned_officer_id')
+
+DUPLICATE_KEY_ERROR = 11000
+
+
+class RowRejected(ValueError):
+    """The row cannot become a FIR; it goes to the dead-letter file."""
+
+
+def read_rows(f, input_format):
+    """
+    Yields (row_number, record) for every data row, numbered from 1. A record
+    is a dict, or the raw line for an NDJSON line that is not valid JSON.
+    """
+    if input_format == 'csv':
+        for number, row in enumerate(csv.DictReader(f), start=1):
+            yield number, row
+        return
+    number = 0
+    for line in f:
+        if not line.strip():
+            continue
+        number += 1
+        try:
+            yield number, json.loads(line)
+        except ValueError:
+            yield number, line.rstrip('\n')
+
+
+def parse_date(value, field):
+    if isinstance(value, datetime):
+        return value
+    value = str(value).strip()
+    for date_format in INGEST_DATE_FORMATS:
+        try:
+            if date_format == 'iso':
+                return datetime.fromisoformat(value).replace(tzinfo=None)
+            return datetime.strptime(value, date_format)
+        except ValueError:
+            continue
+    raise RowRejected(f"{field} '{value}' is not a recognised date")
+
+
+class FirImporter:
+    """
+    Loads historical FIRs from CSV or NDJSON files into the firs collection.
+
+    Rows use the column names of 'flask export-firs' and are normalized into
+    the document submit_fir writes. Valid rows are written with unordered
+    insert_many in batches; rows that fail validation or the insert are
+    handed back for the dead-letter file rather than stopping the run.
+
+    Every imported FIR is stamped with its source name and row number under a
+    unique index, so re-running a file, or resuming one from a checkpoint
+    that is a batch behind, skips the rows already imported instead of
+    inserting them twice.
+    """
+
+    def __init__(self, collection, statuses, on_insert=None):
+        self.collection = collection
+        self.statuses = statuses
+        # Called with the documents of every batch after they are inserted.
+        self.on_insert = on_insert
+
+    @property
+    def index_specs(self):
+        return [(self.collection, [('import_source', ASCENDING), ('import_row', ASCENDING)],
+                 {'unique': True, 'sparse': True})]
+
+    def normalize(self, record, station_districts, officers):
+        """
+        Returns the FIR document for a row, or raises RowRejected.
+        `station_districts` maps station names to their districts and
+        `officers` maps badge ids to officer documents.
+        """
+        if not isinstance(record, dict):
+            raise RowRejected("not a JSON object")
+        fields = {}
+        for field in TEXT_FIELDS:
+            value = record.get(field)
+            fields[field] = str(value).strip() if value not in (None, '') else ''
+        missing = [field for field in REQUIRED_FIELDS
+                   if not (fields[field] if field in fields else record.get(field))]
+        if missing:
+            raise RowRejected(f"missing {', '.join(missing)}")
+
+        station = fields['police_station']
+        district = station_districts.get(station)
+        if district is None:
+            raise RowRejected(f"unknown police station '{station}'")
+        if fields['district'] and fields['district'] != district:
+            raise RowRejected(f"{station} is not in the {fields['district']} district")
+
+        fir_status = str(record.get('fir_status') or 'Pending').strip()
+        if fir_status not in self.statuses:
+            raise RowRejected(f"fir_status '{fir_status}' must be one of: {', '.join(self.statuses)}")
+
+        officer_id, officer_name = fields['assigned_officer_id'] or None, 'Unassigned'
+        if officer_id:
+            officer = officers.get(officer_id)
+            if officer is None or officer.get('station_name') != station:
+                raise RowRejected(f"officer '{officer_id}' does not belong to {station}")
+            officer_name = officer['name']
+
+        accused_names = record.get('accused_names') or []
+        if isinstance(accused_names, str):
+            # Exported CSVs join the names with '; '.
+            accused_names = [name.strip() for name in accused_names.split(';') if name.strip()]
+
+        incident_date = parse_date(record['incident_date'], 'incident_date')
+        # Legacy registers rarely record when the FIR was entered; the incident date keeps it in order.
+        filed_date = parse_date(record['filed_date'], 'filed_date') if record.get('filed_date') else incident_date
+
+        return {
+            "username": fields['username'] or None,
+            "user_name": fields['user_name'],
+            "state": fields['state'],
+            "district": district,
+            "user_address": fields['user_address'],
+            "mobile": fields['mobile'],
+            "category": fields['category'],
+            "other_category": fields['other_category'],
+            "accused_names": [str(name) for name in accused_names],
+            "incident_date": incident_date,
+            "location": fields['location'],
+            "police_station": station,
+            "description": fields['description'],
+            "supporting_documents": [],
+            "fir_status": fir_status,
+            "filed_date": filed_date,
+            "assigned_officer_id": officer_id,
+            "assigned_officer_name": officer_name,
+            "version": 1,
+        }
+
+    def insert(self, batch):
+        """
+        Inserts [(row_number, doc), ...]. Returns (inserted, skipped, failed):
+        the inserted documents, how many rows were already imported, and
+        [(row_number, doc, message)] for rows the server refused.
+        """
+        if not batch:
+            return [], 0, []
+        docs = [doc for _, doc in batch]
+        errors = []
+        try:
+            self.collection.insert_many(docs, ordered=False)
+        except BulkWriteError as e:
+            errors = e.details.get('writeErrors', [])
+        refused = {error['index']: error for error in errors}
+        inserted = [doc for index, doc in enumerate(docs) if index not in refused]
+        skipped = sum(1 for error in errors if error.get('code') == DUPLICATE_KEY_ERROR)
+        failed = [(batch[index][0], batch[index][1], error.get('errmsg', 'write failed'))
+                  for index, error in refused.items() if error.get('code') != DUPLICATE_KEY_ERROR]
+        if inserted and self.on_insert:
+            self.on_insert(inserted)
+        return inserted, skipped, failed
+
+    def run(self, rows, source, station_districts, officers, batch_size=1000, start_after=0,
+            on_reject=None, on_batch=None):
+        """
+        Imports (row_number, record) pairs from read_rows, skipping rows up to
+        `start_after`. Rejected rows are passed to on_reject(row_number,
+        record, message); after each batch on_batch(last_row, totals) is
+        called, once the batch and its rejects are written, so it is a safe
+        point to checkpoint. Returns the totals.
+        """
+        totals = {'rows': 0, 'inserted': 0, 'skipped': 0, 'rejected': 0}
+        batch, last_row = [], start_after
+
+        def reject(number, record, message):
+            totals['rejected'] += 1
+            if on_reject:
+                on_reject(number, record, message)
+
+        def flush():
+            inserted, skipped, failed = self.insert(batch)
+            totals['inserted'] += len(inserted)
+            totals['skipped'] += skipped
+            for number, doc, message in failed:
+                reject(number, doc, message)
+            batch.clear()
+            if on_batch:
+                on_batch(last_row, totals)
+
+        for number, record in rows:
+            if number <= start_after:
+                continue
+            totals['rows'] += 1
+            last_row = number
+            try:
+                doc = self.normalize(record, station_districts, officers)
+            except RowRejected as e:
+                reject(number, record, str(e))
+            else:
+                doc['import_source'] = source
+                doc['import_row'] = number
+                batch.append((number, doc))
+            if len(batch) >= batch_size:
+                flush()
+        flush()
+        return totals
@@ -0,0 +1,68 @@
+import json
+import decimal
+from datetime import date, datetime
+
+from bson import Decimal128, ObjectId
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; the stdlib encoder is used without it
+    orjson = None
+
+
+def bson_default(obj):
+    """Encodes the BSON and Python types that json/orjson do not handle on their own."""
+    if isinstance(obj, ObjectId):
+        return str(obj)
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    if isinstance(obj, Decimal128):
+        return str(obj.to_decimal())
+    if isinstance(obj, decimal.Decimal):
+        return str(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+class MongoJSONProvider(DefaultJSONProvider):
+    """
+    JSON provider that serializes Mongo documents as they come out of pymongo:
+    ObjectId as its hex string, datetimes as ISO 8601 and Decimal128 as a
+    decimal string. Uses orjson when it is installed, including for the
+    compact or indent=2 output that jsonify asks for; other json.dumps
+    arguments fall back to the stdlib encoder.
+    """
+
+    def dumps(self, obj, **kwargs):
+        if (orjson is not None and set(kwargs) <= {'indent', 'separators'}
+                and kwargs.get('indent') in (None, 2) and kwargs.get('separators') in (None, (',', ':'))):
+            option = orjson.OPT_NON_STR_KEYS
+            if self.sort_keys:
+                option |= orjson.OPT_SORT_KEYS
+            if kwargs.get('indent'):
+                option |= orjson.OPT_INDENT_2
+            return orjson.dumps(obj, default=bson_default, option=option).decode('utf-8')
+        kwargs.setdefault('default', bson_default)
+        kwargs.setdefault('ensure_ascii', self.ensure_ascii)
+        kwargs.setdefault('sort_keys', self.sort_keys)
+        return json.dumps(obj, **kwargs)
+
+    def loads(self, s, **kwargs):
+        if orjson is not None and not kwargs:
+            return orjson.loads(s)
+        return json.loads(s, **kwargs)
+
+
+def stream_json_object(provider, items_key, items, trailer):
+    """
+    Yields `{"<items_key>": [item, item, ...], ...trailer}` piece by piece so
+    an iterable (typically a pymongo cursor) never has to be materialized.
+    `trailer` is called after the last item and returns the remaining keys.
+    """
+    yield '{' + provider.dumps(items_key) + ':['
+    for index, item in enumerate(items):
+        yield (',' if index else '') + provider.dumps(item)
+    yield ']'
+    for key, value in trailer().items():
+        yield ',' + provider.dumps(key) + ':' + provider.dumps(value)
+    yield '}'
@@ -0,0 +1,180 @@
+import time
+import threading
+from bisect import bisect_left
+from contextlib import contextmanager
+
+from pymongo import monitoring
+
+# Seconds; suits everything from a cached Mongo read to a slow chatbot answer.
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in labels) + '}'
+
+
+class Histogram:
+    """A Prometheus histogram: cumulative bucket counts, a sum and a count per label set."""
+
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self.series = {}
+        self.lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(labels.get(name, '') for name in self.labelnames)
+        index = bisect_left(self.buckets, value)
+        with self.lock:
+            series = self.series.get(key)
+            if series is None:
+                series = self.series[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def samples(self):
+        with self.lock:
+            series = {key: ([*counts], total, count) for key, (counts, total, count) in self.series.items()}
+        for key, (counts, total, count) in sorted(series.items()):
+            labels = list(zip(self.labelnames, key))
+            cumulative = 0
+            for bound, bucket_count in zip([*self.buckets, '+Inf'], counts):
+                cumulative += bucket_count
+                yield f'{self.name}_bucket', labels + [('le', bound)], cumulative
+            yield f'{self.name}_sum', labels, total
+            yield f'{self.name}_count', labels, count
+
+
+class Counter:
+    kind = 'counter'
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.series = {}
+        self.lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple(labels.get(name, '') for name in self.labelnames)
+        with self.lock:
+            self.series[key] = self.series.get(key, 0) + amount
+
+    def samples(self):
+        with self.lock:
+            series = dict(self.series)
+        for key, value in sorted(series.items()):
+            yield f'{self.name}_total', list(zip(self.labelnames, key)), value
+
+
+class Registry:
+    """Holds this process's metrics and renders them in the Prometheus text format."""
+
+    def __init__(self):
+        self.metrics = []
+
+    def histogram(self, *args, **kwargs):
+        metric = Histogram(*args, **kwargs)
+        self.metrics.append(metric)
+        return metric
+
+    def counter(self, *args, **kwargs):
+        metric = Counter(*args, **kwargs)
+        self.metrics.append(metric)
+        return metric
+
+    def render(self):
+        lines = []
+        for metric in self.metrics:
+            lines.append(f'# HELP {metric.name} {metric.documentation}')
+            lines.append(f'# TYPE {metric.name} {metric.kind}')
+            for name, labels, value in metric.samples():
+                lines.append(f'{name}{_format_labels(labels)} {value}')
+        return '\n'.join(lines) + '\n'
+
+
+# --- REQUEST CONTEXT ---
+# Mongo command callbacks run on the thread that issued the command, so a
+# thread-local ties them to the request that thread is serving.
+_current = threading.local()
+
+# Upper bound on commands remembered per request for the slow-request log.
+MAX_LOGGED_COMMANDS = 200
+
+
+def start_request(route):
+    _current.route = route
+    _current.command_count = 0
+    _current.commands = []
+
+
+def finish_request():
+    """
+    Returns (command_count, commands) for the Mongo commands the current
+    request issued and forgets the request.
+    """
+    result = getattr(_current, 'command_count', 0), getattr(_current, 'commands', [])
+    _current.route = None
+    _current.command_count = 0
+    _current.commands = []
+    return result
+
+
+def current_route():
+    return getattr(_current, 'route', None) or 'background'
+
+
+class MongoCommandListener(monitoring.CommandListener):
+    """
+    Attributes every Mongo command's latency to the route being served on
+    the issuing thread and keeps a short description of each command for the
+    slow-request log.
+    """
+
+    def __init__(self, duration_histogram):
+        self.duration_histogram = duration_histogram
+        self.pending = threading.local()
+
+    def started(self, event):
+        if getattr(_current, 'route', None) is None:
+            return
+        target = event.command.get(event.command_name)
+        described = {'command': event.command_name, 'collection': target if isinstance(target, str) else None}
+        if not hasattr(self.pending, 'by_request_id'):
+            self.pending.by_request_id = {}
+        self.pending.by_request_id[event.request_id] = described
+
+    def _finished(self, event, outcome):
+        seconds = event.duration_micros / 1e6
+        self.duration_histogram.observe(seconds, route=current_route(), command=event.command_name)
+        described = getattr(self.pending, 'by_request_id', {}).pop(event.request_id, None)
+        if described is None or getattr(_current, 'route', None) is None:
+            return
+        _current.command_count += 1
+        if len(_current.commands) < MAX_LOGGED_COMMANDS:
+            _current.commands.append({**described, 'ms': round(seconds * 1000, 2), 'outcome': outcome})
+
+    def succeeded(self, event):
+        self._finished(event, 'ok')
+
+    def failed(self, event):
+        self._finished(event, 'failed')
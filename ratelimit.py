@@ -0,0 +1,152 @@
+import time
+import threading
+from collections import OrderedDict
+
+from pymongo import ASCENDING, ReturnDocument
+from pymongo.errors import DuplicateKeyError, PyMongoError
+
+# Scopes a route class can be limited by: the client address, the account
+# (the session user, or the account named in a login or registration) and
+# the route class as a whole.
+RATE_LIMIT_SCOPES = ('ip', 'user', 'route')
+
+
+class RateLimited(Exception):
+    """A token bucket for this request is empty."""
+
+    def __init__(self, scope, retry_after):
+        super().__init__(f"Rate limit exceeded for {scope}")
+        self.scope = scope
+        self.retry_after = retry_after
+
+
+def parse_limits(spec):
+    """
+    Parses 'ip=20/60,user=10/300' into {'ip': (20, 60.0), 'user': (10, 300.0)}:
+    a bucket of 20 requests refilled over 60 seconds per client address, and so
+    on. An empty spec means no limits.
+    """
+    limits = {}
+    for part in filter(None, (part.strip() for part in (spec or '').split(','))):
+        scope, _, rate = part.partition('=')
+        scope = scope.strip()
+        if scope not in RATE_LIMIT_SCOPES:
+            raise RuntimeError(f"Unknown rate limit scope '{scope}' in '{spec}'. "
+                               f"Expected one of: {', '.join(RATE_LIMIT_SCOPES)}")
+        try:
+            capacity, period = rate.split('/')
+            limits[scope] = (int(capacity), float(period))
+        except ValueError:
+            raise RuntimeError(f"Bad rate limit '{part}'. Expected <scope>=<requests>/<seconds>, e.g. ip=20/60")
+    return limits
+
+
+class RateLimiter:
+    """
+    Token buckets shared by every worker through a MongoDB collection.
+
+    A bucket holds up to `capacity` tokens and refills at capacity / period
+    tokens per second; each request takes one. Refill and take happen in one
+    pipeline update on the bucket's document, timed by the server's clock
+    ($$NOW), so workers on different hosts agree without any locking. A bucket
+    that has been idle long enough to be full again is no different from a
+    missing one, so documents expire through a TTL index.
+
+    When MongoDB cannot be reached the limiter falls back to per-process
+    in-memory buckets rather than letting every request through; 'memory'
+    uses them always (single-worker setups, tests) and 'off' disables limits.
+    """
+
+    BACKENDS = ('mongo', 'memory', 'off')
+
+    def __init__(self, collection, backend='mongo', max_memory_keys=100_000):
+        if backend not in self.BACKENDS:
+            raise RuntimeError(f"Unknown RATE_LIMIT_BACKEND '{backend}'. Expected one of: {', '.join(self.BACKENDS)}")
+        self.collection = collection
+        self.backend = backend
+        self.max_memory_keys = max_memory_keys
+        self.memory = OrderedDict()
+        self.lock = threading.Lock()
+        self.fallback_logged_at = 0
+
+    @property
+    def index_specs(self):
+        return [(self.collection, [('expires_at', ASCENDING)], {'expireAfterSeconds': 0})]
+
+    def take(self, key, capacity, period):
+        """Takes a token from the bucket `key`. Returns 0 when allowed, else seconds until a token is free."""
+        if self.backend == 'off':
+            return 0
+        if self.backend == 'mongo':
+            try:
+                return self._take_mongo(key, capacity, period)
+            except PyMongoError as e:
+                if time.monotonic() - self.fallback_logged_at > 60:
+                    self.fallback_logged_at = time.monotonic()
+                    print(f"⚠️ Rate limiter falling back to in-process buckets: {e}")
+        return self._take_memory(key, capacity, period)
+
+    def _take_mongo(self, key, capacity, period):
+        rate = capacity / period
+        elapsed_seconds = {'$divide': [{'$subtract': ['$$NOW', {'$ifNull': ['$at', '$$NOW']}]}, 1000]}
+        pipeline = [
+            {'$set': {
+                'tokens': {'$min': [capacity, {'$add': [{'$ifNull': ['$tokens', capacity]},
+                                                        {'$multiply': [elapsed_seconds, rate]}]}]},
+                'at': '$$NOW',
+            }},
+            {'$set': {'allowed': {'$gte': ['$tokens', 1]}}},
+            {'$set': {
+                'tokens': {'$cond': ['$allowed', {'$subtract': ['$tokens', 1]}, '$tokens']},
+                'expires_at': {'$add': ['$$NOW', int(period * 1000)]},
+            }},
+        ]
+        try:
+            bucket = self._update_bucket(key, pipeline)
+        except DuplicateKeyError:
+            # Two first requests raced to create the bucket; it exists now.
+            bucket = self._update_bucket(key, pipeline)
+        return 0 if bucket['allowed'] else (1 - bucket['tokens']) / rate
+
+    def _update_bucket(self, key, pipeline):
+        return self.collection.find_one_and_update(
+            {'_id': key}, pipeline, projection={'tokens': 1, 'allowed': 1},
+            upsert=True, return_document=ReturnDocument.AFTER
+        )
+
+    def _take_memory(self, key, capacity, period):
+        rate = capacity / period
+        now = time.monotonic()
+        with self.lock:
+            tokens, at = self.memory.pop(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - at) * rate)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            self.memory[key] = (tokens, now)
+            while len(self.memory) > self.max_memory_keys:
+                self.memory.popitem(last=False)
+        return 0 if allowed else (1 - tokens) / rate
+
+
+class ConcurrencyLimiter:
+    """
+    Caps how many requests of each route class this process handles at once.
+    A request over the cap is turned away immediately instead of waiting for
+    a slot, so a burst on an expensive route cannot occupy every worker
+    thread. A cap of 0 means no cap.
+    """
+
+    def __init__(self, caps):
+        self.caps = caps
+        self.slots = {route_class: threading.BoundedSemaphore(cap) for route_class, cap in caps.items() if cap > 0}
+
+    def acquire(self, route_class):
+        """Returns True when a slot was taken; pair it with release()."""
+        slots = self.slots.get(route_class)
+        return slots is None or slots.acquire(blocking=False)
+
+    def release(self, route_class):
+        slots = self.slots.get(route_class)
+        if slots is not None:
+            slots.release()
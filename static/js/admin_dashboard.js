@@ -28,8 +28,26 @@ document.addEventListener('DOMContentLoaded', () => {
     });
 
     document.getElementById('add-officer-form').addEventListener('submit', handleAddOfficer);
+
+    setupInfiniteScroll();
+
+    document.getElementById('firSearchInput').addEventListener('input', () => {
+        clearTimeout(searchDebounceTimer);
+        searchDebounceTimer = setTimeout(searchFIR, 300);
+    });
+    document.getElementById('firSearchFilters').addEventListener('change', searchFIR);
+
+    setupBulkActions();
+    setupLiveUpdates();
 });
 
+let nextCursor = null;
+let isLoadingPage = false;
+let searchDebounceTimer = null;
+let searchParams = null;
+
+const FIR_STATUSES = ['Pending', 'Under Investigation', 'Resolved'];
+
 function logout() {
     fetch('/logout', { method: 'POST' })
         .then(res => res.json())
@@ -50,26 +68,273 @@ function toggleReports() {
     }
 }
 
-function searchFIR() {
-    const input = document.getElementById('firSearchInput');
-    const filter = input.value.toUpperCase();
-    const table = document.getElementById('firTable');
-    const tr = table.getElementsByTagName('tr');
+function setupInfiniteScroll() {
+    const firTable = document.getElementById('firTable');
+    const sentinel = document.getElementById('fir-page-sentinel');
+    if (!firTable || !sentinel) return;
 
-    for (let i = 1; i < tr.length; i++) { 
-        const td = tr[i].getElementsByTagName('td')[0]; 
-        if (td) {
-            const txtValue = td.textContent || td.innerText;
-            if (txtValue.toUpperCase().indexOf(filter) > -1) {
-                tr[i].style.display = '';
-            } else {
-                tr[i].style.display = 'none';
-            }
+    nextCursor = firTable.dataset.nextCursor || null;
+    const observer = new IntersectionObserver(entries => {
+        if (entries[0].isIntersecting) loadMoreFIRs();
+    });
+    observer.observe(sentinel);
+}
+
+function listUrl(cursor) {
+    const params = new URLSearchParams(searchParams || {});
+    if (cursor) params.set('cursor', cursor);
+    const base = searchParams ? '/admin/firs/search' : '/admin/firs';
+    return `${base}?${params.toString()}`;
+}
+
+async function loadMoreFIRs() {
+    if (!nextCursor || isLoadingPage) return;
+    isLoadingPage = true;
+    try {
+        const response = await fetch(listUrl(nextCursor));
+        const data = await response.json();
+        if (!response.ok) throw new Error(data.error || 'Failed to load more FIRs.');
+
+        const tbody = document.querySelector('#firTable tbody');
+        data.firs.forEach(fir => tbody.appendChild(buildFIRRow(fir)));
+        nextCursor = data.next;
+    } catch (error) {
+        console.error('Error loading more FIRs:', error);
+    } finally {
+        isLoadingPage = false;
+    }
+}
+
+function escapeHTML(value) {
+    const div = document.createElement('div');
+    div.textContent = value == null ? '' : value;
+    return div.innerHTML;
+}
+
+function buildFIRRow(fir) {
+    const row = document.createElement('tr');
+    const statusOptions = FIR_STATUSES.map(status =>
+        `<option value="${status}" ${fir.fir_status === status ? 'selected' : ''}>${status}</option>`
+    ).join('');
+    const category = escapeHTML(fir.category) + (fir.other_category ? ` (${escapeHTML(fir.other_category)})` : '');
+
+    row.dataset.firId = fir._id;
+    row.innerHTML = `
+        <td><input type="checkbox" class="fir-select" value="${fir._id}"></td>
+        <td>${fir._id}</td>
+        <td>${escapeHTML(fir.user_name)}</td>
+        <td>${category}</td>
+        <td><select class="status-select" data-fir-id="${fir._id}">${statusOptions}</select></td>
+        <td class="officer-cell">${escapeHTML(fir.assigned_officer_name || 'Unassigned')}</td>
+        <td>${fir.filed_date.slice(0, 16).replace('T', ' ')}</td>
+        <td><button class="view-details-btn" data-fir-id="${fir._id}">View Details</button></td>
+    `;
+    return row;
+}
+
+async function searchFIR() {
+    const filters = {
+        q: document.getElementById('firSearchInput').value.trim(),
+        category: document.getElementById('filterCategory').value,
+        fir_status: document.getElementById('filterStatus').value,
+        filed_date_from: document.getElementById('filterFiledFrom').value,
+        filed_date_to: document.getElementById('filterFiledTo').value
+    };
+    const activeFilters = Object.fromEntries(Object.entries(filters).filter(([, value]) => value));
+    searchParams = Object.keys(activeFilters).length > 0 ? activeFilters : null;
+
+    const tbody = document.querySelector('#firTable tbody');
+    if (!tbody) return;
+
+    try {
+        const response = await fetch(listUrl(null));
+        const data = await response.json();
+        if (!response.ok) throw new Error(data.error || 'Search failed.');
+
+        tbody.innerHTML = '';
+        data.firs.forEach(fir => tbody.appendChild(buildFIRRow(fir)));
+        if (data.firs.length === 0) {
+            tbody.innerHTML = '<tr><td colspan="8">No FIRs match your search.</td></tr>';
         }
+        nextCursor = data.next;
+    } catch (error) {
+        console.error('Error searching FIRs:', error);
+        alert(error.message);
+    }
+}
+
+function setupLiveUpdates() {
+    const firTable = document.getElementById('firTable');
+    if (!firTable) return;
+    if (!window.EventSource) {
+        pollFIREvents();
+        return;
+    }
+    // EventSource reconnects on its own and sends Last-Event-ID, so missed changes are replayed.
+    const source = new EventSource('/events/stream');
+    let lastEventId = null;
+    source.addEventListener('fir', (event) => {
+        lastEventId = event.lastEventId;
+        applyFIREvent(JSON.parse(event.data));
+    });
+    // The server answers 204 when it cannot hold streams open, which closes the source for good.
+    source.onerror = () => {
+        if (source.readyState === EventSource.CLOSED) pollFIREvents(lastEventId);
+    };
+}
+
+async function pollFIREvents(after = null, seen = new Set()) {
+    let retryMs = 5000;
+    try {
+        const response = await fetch(after ? `/events/poll?after=${encodeURIComponent(after)}` : '/events/poll');
+        if (response.ok) {
+            const data = await response.json();
+            // Each poll replays the last event's second, so skip events already applied.
+            data.events.filter(event => !seen.has(event.id)).forEach(event => {
+                seen.add(event.id);
+                applyFIREvent(event);
+            });
+            if (seen.size > 1000) seen.clear();
+            after = data.last_id;
+            retryMs = data.retry_ms;
+        }
+    } catch (error) {
+        console.error('Error polling FIR events:', error);
+    }
+    setTimeout(() => pollFIREvents(after, seen), retryMs);
+}
+
+function applyFIREvent({ type, fir }) {
+    const tbody = document.querySelector('#firTable tbody');
+    const row = tbody.querySelector(`tr[data-fir-id="${fir._id}"]`);
+
+    if (type === 'cancelled') {
+        if (row) row.remove();
+        if (!tbody.querySelector('tr[data-fir-id]')) {
+            const message = searchParams ? 'No FIRs match your search.' : 'No FIR reports have been filed yet.';
+            tbody.innerHTML = `<tr><td colspan="8">${message}</td></tr>`;
+        }
+        updateSelectedCount();
+        return;
+    }
+    if (row) {
+        if (fir.fir_status) row.querySelector('.status-select').value = fir.fir_status;
+        if ('assigned_officer_name' in fir) {
+            row.querySelector('.officer-cell').textContent = fir.assigned_officer_name || 'Unassigned';
+        }
+    } else if (type === 'created' && !searchParams) {
+        // Search results are a snapshot; new FIRs only join the unfiltered list.
+        tbody.querySelectorAll('tr:not([data-fir-id])').forEach(placeholder => placeholder.remove());
+        tbody.prepend(buildFIRRow(fir));
+    }
+}
+
+function setupBulkActions() {
+    const firTable = document.getElementById('firTable');
+    if (!firTable) return;
+
+    document.getElementById('selectAllFirs').addEventListener('change', (event) => {
+        firTable.querySelectorAll('.fir-select').forEach(box => { box.checked = event.target.checked; });
+        updateSelectedCount();
+    });
+    document.getElementById('bulkStatusBtn').addEventListener('click', bulkUpdateStatus);
+    document.getElementById('bulkAssignBtn').addEventListener('click', bulkAssignOfficer);
+    populateBulkOfficerSelect();
+}
+
+function selectedFirIds() {
+    return Array.from(document.querySelectorAll('#firTable .fir-select:checked')).map(box => box.value);
+}
+
+function updateSelectedCount() {
+    document.getElementById('selectedCount').textContent = `${selectedFirIds().length} selected`;
+}
+
+async function populateBulkOfficerSelect() {
+    try {
+        const response = await fetch('/admin/settings/officers');
+        if (!response.ok) throw new Error('Failed to fetch officers.');
+        const officers = await response.json();
+        const select = document.getElementById('bulkOfficer');
+        officers.filter(officer => officer.is_active).forEach(officer => {
+            select.add(new Option(`${officer.name} (${officer.badge_id})`, officer.badge_id));
+        });
+    } catch (error) {
+        console.error('Error loading officers for bulk assignment:', error);
+    }
+}
+
+async function postBulkAction(url, payload) {
+    const response = await fetch(url, {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify(payload)
+    });
+    const result = await response.json();
+    if (!response.ok) throw new Error(result.error || 'Bulk update failed.');
+    return result;
+}
+
+function reportBulkResults(result) {
+    const failed = result.results.filter(item => item.result === 'not_found' || item.result === 'invalid_id');
+    let message = `${result.updated} FIR(s) updated.`;
+    if (failed.length > 0) {
+        message += ` ${failed.length} could not be found at this station.`;
+    }
+    alert(message);
+}
+
+async function bulkUpdateStatus() {
+    const firIds = selectedFirIds();
+    const status = document.getElementById('bulkStatus').value;
+    if (firIds.length === 0 || !status) {
+        alert('Select at least one FIR and a status.');
+        return;
+    }
+    try {
+        const result = await postBulkAction('/admin/firs/bulk_status', { fir_ids: firIds, status });
+        result.results.forEach(item => {
+            if (item.result !== 'updated') return;
+            const select = document.querySelector(`.status-select[data-fir-id="${item.fir_id}"]`);
+            if (select) select.value = status;
+        });
+        reportBulkResults(result);
+    } catch (error) {
+        console.error('Error in bulk status update:', error);
+        alert(error.message);
+    }
+}
+
+async function bulkAssignOfficer() {
+    const firIds = selectedFirIds();
+    const officerSelect = document.getElementById('bulkOfficer');
+    const officerId = officerSelect.value;
+    if (firIds.length === 0 || !officerId) {
+        alert('Select at least one FIR and an officer.');
+        return;
+    }
+    const officerName = officerSelect.selectedOptions[0].textContent.replace(/ \(.*\)$/, '');
+    try {
+        const result = await postBulkAction('/admin/firs/bulk_assign', { fir_ids: firIds, officer_id: officerId });
+        result.results.forEach(item => {
+            if (item.result !== 'updated') return;
+            const row = document.querySelector(`#firTable tr[data-fir-id="${item.fir_id}"]`);
+            if (!row) return;
+            row.querySelector('.officer-cell').textContent = officerName;
+            row.querySelector('.status-select').value = 'Under Investigation';
+        });
+        reportBulkResults(result);
+    } catch (error) {
+        console.error('Error in bulk assignment:', error);
+        alert(error.message);
     }
 }
 
 function handleTableChange(event) {
+    if (event.target.classList.contains('fir-select')) {
+        updateSelectedCount();
+        return;
+    }
     if (event.target.classList.contains('status-select')) {
         const firId = event.target.dataset.firId;
         const newStatus = event.target.value;
@@ -119,6 +384,14 @@ async function viewDetails(firId) {
                 <ul>
             `;
             fir.supporting_documents.forEach((doc, index) => {
+                if (doc.status === 'pending') {
+                    documentsHtml += `<li>Document ${index + 1}: ${escapeHTML(doc.filename)} (uploading...)</li>`;
+                    return;
+                }
+                if (doc.status === 'failed') {
+                    documentsHtml += `<li>Document ${index + 1}: ${escapeHTML(doc.filename)} (upload failed)</li>`;
+                    return;
+                }
                 const fileName = doc.url.split('/').pop();
                 documentsHtml += `<li><a href="${doc.url}" target="_blank" rel="noopener noreferrer">Document ${index + 1}: ${fileName}</a></li>`;
             });
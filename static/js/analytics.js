@@ -1,36 +1,59 @@
 document.addEventListener('DOMContentLoaded', function() {
     fetchAndRenderAnalytics();
+    document.getElementById('date-range-form').addEventListener('submit', (event) => {
+        event.preventDefault();
+        fetchAndRenderAnalytics();
+    });
 });
 
+const charts = {};
+
 async function fetchAndRenderAnalytics() {
     const loadingMessage = document.getElementById('loading-message');
     const chartContainer = document.querySelector('.chart-container');
     const summaryContainer = document.getElementById('summary-container');
+    const breakdownContainer = document.getElementById('breakdown-container');
     const noDataMessage = document.getElementById('no-data-message');
 
+    const params = new URLSearchParams();
+    const dateFrom = document.getElementById('date-from').value;
+    const dateTo = document.getElementById('date-to').value;
+    if (dateFrom) params.set('from', dateFrom);
+    if (dateTo) params.set('to', dateTo);
+
     try {
-        const response = await fetch('/admin/analytics_data');
+        const response = await fetch(`/admin/analytics_data?${params.toString()}`);
         if (!response.ok) {
             throw new Error('Failed to fetch analytics data from the server.');
         }
         const data = await response.json();
+        const categories = data.categories;
 
         loadingMessage.style.display = 'none';
 
-        if (Object.keys(data).length === 0) {
+        if (Object.keys(categories).length === 0) {
+            chartContainer.style.display = 'none';
+            summaryContainer.style.display = 'none';
+            breakdownContainer.style.display = 'none';
             noDataMessage.style.display = 'block';
             return;
         }
 
+        noDataMessage.style.display = 'none';
         chartContainer.style.display = 'block';
         summaryContainer.style.display = 'block';
+        breakdownContainer.style.display = 'block';
 
-        const labels = Object.keys(data);
-        const counts = Object.values(data);
+        const labels = Object.keys(categories);
+        const counts = Object.values(categories);
         const totalFirs = counts.reduce((sum, count) => sum + count, 0);
 
         renderPieChart(labels, counts);
-        renderSummaryTable(data, totalFirs);
+        renderSummaryTable(categories, totalFirs);
+        renderDailyChart(data.daily);
+        renderStatusTable(data.statuses);
+        renderOfficerTable(data.officers);
+        renderResponseTimesTable(data.response_times);
 
     } catch (error) {
         loadingMessage.innerHTML = `<p style="color: #EF4444;"><strong>Error:</strong> ${error.message}</p>`;
@@ -46,7 +69,8 @@ function renderPieChart(labels, counts) {
         '#8B5CF6', '#F97316', '#6B7280', '#EC4899'
     ];
 
-    new Chart(ctx, {
+    if (charts.pie) charts.pie.destroy();
+    charts.pie = new Chart(ctx, {
         type: 'pie',
         data: {
             labels: labels,
@@ -102,3 +126,85 @@ function renderSummaryTable(data, totalFirs) {
         <td>100.00%</td>
     `;
 }
+
+function renderDailyChart(daily) {
+    const ctx = document.getElementById('dailyChart').getContext('2d');
+    if (charts.daily) charts.daily.destroy();
+    charts.daily = new Chart(ctx, {
+        type: 'line',
+        data: {
+            labels: daily.map(point => point.day),
+            datasets: [{
+                label: 'FIRs filed',
+                data: daily.map(point => point.count),
+                borderColor: '#3B82F6',
+                backgroundColor: 'rgba(59, 130, 246, 0.2)',
+                fill: true
+            }]
+        },
+        options: {
+            responsive: true,
+            plugins: {
+                legend: {
+                    labels: {
+                        color: '#D1D5DB'
+                    }
+                }
+            },
+            scales: {
+                x: { ticks: { color: '#D1D5DB' } },
+                y: { ticks: { color: '#D1D5DB' }, beginAtZero: true }
+            }
+        }
+    });
+}
+
+function renderStatusTable(statuses) {
+    const tbody = document.getElementById('status-tbody');
+    tbody.innerHTML = '';
+    for (const [status, count] of Object.entries(statuses)) {
+        const row = tbody.insertRow();
+        row.innerHTML = `
+            <td>${status}</td>
+            <td>${count}</td>
+        `;
+    }
+}
+
+function renderOfficerTable(officers) {
+    const tbody = document.getElementById('officer-tbody');
+    tbody.innerHTML = '';
+    if (officers.length === 0) {
+        tbody.innerHTML = '<tr><td colspan="3">No FIRs have been assigned to officers yet.</td></tr>';
+        return;
+    }
+    officers.forEach(officer => {
+        const row = tbody.insertRow();
+        row.innerHTML = `
+            <td>${officer.name} (${officer.badge_id})</td>
+            <td>${officer.open}</td>
+            <td>${officer.resolved}</td>
+        `;
+    });
+}
+
+function formatDuration(seconds) {
+    if (seconds === null || seconds === undefined) return '-';
+    const hours = seconds / 3600;
+    return hours >= 48 ? `${(hours / 24).toFixed(1)} days` : `${hours.toFixed(1)} hours`;
+}
+
+function renderResponseTimesTable(responseTimes) {
+    const tbody = document.getElementById('response-times-tbody');
+    tbody.innerHTML = '';
+    const rows = [{ name: 'Whole station', ...responseTimes.station }, ...responseTimes.officers];
+    rows.forEach(entry => {
+        const row = tbody.insertRow();
+        row.innerHTML = `
+            <td>${entry.badge_id ? `${entry.name} (${entry.badge_id})` : entry.name}</td>
+            <td>${formatDuration(entry.avg_assignment_seconds)}</td>
+            <td>${formatDuration(entry.avg_resolution_seconds)}</td>
+        `;
+    });
+    tbody.rows[0].classList.add('total-row');
+}
@@ -4,6 +4,8 @@ document.addEventListener('DOMContentLoaded', async () => {
     checkCategory();
     generateAccusedNameInputs();
     fetchUserFIRs();
+    setupInfiniteScroll();
+    setupLiveUpdates();
     setDateTimeMax();
     loadChatHistory(); 
 
@@ -31,6 +33,9 @@ document.addEventListener('DOMContentLoaded', async () => {
 });
 
 let policeStationData = {};
+let nextFIRCursor = null;
+let isLoadingFIRs = false;
+let liveUpdates = null;
 
 const stateDistricts = {
     "Haryana": ["Bhiwani", "Rohtak"],
@@ -187,25 +192,42 @@ async function submitFIRForm() {
             document.getElementById('fir-form').reset();
             checkCategory();
             generateAccusedNameInputs();
-            fetchUserFIRs();
+            // With live updates on, the new FIR arrives as a 'created' event.
+            if (!liveUpdates) fetchUserFIRs();
         }
     } catch (error) {
         alert('An error occurred while submitting the FIR.');
     }
 }
 
-async function fetchUserFIRs() {
+async function fetchUserFIRs(cursor = null) {
+    if (cursor && isLoadingFIRs) return;
+    isLoadingFIRs = true;
     try {
-        const response = await fetch('/user/firs');
+        const url = cursor ? `/user/firs?cursor=${encodeURIComponent(cursor)}` : '/user/firs';
+        const response = await fetch(url);
         const data = await response.json();
         if (response.ok) {
-            updateFIRList(data.firs);
+            updateFIRList(data.firs, Boolean(cursor));
+            nextFIRCursor = data.next;
         }
     } catch (error) {
         console.error('Error fetching FIRs:', error);
+    } finally {
+        isLoadingFIRs = false;
     }
 }
 
+function setupInfiniteScroll() {
+    const sentinel = document.getElementById('fir-page-sentinel');
+    const observer = new IntersectionObserver(entries => {
+        if (entries[0].isIntersecting && nextFIRCursor) {
+            fetchUserFIRs(nextFIRCursor);
+        }
+    });
+    observer.observe(sentinel);
+}
+
 async function fetchFIRDetails(firId) {
     try {
         const response = await fetch(`/fir/${firId}`);
@@ -213,45 +235,137 @@ async function fetchFIRDetails(firId) {
         if (!response.ok) throw new Error(data.error || 'Server error');
         displayFIRDetails(data.fir);
         document.getElementById('fir-details-modal').style.display = 'flex';
+        loadFIRTimeline(firId);
     } catch (error) {
         alert(`Error: ${error.message}`);
     }
 }
 
+async function loadFIRTimeline(firId) {
+    const timelineList = document.getElementById('fir-timeline');
+    try {
+        const response = await fetch(`/fir/${firId}/timeline`);
+        const data = await response.json();
+        if (!response.ok) throw new Error(data.error || 'Server error');
+        timelineList.innerHTML = data.timeline.map(entry => `
+            <li><strong>${escapeHTML(entry.status)}</strong> - ${new Date(entry.timestamp).toLocaleString()}<br>${escapeHTML(entry.remarks)}</li>
+        `).join('');
+    } catch (error) {
+        timelineList.innerHTML = `<li>Could not load the timeline: ${escapeHTML(error.message)}</li>`;
+    }
+}
+
+function escapeHTML(value) {
+    const div = document.createElement('div');
+    div.textContent = value == null ? '' : value;
+    return div.innerHTML;
+}
+
 async function cancelFIR(firId) {
     try {
         const response = await fetch(`/cancel_fir/${firId}`, { method: 'POST' });
         const data = await response.json();
         alert(data.message || data.error);
         if (response.ok) {
-            fetchUserFIRs();
+            applyFIREvent({ type: 'cancelled', fir: { _id: firId } });
         }
     } catch (error) {
         alert('An error occurred while cancelling the FIR.');
     }
 }
 
-function updateFIRList(firs) {
+function updateFIRList(firs, append = false) {
     const firListBody = document.getElementById('fir-list');
+    if (append) {
+        firs.forEach(fir => appendFIRRow(firListBody, fir));
+        return;
+    }
     firListBody.innerHTML = ''; 
     if (!firs || firs.length === 0) {
         firListBody.innerHTML = '<tr><td colspan="5">You have not filed any FIRs yet.</td></tr>';
         return;
     }
-    firs.forEach(fir => {
-        const statusClass = `status-${fir.fir_status.toLowerCase().replace(/\s+/g, '-')}`;
-        const row = firListBody.insertRow();
-        row.innerHTML = `
-            <td>${fir._id}</td>
-            <td><span class="status-badge ${statusClass}">${fir.fir_status}</span></td>
-            <td>${fir.assigned_officer_name || 'Unassigned'}</td>
-            <td>${new Date(fir.filed_date).toLocaleDateString()}</td>
-            <td>
-                <button class="view-btn" data-fir-id="${fir._id}">🔍 View</button>
-                <button class="cancel-btn" data-fir-id="${fir._id}" ${fir.fir_status !== 'Pending' ? 'disabled' : ''}>❌ Cancel</button>
-            </td>
-        `;
+    firs.forEach(fir => appendFIRRow(firListBody, fir));
+}
+
+function appendFIRRow(firListBody, fir, index = -1) {
+    const row = firListBody.insertRow(index);
+    row.dataset.firId = fir._id;
+    fillFIRRow(row, fir);
+}
+
+function fillFIRRow(row, fir) {
+    const statusClass = `status-${fir.fir_status.toLowerCase().replace(/\s+/g, '-')}`;
+    row.innerHTML = `
+        <td>${fir._id}</td>
+        <td><span class="status-badge ${statusClass}">${fir.fir_status}</span></td>
+        <td>${escapeHTML(fir.assigned_officer_name || 'Unassigned')}</td>
+        <td>${new Date(fir.filed_date).toLocaleDateString()}</td>
+        <td>
+            <button class="view-btn" data-fir-id="${fir._id}">🔍 View</button>
+            <button class="cancel-btn" data-fir-id="${fir._id}" ${fir.fir_status !== 'Pending' ? 'disabled' : ''}>❌ Cancel</button>
+        </td>
+    `;
+}
+
+function setupLiveUpdates() {
+    if (!window.EventSource) {
+        liveUpdates = 'poll';
+        pollFIREvents();
+        return;
+    }
+    // EventSource reconnects on its own and sends Last-Event-ID, so missed changes are replayed.
+    const source = new EventSource('/events/stream');
+    liveUpdates = source;
+    let lastEventId = null;
+    source.addEventListener('fir', (event) => {
+        lastEventId = event.lastEventId;
+        applyFIREvent(JSON.parse(event.data));
     });
+    // The server answers 204 when it cannot hold streams open, which closes the source for good.
+    source.onerror = () => {
+        if (source.readyState === EventSource.CLOSED) pollFIREvents(lastEventId);
+    };
+}
+
+async function pollFIREvents(after = null, seen = new Set()) {
+    let retryMs = 5000;
+    try {
+        const response = await fetch(after ? `/events/poll?after=${encodeURIComponent(after)}` : '/events/poll');
+        if (response.ok) {
+            const data = await response.json();
+            // Each poll replays the last event's second, so skip events already applied.
+            data.events.filter(event => !seen.has(event.id)).forEach(event => {
+                seen.add(event.id);
+                applyFIREvent(event);
+            });
+            if (seen.size > 1000) seen.clear();
+            after = data.last_id;
+            retryMs = data.retry_ms;
+        }
+    } catch (error) {
+        console.error('Error polling FIR events:', error);
+    }
+    setTimeout(() => pollFIREvents(after, seen), retryMs);
+}
+
+function applyFIREvent({ type, fir }) {
+    const firListBody = document.getElementById('fir-list');
+    const row = firListBody.querySelector(`tr[data-fir-id="${fir._id}"]`);
+
+    if (type === 'cancelled') {
+        if (row) row.remove();
+        if (!firListBody.querySelector('tr[data-fir-id]')) {
+            firListBody.innerHTML = '<tr><td colspan="5">You have not filed any FIRs yet.</td></tr>';
+        }
+        return;
+    }
+    if (row) {
+        fillFIRRow(row, fir);
+    } else if (type === 'created') {
+        firListBody.querySelectorAll('tr:not([data-fir-id])').forEach(placeholder => placeholder.remove());
+        appendFIRRow(firListBody, fir, 0);
+    }
 }
 
 function displayFIRDetails(fir) {
@@ -275,6 +389,9 @@ function displayFIRDetails(fir) {
         <hr>
         <h4>Supporting Documents:</h4>
         <div id="fir-documents-preview"></div>
+        <hr>
+        <h4>Timeline:</h4>
+        <ul id="fir-timeline"><li>Loading...</li></ul>
     `;
 
     const previewContainer = detailsDiv.querySelector('#fir-documents-preview');
@@ -287,7 +404,11 @@ function displayFIRDetails(fir) {
             
             documentsHTML += '<li style="margin-bottom: 15px;">';
 
-            if (resourceType === 'image') {
+            if (doc.status === 'pending') {
+                documentsHTML += `<em>⏳ ${escapeHTML(doc.filename)} is still uploading. Check back shortly.</em>`;
+            } else if (doc.status === 'failed') {
+                documentsHTML += `<em>⚠️ ${escapeHTML(doc.filename)} could not be uploaded.</em>`;
+            } else if (resourceType === 'image') {
                 documentsHTML += `<a href="${url}" target="_blank" title="Click to view full image"><img src="${url}" alt="Evidence Preview" style="max-width: 100%; height: auto; border-radius: 5px; border: 1px solid #ccc;"></a>`;
             } else if (resourceType === 'video') {
                 documentsHTML += `<video controls style="max-width: 100%; border-radius: 5px;"><source src="${url}">Your browser doesn't support this video format.</video><br><a href="${url}" target="_blank">Download Video</a>`;
@@ -320,6 +441,7 @@ async function loadChatHistory() {
                 const sender = msg.role === 'user' ? 'You' : 'FIR-Bot';
                 addMessageToChat(sender, msg.text, false); 
             });
+            showLoadEarlierButton(data.next);
         } else {
             const welcomeMessage = "Hello! I am **FIR-Bot**, your virtual assistant. I can help you understand the FIR filing process, explain your rights, and guide you on what documents to upload. Please ask me a question or click one of the suggestions below. <br><br>**If you are in immediate danger, please stop and call 112.**";
             addMessageToChat('FIR-Bot', welcomeMessage, true, true); 
@@ -330,6 +452,41 @@ async function loadChatHistory() {
     }
 }
 
+function showLoadEarlierButton(nextOffset) {
+    const chatbox = document.getElementById('chatbox');
+    const existing = document.getElementById('load-earlier-btn');
+    if (existing) existing.remove();
+    if (nextOffset === null || nextOffset === undefined) return;
+
+    const button = document.createElement('button');
+    button.id = 'load-earlier-btn';
+    button.className = 'prompt-btn';
+    button.textContent = 'Load earlier messages';
+    button.addEventListener('click', () => loadEarlierMessages(nextOffset));
+    chatbox.prepend(button);
+}
+
+async function loadEarlierMessages(offset) {
+    const chatbox = document.getElementById('chatbox');
+    try {
+        const response = await fetch(`/chatbot/history?offset=${offset}`);
+        const data = await response.json();
+        if (!response.ok) throw new Error(data.error || 'Could not load earlier messages.');
+
+        const previousHeight = chatbox.scrollHeight;
+        const anchor = document.getElementById('load-earlier-btn').nextSibling;
+        data.history.forEach(msg => {
+            const sender = msg.role === 'user' ? 'You' : 'FIR-Bot';
+            const element = addMessageToChat(sender, msg.text, false).parentElement;
+            chatbox.insertBefore(element, anchor);
+        });
+        chatbox.scrollTop = chatbox.scrollHeight - previousHeight;
+        showLoadEarlierButton(data.next);
+    } catch (error) {
+        console.error('Error loading earlier messages:', error);
+    }
+}
+
 function handlePromptClick(event) {
     if (event.target.classList.contains('prompt-btn')) {
         const message = event.target.textContent;
@@ -351,20 +508,68 @@ async function sendMessage() {
     document.getElementById('suggested-prompts').style.display = 'none';
 
     try {
-        const response = await fetch('/chatbot/ask', {
+        const response = await fetch('/chatbot/stream', {
             method: 'POST',
-            headers: { 'Content-Type': 'application/json' },
+            headers: { 'Content-Type': 'application/json', 'Accept': 'text/event-stream' },
             body: JSON.stringify({ message: message })
         });
-        const data = await response.json();
-        removeTypingIndicator();
-        addMessageToChat('FIR-Bot', data.response || "Sorry, I encountered an error.", true, true);
+        if (!response.ok || !response.body) {
+            const data = await response.json();
+            removeTypingIndicator();
+            addMessageToChat('FIR-Bot', data.response || data.error || "Sorry, I encountered an error.", true, true);
+            return;
+        }
+        await readChatStream(response);
     } catch (error) {
         removeTypingIndicator();
         addMessageToChat('FIR-Bot', 'Connection error. Please check your network and try again.', true, true);
     }
 }
 
+async function readChatStream(response) {
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    let answer = '';
+    let contentDiv = null;
+
+    while (true) {
+        const { value, done } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+
+        const frames = buffer.split('\n\n');
+        buffer = frames.pop();
+        for (const frame of frames) {
+            const event = parseSSEFrame(frame);
+            if (event.type === 'message') {
+                answer += event.data.delta;
+                if (!contentDiv) {
+                    removeTypingIndicator();
+                    contentDiv = addMessageToChat('FIR-Bot', '', true);
+                }
+                contentDiv.innerHTML = formatBotMessage(answer);
+                const chatbox = document.getElementById('chatbox');
+                chatbox.scrollTop = chatbox.scrollHeight;
+            } else if (event.type === 'error') {
+                removeTypingIndicator();
+                addMessageToChat('FIR-Bot', event.data.message, true, true);
+            }
+        }
+    }
+    removeTypingIndicator();
+}
+
+function parseSSEFrame(frame) {
+    let type = 'message';
+    let data = '';
+    frame.split('\n').forEach(line => {
+        if (line.startsWith('event:')) type = line.slice(6).trim();
+        else if (line.startsWith('data:')) data += line.slice(5).trim();
+    });
+    return { type, data: data ? JSON.parse(data) : {} };
+}
+
 async function clearChatHistory() {
     if (!confirm('Are you sure you want to delete your entire chat history? This cannot be undone.')) {
         return;
@@ -390,13 +595,7 @@ function addMessageToChat(sender, message, processMarkdown = true, useTypingEffe
     const senderClass = sender === 'You' ? 'user-message' : 'bot-message';
     msgElement.classList.add('chat-message', senderClass);
 
-    const formattedMessage = processMarkdown 
-        ? message
-            .replace(/&/g, '&amp;') 
-            .replace(/\*\*(.*?)\*\*/g, '<strong>$1</strong>')
-            .replace(/\*/g, '')
-            .replace(/\n/g, '<br>')
-        : message;
+    const formattedMessage = processMarkdown ? formatBotMessage(message) : message;
 
     msgElement.innerHTML = `<strong>${sender}:</strong><div class="message-content"></div>`;
     const contentDiv = msgElement.querySelector('.message-content');
@@ -410,6 +609,15 @@ function addMessageToChat(sender, message, processMarkdown = true, useTypingEffe
     }
     
     chatbox.scrollTop = chatbox.scrollHeight;
+    return contentDiv;
+}
+
+function formatBotMessage(message) {
+    return message
+        .replace(/&/g, '&amp;') 
+        .replace(/\*\*(.*?)\*\*/g, '<strong>$1</strong>')
+        .replace(/\*/g, '')
+        .replace(/\n/g, '<br>');
 }
 
 function typeWriter(messageElement, contentElement, text, speed) {
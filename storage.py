@@ -0,0 +1,131 @@
+import os
+import uuid
+import mimetypes
+from datetime import datetime
+from werkzeug.utils import secure_filename
+
+
+class CloudinaryStorage:
+    """Stores evidence files on Cloudinary."""
+
+    name = 'cloudinary'
+
+    # Cloudinary's delete_resources accepts at most 100 public_ids per call.
+    max_batch_size = 100
+
+    def __init__(self):
+        import cloudinary
+        import cloudinary.api
+        import cloudinary.uploader
+        cloudinary.config(
+            cloud_name=os.getenv('CLOUDINARY_CLOUD_NAME'),
+            api_key=os.getenv('CLOUDINARY_API_KEY'),
+            api_secret=os.getenv('CLOUDINARY_API_SECRET')
+        )
+        self.uploader = cloudinary.uploader
+        self.api = cloudinary.api
+
+    def upload(self, data, filename):
+        upload_result = self.uploader.upload(data, resource_type="auto", filename=filename)
+        return {
+            "url": upload_result.get('secure_url'),
+            "public_id": upload_result.get('public_id'),
+            "resource_type": upload_result.get('resource_type')
+        }
+
+    def delete(self, public_id, resource_type):
+        self.uploader.destroy(public_id, resource_type=resource_type)
+
+    def delete_many(self, public_ids, resource_type):
+        """Deletes up to max_batch_size objects of one resource_type in a single API call."""
+        result = self.api.delete_resources(list(public_ids), resource_type=resource_type)
+        deleted = result.get('deleted', {})
+        # 'not_found' counts as done: the object is gone either way.
+        return [public_id for public_id in public_ids if deleted.get(public_id) in ('deleted', 'not_found')]
+
+    def list_objects(self):
+        """Yields (public_id, resource_type, created_at) for every stored object."""
+        for resource_type in ('image', 'video', 'raw'):
+            next_cursor = None
+            while True:
+                page = self.api.resources(resource_type=resource_type, max_results=500, next_cursor=next_cursor)
+                for resource in page.get('resources', []):
+                    created_at = datetime.strptime(resource['created_at'], '%Y-%m-%dT%H:%M:%SZ')
+                    yield resource['public_id'], resource_type, created_at
+                next_cursor = page.get('next_cursor')
+                if not next_cursor:
+                    break
+
+
+class LocalStorage:
+    """
+    Stores evidence files in a directory on disk. Used for offline development
+    and tests; files are served back through the /uploads/<public_id> route.
+    """
+
+    name = 'local'
+    max_batch_size = 1000
+
+    def __init__(self, root=None, base_url='/uploads'):
+        self.root = os.path.abspath(root or os.getenv('LOCAL_STORAGE_DIR', 'uploads'))
+        self.base_url = base_url
+        os.makedirs(self.root, exist_ok=True)
+
+    @staticmethod
+    def resource_type_for(filename):
+        # Mirrors Cloudinary's "auto" detection: audio is stored as video.
+        mime_type = mimetypes.guess_type(filename)[0] or ''
+        if mime_type.startswith('image/'):
+            return 'image'
+        if mime_type.startswith(('video/', 'audio/')):
+            return 'video'
+        return 'raw'
+
+    def path_for(self, public_id):
+        return os.path.join(self.root, secure_filename(public_id))
+
+    def upload(self, data, filename):
+        public_id = f"{uuid.uuid4().hex}_{secure_filename(filename) or 'file'}"
+        with open(self.path_for(public_id), 'wb') as f:
+            f.write(data)
+        return {
+            "url": f"{self.base_url}/{public_id}",
+            "public_id": public_id,
+            "resource_type": self.resource_type_for(filename)
+        }
+
+    def delete(self, public_id, resource_type):
+        try:
+            os.remove(self.path_for(public_id))
+        except FileNotFoundError:
+            pass
+
+    def delete_many(self, public_ids, resource_type):
+        for public_id in public_ids:
+            self.delete(public_id, resource_type)
+        return list(public_ids)
+
+    def list_objects(self):
+        for entry in os.scandir(self.root):
+            if entry.is_file():
+                created_at = datetime.utcfromtimestamp(entry.stat().st_mtime)
+                yield entry.name, self.resource_type_for(entry.name), created_at
+
+
+STORAGE_BACKENDS = {
+    CloudinaryStorage.name: CloudinaryStorage,
+    LocalStorage.name: LocalStorage,
+}
+
+
+def storage_backend_name(name=None):
+    """Validates `name` or the STORAGE_BACKEND env var (default: cloudinary) without building anything."""
+    name = (name or os.getenv('STORAGE_BACKEND', CloudinaryStorage.name)).lower()
+    if name not in STORAGE_BACKENDS:
+        raise RuntimeError(f"Unknown STORAGE_BACKEND '{name}'. Expected one of: {', '.join(STORAGE_BACKENDS)}")
+    return name
+
+
+def get_storage_backend(name=None):
+    """Builds the backend named by `name` or the STORAGE_BACKEND env var (default: cloudinary)."""
+    return STORAGE_BACKENDS[storage_backend_name(name)]()